@@ -0,0 +1,70 @@
+"""
+Replay throughput of the reminder bandit policies on a synthetic log, next
+to the same replay through per-user ReminderBandit objects (the code the API
+runs) as the scalar baseline.
+
+Run from the pathcraft-api root:
+    python -m benchmarks.bench_bandit_replay --events 1000000 --users 10000
+"""
+import argparse
+import time
+
+from src.ml.bandit_replay import (
+    DEFAULT_POLICIES, ReplayLog, make_policy, replay, synthetic_log,
+)
+from src.ml.reminder_system import ReminderBandit
+
+
+def replay_reminder_bandits(log, epsilon=0.1):
+    # One event at a time, updating after every match.
+    bandits = {}
+    matched = 0
+    reward = 0.0
+    started = time.perf_counter()
+    events = zip(log.users.tolist(), log.arms.tolist(), log.rewards.tolist())
+    for user, arm, r in events:
+        bandit = bandits.get(user)
+        if bandit is None:
+            bandit = bandits[user] = ReminderBandit(user, log.arm_names, epsilon)
+        if bandit.select_arm() == log.arm_names[arm]:
+            bandit.update(log.arm_names[arm], r)
+            matched += 1
+            reward += r
+    seconds = time.perf_counter() - started
+    return {
+        'policy': f'ReminderBandit:{epsilon:g}',
+        'matched': matched,
+        'mean_reward': reward / matched,
+        'decisions_per_second': len(log) / seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--events', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--scalar-events', type=int, default=200000,
+                        help='events replayed through ReminderBandit objects (slow)')
+    args = parser.parse_args()
+
+    log = synthetic_log(args.events, n_users=args.users)
+    results = [
+        replay(log, make_policy(spec), batch_size=args.batch_size)
+        for spec in DEFAULT_POLICIES
+    ]
+    n = args.scalar_events
+    head = ReplayLog(log.users[:n], log.arms[:n], log.rewards[:n], log.arm_names)
+    results.append(replay_reminder_bandits(head))
+
+    print(f"events={args.events} users={args.users} batch={args.batch_size}")
+    print(f"{'policy':<22}{'matched':>10}{'mean reward':>14}{'decisions/s':>14}")
+    for result in results:
+        print(f"{result['policy']:<22}{result['matched']:>10}"
+              f"{result['mean_reward']:>14.4f}{result['decisions_per_second']:>14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
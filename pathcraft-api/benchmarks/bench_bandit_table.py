@@ -0,0 +1,88 @@
+"""
+Compare per-user ReminderBandit objects with the array-backed BanditTable:
+memory per user, epsilon-greedy selection and updates for a batch of
+requests, and restart cost (JSON parse vs memory-mapped .npy snapshot).
+
+Run from the pathcraft-api root:
+    python -m benchmarks.bench_bandit_table --users 100000 --batch 100000
+"""
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from src.ml.bandit_table import BanditTable
+from src.ml.reminder_system import ReminderBandit
+
+ARMS = ['push_15_min', 'email_1_hour', 'sms_on_day']
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--batch', type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    user_ids = [f'user_{i}' for i in range(args.users)]
+    batch_users = [user_ids[i] for i in rng.integers(args.users, size=args.batch)]
+    batch_arms = [ARMS[k] for k in rng.integers(len(ARMS), size=args.batch)]
+    batch_rewards = rng.integers(2, size=args.batch)
+
+    tracemalloc.start()
+    bandits = {user_id: ReminderBandit(user_id, ARMS) for user_id in user_ids}
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    table = BanditTable(ARMS, capacity=args.users, rng=rng)
+    table.rows(user_ids)
+    table_bytes = table.counts.nbytes + table.values.nbytes + table.epsilons.nbytes
+
+    dict_select, _ = timed(lambda: [bandits[u].select_arm() for u in batch_users])
+    table_select, _ = timed(lambda: table.select(batch_users))
+
+    def dict_update():
+        for u, a, r in zip(batch_users, batch_arms, batch_rewards):
+            bandits[u].update(a, r)
+    dict_update_s, _ = timed(dict_update)
+    table_update_s, _ = timed(
+        lambda: table.update(batch_users, batch_arms, batch_rewards)
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = Path(tmp) / 'bandit_data.json'
+        legacy.write_text(json.dumps({
+            u: {
+                'arms': b.arms,
+                'epsilon': b.epsilon,
+                'counts': b.counts,
+                'values': b.values,
+            }
+            for u, b in bandits.items()
+        }, indent=4))
+        json_load, _ = timed(lambda: json.loads(legacy.read_text()))
+        table.snapshot(Path(tmp) / 'snapshot')
+        npy_load, _ = timed(lambda: BanditTable.restore(Path(tmp) / 'snapshot'))
+
+    print(f"users={args.users} batch={args.batch}")
+    print(f"{'':>22} {'dicts':>10} {'table':>10}")
+    print(f"{'bytes per user':>22} {dict_bytes / args.users:>10.0f} "
+          f"{table_bytes / args.users:>10.0f}")
+    print(f"{'select batch (s)':>22} {dict_select:>10.3f} {table_select:>10.3f}")
+    print(f"{'update batch (s)':>22} {dict_update_s:>10.3f} {table_update_s:>10.3f}")
+    print(f"{'restart load (s)':>22} {json_load:>10.3f} {npy_load:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Compare the 'boolean' and 'interval' CalendarOptimizer engines.
+
+Generates a synthetic workload (two work blocks per weekday, tasks of 15-90
+minutes) whose horizon is sized so the tasks fill about half of the available
+time, and reports model size and solve time for each engine. With
+--partition, each engine is also run through PartitionedOptimizer, which
+solves one window per day (or week) on the shared window pool, --workers
+windows at a time.
+
+Run from the pathcraft-api root:
+    python -m benchmarks.bench_calendar_optimizer --tasks 50 200 1000
+    python -m benchmarks.bench_calendar_optimizer --tasks 1000 --partition day
+"""
+import argparse
+import math
+import random
+import time
+from datetime import datetime, timedelta
+
+from src.ml.calendar_optimizer import CalendarOptimizer
+from src.ml.partitioned_optimizer import PartitionedOptimizer
+
+DURATIONS = [15, 30, 45, 60, 90]
+WORK_BLOCKS = ((9, 12), (13, 17))
+FILL_RATIO = 0.5
+
+
+def make_workload(n_tasks, seed=0):
+    rng = random.Random(seed)
+    tasks = [
+        {'name': f'Task {i}', 'duration': rng.choice(DURATIONS)} for i in range(n_tasks)
+    ]
+
+    minutes_per_day = sum(60 * (end - start) for start, end in WORK_BLOCKS)
+    total = sum(task['duration'] for task in tasks)
+    n_weekdays = max(1, math.ceil(total / FILL_RATIO / minutes_per_day))
+
+    day0 = datetime(2025, 1, 6)
+    slots = []
+    day = 0
+    while len(slots) < n_weekdays * len(WORK_BLOCKS):
+        date = day0 + timedelta(days=day)
+        day += 1
+        if date.weekday() >= 5:
+            continue
+        for start_hour, end_hour in WORK_BLOCKS:
+            slots.append({
+                'name': f'{date:%a %d} {start_hour}h',
+                'start': date.replace(hour=start_hour),
+                'end': date.replace(hour=end_hour),
+            })
+    weights = [rng.random() for _ in slots]
+    return tasks, slots, weights
+
+
+def run(engine, tasks, slots, weights, time_limit, workers):
+    optimizer = CalendarOptimizer(tasks, slots, slot_weights=weights,
+                                  time_limit_seconds=time_limit,
+                                  num_workers=workers, engine=engine)
+    started = time.perf_counter()
+    solution = optimizer.optimize()
+    elapsed = time.perf_counter() - started
+    proto = optimizer.model.Proto()
+    objective = optimizer._objective_value(optimizer.assignment) if solution else None
+    n_vars, n_constraints = len(proto.variables), len(proto.constraints)
+    return n_vars, n_constraints, elapsed, optimizer.status, objective
+
+
+def run_partitioned(engine, partition, tasks, slots, weights, time_limit, workers):
+    optimizer = PartitionedOptimizer(tasks, slots, slot_weights=weights,
+                                     partition=partition, max_workers=workers,
+                                     time_limit_seconds=time_limit,
+                                     num_workers=workers, engine=engine)
+    started = time.perf_counter()
+    solution = optimizer.optimize()
+    elapsed = time.perf_counter() - started
+    scorer = CalendarOptimizer(tasks, slots, slot_weights=weights)
+    objective = scorer._objective_value(optimizer.assignment) if solution else None
+    return '-', '-', elapsed, optimizer.status, objective
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--tasks', type=int, nargs='+', default=[50, 200, 1000])
+    parser.add_argument('--time-limit', type=float, default=30.0)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--partition', choices=PartitionedOptimizer.PARTITIONS)
+    args = parser.parse_args()
+
+    print(f"{'tasks':>6} {'slots':>6} {'engine':>12} {'vars':>8} {'constrs':>8} "
+          f"{'seconds':>8} {'status':>10} {'objective':>12}")
+    for n_tasks in args.tasks:
+        tasks, slots, weights = make_workload(n_tasks)
+        limits = args.time_limit, args.workers
+        runs = [
+            (engine, lambda engine=engine: run(engine, tasks, slots, weights, *limits))
+            for engine in CalendarOptimizer.ENGINES
+        ]
+        if args.partition:
+            runs += [
+                (f'{engine}/{args.partition}', lambda engine=engine: run_partitioned(
+                    engine, args.partition, tasks, slots, weights, *limits))
+                for engine in CalendarOptimizer.ENGINES
+            ]
+        for label, bench in runs:
+            n_vars, n_constraints, elapsed, status, objective = bench()
+            objective = objective if objective is not None else '-'
+            print(f"{n_tasks:>6} {len(slots):>6} {label:>12} {n_vars:>8} "
+                  f"{n_constraints:>8} {elapsed:>8.2f} {status:>10} {objective:>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Measure cold-start cost of the API process and of the first schedule request.
+
+Each scenario runs in a fresh interpreter:
+  legacy    import the app, then train a SlotSelector on dummy data, which
+            is what importing src.routers.ml used to do
+  import    import the app (no model is touched)
+  artifact  first get_slot_selector() + predict, with a published artifact
+  fallback  first get_slot_selector() + predict, with nothing published
+
+Run from the pathcraft-api root:
+    python -m benchmarks.bench_cold_start --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SCENARIOS = {
+    'legacy': (
+        "import src.main\n"
+        "from src.ml.slot_selector import SlotSelector, get_dummy_data\n"
+        "SlotSelector().train(*get_dummy_data())\n"
+    ),
+    'import': "import src.main\n",
+    'artifact': (
+        "import numpy as np\n"
+        "from src.ml.model_registry import get_slot_selector\n"
+        "get_slot_selector()[1].predict_proba(np.array([[9, 0]]))\n"
+    ),
+}
+SCENARIOS['fallback'] = SCENARIOS['artifact']
+
+TIMED = (
+    "import time\n"
+    "_started = time.perf_counter()\n"
+    "{code}"
+    "print(time.perf_counter() - _started)\n"
+)
+
+
+def time_scenario(code, env):
+    output = subprocess.run([sys.executable, '-c', TIMED.format(code=code)], env=env,
+                            check=True, capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as published, \
+            tempfile.TemporaryDirectory() as empty:
+        subprocess.run([sys.executable, '-m', 'src.ml.train', '--model-dir', published],
+                       check=True, capture_output=True)
+        print(f"{'scenario':>10} {'median s':>9} {'min s':>7}")
+        for name, code in SCENARIOS.items():
+            model_dir = published if name != 'fallback' else empty
+            env = dict(os.environ, PATHCRAFT_MODEL_DIR=model_dir)
+            times = [time_scenario(code, env) for _ in range(args.runs)]
+            print(f"{name:>10} {statistics.median(times):>9.3f} {min(times):>7.3f}")
+
+
+if __name__ == '__main__':
+    main()
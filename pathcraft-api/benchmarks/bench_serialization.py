@@ -0,0 +1,159 @@
+"""
+Per-row cost of the list endpoints' read path: ORM objects validated and
+encoded through the response models (what FastAPI does with a
+response_model), against Core rows built into dicts and serialized with
+orjson (FastJSONResponse).
+
+Two shapes are measured on an in-memory SQLite database:
+  goals     GET /goals/: goals with nested sub-goals and tasks
+  schedule  GET /schedule/: a flat list of tasks
+
+Run from the pathcraft-api root:
+    python -m benchmarks.bench_serialization --goals 500 --sub-goals 4 --tasks 10
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src import crud, models, schemas
+from src.responses import FastJSONResponse
+
+
+def populate(engine, n_goals, n_sub_goals, n_tasks):
+    now = datetime.now(timezone.utc)
+    goals, sub_goals, tasks = [], [], []
+    for i in range(n_goals):
+        goal_id = uuid.uuid4()
+        goals.append(
+            {"id": goal_id, "title": f"Goal {i}", "target_date": now, "notes": "notes"}
+        )
+        for _ in range(n_sub_goals):
+            sub_goal_id = uuid.uuid4()
+            sub_goals.append({
+                "id": sub_goal_id,
+                "parent_goal_id": goal_id,
+                "description": "Sub-goal",
+                "estimated_effort_minutes": 60,
+            })
+            for k in range(n_tasks):
+                tasks.append({
+                    "id": uuid.uuid4(),
+                    "subgoal_id": sub_goal_id,
+                    "description": f"Task {k}",
+                    "planned_start": now + timedelta(minutes=k),
+                    "planned_end": now + timedelta(minutes=k + 30),
+                    "status": models.TaskStatus.TODO,
+                })
+    with engine.begin() as connection:
+        connection.execute(insert(models.Goal), goals)
+        connection.execute(insert(models.SubGoal), sub_goals)
+        connection.execute(insert(models.Task), tasks)
+    return now
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def orm_path(session_factory, load, schema):
+    adapter = TypeAdapter(schema)
+
+    def run():
+        db = session_factory()
+        try:
+            objects = adapter.validate_python(load(db), from_attributes=True)
+            content = adapter.dump_python(objects, mode="json")
+            return json.dumps(content).encode()
+        finally:
+            db.close()
+    return run
+
+
+def fast_path(session_factory, load):
+    def run():
+        db = session_factory()
+        try:
+            return FastJSONResponse(load(db)).body
+        finally:
+            db.close()
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--goals", type=int, default=500)
+    parser.add_argument("--sub-goals", type=int, default=4, help="sub-goals per goal")
+    parser.add_argument("--tasks", type=int, default=10, help="tasks per sub-goal")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    models.Base.metadata.create_all(engine)
+    now = populate(engine, args.goals, args.sub_goals, args.tasks)
+    session_factory = sessionmaker(bind=engine)
+    start, end = now - timedelta(days=1), now + timedelta(days=1)
+    n_tasks = args.goals * args.sub_goals * args.tasks
+    n_rows = args.goals * (1 + args.sub_goals * (1 + args.tasks))
+
+    shapes = {
+        "goals": (
+            n_rows,
+            orm_path(
+                session_factory,
+                lambda db: crud.get_goals(db, limit=args.goals),
+                List[schemas.Goal],
+            ),
+            fast_path(
+                session_factory, lambda db: crud.get_goal_dicts(db, limit=args.goals)
+            ),
+        ),
+        "schedule": (
+            n_tasks,
+            orm_path(
+                session_factory,
+                lambda db: crud.get_tasks_by_date_range(db, start, end),
+                List[schemas.Task],
+            ),
+            fast_path(
+                session_factory,
+                lambda db: crud.get_task_dicts_by_date_range(db, start, end),
+            ),
+        ),
+    }
+    print(
+        f"goals={args.goals} sub-goals/goal={args.sub_goals} "
+        f"tasks/sub-goal={args.tasks}"
+    )
+    print(
+        f"{'shape':>10} {'rows':>8} {'orm (s)':>9} {'fast (s)':>9} "
+        f"{'orm us/row':>11} {'fast us/row':>12}"
+    )
+    for name, (rows, orm, fast) in shapes.items():
+        orm_s, orm_body = timed(orm, args.repeat)
+        fast_s, fast_body = timed(fast, args.repeat)
+        assert json.loads(orm_body) == json.loads(fast_body), f"{name}: outputs differ"
+        print(
+            f"{name:>10} {rows:>8} {orm_s:>9.3f} {fast_s:>9.3f} "
+            f"{orm_s / rows * 1e6:>11.1f} {fast_s / rows * 1e6:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Per-slot scoring cost of SlotSelector.predict_proba: the gradient-boosting
+model versus the compiled 24x7 lookup table.
+
+Run from the pathcraft-api root:
+    python -m benchmarks.bench_slot_selector --slots 1 10 100 1000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.ml.slot_selector import SlotSelector, get_dummy_data
+
+
+def time_per_call(predict, features, min_seconds=0.5):
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        predict(features)
+        calls += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return elapsed / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--slots', type=int, nargs='+', default=[1, 10, 100, 1000])
+    args = parser.parse_args()
+
+    selector = SlotSelector()
+    selector.train(*get_dummy_data(seed=0))
+    rng = np.random.RandomState(0)
+
+    print(f"{'slots':>6} {'model us/slot':>14} {'table us/slot':>14} {'speedup':>8}")
+    for n_slots in args.slots:
+        features = np.column_stack(
+            [rng.randint(0, 24, n_slots), rng.randint(0, 7, n_slots)]
+        )
+        model = time_per_call(selector.model.predict_proba, features) / n_slots * 1e6
+        table = time_per_call(selector.predict_proba, features) / n_slots * 1e6
+        print(f"{n_slots:>6} {model:>14.2f} {table:>14.3f} {model / table:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
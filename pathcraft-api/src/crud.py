@@ -1,7 +1,104 @@
+import uuid
+from typing import Iterator
 from uuid import UUID
 from datetime import datetime, timezone
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import (
+    Integer, and_, bindparam, case, exists, func, insert, select, update,
+)
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Query, Session, selectinload
 from . import models, schemas
+from .ml.schedule_cache import invalidate_sub_goals, invalidate_tasks
+from .pagination import decode_cursor, encode_cursor
+
+
+def _keyset_page(
+    query: Query, id_column, cursor: str, limit: int
+) -> tuple[list, str | None]:
+    """
+    Fetch one page of `query` ordered by `id_column`, starting after `cursor`.
+    One extra row is requested to find out whether a next page exists, so no
+    COUNT or OFFSET is ever needed.
+    """
+    after_id = decode_cursor(cursor)
+    if after_id is not None:
+        query = query.filter(id_column > after_id)
+    rows = query.order_by(id_column).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].id)
+    return rows, None
+
+
+# ==========================
+# Existence Check Functions
+# ==========================
+
+# Parent checks only need to know whether a row exists, so they run id-only
+# EXISTS queries instead of loading the parent and its children. Positive
+# answers are memoized in `Session.info`, which lives as long as the session
+# (one request in the API), and are dropped whenever something is deleted.
+_EXISTS_CACHE_KEY = "exists_cache"
+
+
+def _row_exists(db: Session, kind: str, id_column, row_id: UUID) -> bool:
+    cache = db.info.setdefault(_EXISTS_CACHE_KEY, set())
+    if (kind, row_id) in cache:
+        return True
+    found = db.query(exists().where(id_column == row_id)).scalar()
+    if found:
+        cache.add((kind, row_id))
+    return found
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _clear_exists_cache(db: Session) -> None:
+    db.info.pop(_EXISTS_CACHE_KEY, None)
+
+
+def goal_exists(db: Session, goal_id: UUID) -> bool:
+    """
+    Check whether a goal exists without loading it.
+    """
+    return _row_exists(db, "goal", models.Goal.id, goal_id)
+
+
+def sub_goal_exists(db: Session, sub_goal_id: UUID) -> bool:
+    """
+    Check whether a sub-goal exists without loading it.
+    """
+    return _row_exists(db, "sub_goal", models.SubGoal.id, sub_goal_id)
+
+
+def get_missing_sub_goal_ids(db: Session, sub_goal_ids: set[UUID]) -> set[UUID]:
+    """
+    Return the subset of `sub_goal_ids` that do not exist, checking each ID
+    once with batched `IN (...)` selects.
+    """
+    cache = db.info.setdefault(_EXISTS_CACHE_KEY, set())
+    unknown = [i for i in sub_goal_ids if ("sub_goal", i) not in cache]
+    found: set[UUID] = set()
+    # Stay well below SQLite's bound-parameter limit.
+    for chunk in _chunks(unknown, 500):
+        found.update(
+            db.execute(select(models.SubGoal.id).where(models.SubGoal.id.in_(chunk)))
+            .scalars()
+            .all()
+        )
+    cache.update(("sub_goal", i) for i in found)
+    return set(unknown) - found
+
+
+def get_goal_row(db: Session, goal_id: UUID) -> models.Goal | None:
+    """
+    Retrieve a goal's own columns without loading its sub-goals or tasks.
+    """
+    return db.get(models.Goal, goal_id)
+
 
 # ====================
 # Goal CRUD Functions
@@ -14,7 +111,9 @@ def get_goal(db: Session, goal_id: UUID) -> models.Goal | None:
     """
     return (
         db.query(models.Goal)
-        .options(joinedload(models.Goal.sub_goals).joinedload(models.SubGoal.tasks))
+        .options(
+            selectinload(models.Goal.sub_goals).selectinload(models.SubGoal.tasks)
+        )
         .filter(models.Goal.id == goal_id)
         .first()
     )
@@ -23,16 +122,107 @@ def get_goal(db: Session, goal_id: UUID) -> models.Goal | None:
 def get_goals(db: Session, skip: int = 0, limit: int = 100) -> list[models.Goal]:
     """
     Retrieve a list of goals with pagination, with sub-goals and tasks eagerly loaded.
+    Children are fetched with batched `IN (...)` selects instead of one big join.
     """
     return (
         db.query(models.Goal)
-        .options(joinedload(models.Goal.sub_goals).joinedload(models.SubGoal.tasks))
+        .options(
+            selectinload(models.Goal.sub_goals).selectinload(models.SubGoal.tasks)
+        )
         .offset(skip)
         .limit(limit)
         .all()
     )
 
 
+_OPEN_STATUSES = (models.TaskStatus.TODO, models.TaskStatus.IN_PROGRESS)
+
+
+def get_goal_summaries(
+    db: Session,
+    cursor: str = "",
+    limit: int = 100,
+    methodology: str | None = None,
+    target_date_from: datetime | None = None,
+    target_date_to: datetime | None = None,
+    overdue_only: bool = False,
+    now: datetime | None = None,
+) -> tuple[list[Row], str | None]:
+    """
+    Retrieve one keyset-paginated page of goal summaries (see
+    schemas.GoalSummary) with a single query: the page of goals is selected
+    first, then their tasks are counted with one GROUP BY over tasks joined
+    to sub-goals. Only plain rows are returned; no ORM objects are built.
+    Returns the rows and the cursor of the next page, if any.
+    """
+    now = now or datetime.now(timezone.utc)
+    due = func.coalesce(models.Task.planned_end, models.Task.planned_start)
+    is_open = models.Task.status.in_(_OPEN_STATUSES)
+
+    goals = select(
+        models.Goal.id,
+        models.Goal.title,
+        models.Goal.target_date,
+        models.Goal.methodology,
+        models.Goal.progress_percentage,
+    )
+    after_id = decode_cursor(cursor)
+    if after_id is not None:
+        goals = goals.where(models.Goal.id > after_id)
+    if methodology is not None:
+        goals = goals.where(models.Goal.methodology == methodology)
+    if target_date_from is not None:
+        goals = goals.where(models.Goal.target_date >= target_date_from)
+    if target_date_to is not None:
+        goals = goals.where(models.Goal.target_date <= target_date_to)
+    if overdue_only:
+        goals = goals.where(
+            exists().where(
+                models.SubGoal.parent_goal_id == models.Goal.id,
+                models.Task.subgoal_id == models.SubGoal.id,
+                is_open,
+                due < now,
+            )
+        )
+    page = goals.order_by(models.Goal.id).limit(limit + 1).subquery()
+
+    def count(*conditions):
+        return func.coalesce(func.sum(case((and_(*conditions), 1), else_=0)), 0)
+
+    status_counts = {
+        f"tasks_{status.name.lower()}": count(models.Task.status == status)
+        for status in models.TaskStatus
+    }
+    totals = (
+        select(
+            models.SubGoal.parent_goal_id.label("goal_id"),
+            func.count(models.Task.id).label("tasks_total"),
+            *(column.label(name) for name, column in status_counts.items()),
+            count(is_open, due < now).label("tasks_overdue"),
+            func.min(case((and_(is_open, due >= now), due))).label("next_due"),
+        )
+        .join(models.Task, models.Task.subgoal_id == models.SubGoal.id)
+        .where(models.SubGoal.parent_goal_id.in_(select(page.c.id)))
+        .group_by(models.SubGoal.parent_goal_id)
+        .subquery()
+    )
+    counters = ["tasks_total", *status_counts, "tasks_overdue"]
+    stmt = (
+        select(
+            page,
+            *(func.coalesce(totals.c[name], 0).label(name) for name in counters),
+            totals.c.next_due,
+        )
+        .outerjoin(totals, totals.c.goal_id == page.c.id)
+        .order_by(page.c.id)
+    )
+    rows = db.execute(stmt).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].id)
+    return rows, None
+
+
 def create_goal(db: Session, goal: schemas.GoalCreate) -> models.Goal:
     """
     Create a new goal in the database.
@@ -67,8 +257,11 @@ def delete_goal(db: Session, goal_id: UUID) -> models.Goal | None:
     """
     db_goal = db.query(models.Goal).filter(models.Goal.id == goal_id).first()
     if db_goal:
+        sub_goal_ids = [sub_goal.id for sub_goal in db_goal.sub_goals]
         db.delete(db_goal)
         db.commit()
+        _clear_exists_cache(db)
+        invalidate_sub_goals(*sub_goal_ids)
     return db_goal
 
 
@@ -83,7 +276,7 @@ def get_sub_goal(db: Session, sub_goal_id: UUID) -> models.SubGoal | None:
     """
     return (
         db.query(models.SubGoal)
-        .options(joinedload(models.SubGoal.tasks))
+        .options(selectinload(models.SubGoal.tasks))
         .filter(models.SubGoal.id == sub_goal_id)
         .first()
     )
@@ -98,7 +291,7 @@ def get_sub_goals_by_goal(
     """
     return (
         db.query(models.SubGoal)
-        .options(joinedload(models.SubGoal.tasks))
+        .options(selectinload(models.SubGoal.tasks))
         .filter(models.SubGoal.parent_goal_id == goal_id)
         .offset(skip)
         .limit(limit)
@@ -106,6 +299,21 @@ def get_sub_goals_by_goal(
     )
 
 
+def get_sub_goals_page_by_goal(
+    db: Session, goal_id: UUID, cursor: str = "", limit: int = 100
+) -> tuple[list[models.SubGoal], str | None]:
+    """
+    Retrieve one keyset-paginated page of sub-goals for a specific goal,
+    with tasks eagerly loaded.
+    """
+    query = (
+        db.query(models.SubGoal)
+        .options(selectinload(models.SubGoal.tasks))
+        .filter(models.SubGoal.parent_goal_id == goal_id)
+    )
+    return _keyset_page(query, models.SubGoal.id, cursor, limit)
+
+
 def create_sub_goal(
     db: Session, sub_goal: schemas.SubGoalCreate, goal_id: UUID
 ) -> models.SubGoal:
@@ -119,6 +327,36 @@ def create_sub_goal(
     return db_sub_goal
 
 
+def create_sub_goals(
+    db: Session, sub_goals: list[schemas.SubGoalCreate], goal_id: UUID
+) -> list[models.SubGoal]:
+    """
+    Create several sub-goals for a given goal in a single transaction.
+    All rows are inserted with one flush and one commit, then reloaded
+    (with their tasks) in a single query instead of one refresh per row.
+    """
+    db_sub_goals = [
+        models.SubGoal(**sub_goal.model_dump(), parent_goal_id=goal_id)
+        for sub_goal in sub_goals
+    ]
+    if not db_sub_goals:
+        return []
+
+    db.add_all(db_sub_goals)
+    db.flush()
+    ids = [db_sub_goal.id for db_sub_goal in db_sub_goals]
+    db.commit()
+
+    # Repopulates the expired instances in the identity map in one round trip.
+    (
+        db.query(models.SubGoal)
+        .options(selectinload(models.SubGoal.tasks))
+        .filter(models.SubGoal.id.in_(ids))
+        .all()
+    )
+    return db_sub_goals
+
+
 def update_sub_goal(
     db: Session, db_sub_goal: models.SubGoal, sub_goal_in: schemas.SubGoalUpdate
 ) -> models.SubGoal:
@@ -132,6 +370,8 @@ def update_sub_goal(
     db.add(db_sub_goal)
     db.commit()
     db.refresh(db_sub_goal)
+    # Task durations are derived from the sub-goal's estimated effort.
+    invalidate_sub_goals(db_sub_goal.id)
     return db_sub_goal
 
 
@@ -143,11 +383,129 @@ def delete_sub_goal(db: Session, sub_goal_id: UUID) -> models.SubGoal | None:
         db.query(models.SubGoal).filter(models.SubGoal.id == sub_goal_id).first()
     )
     if db_sub_goal:
+        _adjust_progress(
+            db,
+            {sub_goal_id: (-db_sub_goal.tasks_done, -db_sub_goal.tasks_total)},
+            goals_only=True,
+        )
         db.delete(db_sub_goal)
         db.commit()
+        _clear_exists_cache(db)
+        invalidate_sub_goals(sub_goal_id)
     return db_sub_goal
 
 
+# =========================
+# Progress Rollup Functions
+# =========================
+
+# Goals and sub-goals store done/total task counters. Every task change adds
+# its deltas with `SET n = n + :delta` UPDATEs in the caller's transaction, so
+# keeping them current costs O(1) statements per change, whatever the number
+# of tasks, and progress_percentage is recomputed in the same statement.
+
+
+def _percentage(done, total):
+    return case((total > 0, done * 100 // total), else_=0)
+
+
+def _progress_values(model) -> dict:
+    done = model.tasks_done + bindparam("d_done", type_=Integer)
+    total = model.tasks_total + bindparam("d_total", type_=Integer)
+    return {
+        "tasks_done": done,
+        "tasks_total": total,
+        "progress_percentage": _percentage(done, total),
+    }
+
+
+_SUB_GOAL_PROGRESS = (
+    update(models.SubGoal)
+    .where(models.SubGoal.id == bindparam("sg_id"))
+    .values(_progress_values(models.SubGoal))
+)
+_GOAL_PROGRESS = (
+    update(models.Goal)
+    .where(
+        models.Goal.id
+        == select(models.SubGoal.parent_goal_id)
+        .where(models.SubGoal.id == bindparam("sg_id"))
+        .scalar_subquery()
+    )
+    .values(_progress_values(models.Goal))
+)
+
+
+def _is_done(status: models.TaskStatus | None) -> int:
+    return int(status == models.TaskStatus.DONE)
+
+
+def _adjust_progress(
+    db: Session, deltas: dict[UUID, tuple[int, int]], goals_only: bool = False
+) -> None:
+    """
+    Add `{sub_goal_id: (done delta, total delta)}` to the counters of each
+    sub-goal and of its goal. Does not commit.
+    """
+    params = [
+        {"sg_id": sub_goal_id, "d_done": done, "d_total": total}
+        for sub_goal_id, (done, total) in deltas.items()
+        if done or total
+    ]
+    if not params:
+        return
+    # Core executemany: one UPDATE per table, however many sub-goals changed.
+    connection = db.connection()
+    if not goals_only:
+        connection.execute(_SUB_GOAL_PROGRESS, params)
+    connection.execute(_GOAL_PROGRESS, params)
+
+
+def recompute_progress(db: Session) -> tuple[int, int]:
+    """
+    Rebuild every sub-goal's and goal's progress counters from the tasks,
+    e.g. to backfill them. Returns the number of sub-goals and goals updated.
+    """
+    def task_count(*conditions):
+        return (
+            select(func.count(models.Task.id))
+            .where(models.Task.subgoal_id == models.SubGoal.id, *conditions)
+            .scalar_subquery()
+        )
+
+    def sub_goal_sum(column):
+        return (
+            select(func.coalesce(func.sum(column), 0))
+            .where(models.SubGoal.parent_goal_id == models.Goal.id)
+            .scalar_subquery()
+        )
+
+    options = {"synchronize_session": False}
+    sub_goals = db.execute(
+        update(models.SubGoal).values(
+            tasks_done=task_count(models.Task.status == models.TaskStatus.DONE),
+            tasks_total=task_count(),
+        ),
+        execution_options=options,
+    ).rowcount
+    goals = db.execute(
+        update(models.Goal).values(
+            tasks_done=sub_goal_sum(models.SubGoal.tasks_done),
+            tasks_total=sub_goal_sum(models.SubGoal.tasks_total),
+        ),
+        execution_options=options,
+    ).rowcount
+    for model in (models.SubGoal, models.Goal):
+        db.execute(
+            update(model).values(
+                progress_percentage=_percentage(model.tasks_done, model.tasks_total)
+            ),
+            execution_options=options,
+        )
+    db.commit()
+    return sub_goals, goals
+
+
 # ====================
 # Task CRUD Functions
 # ====================
@@ -160,6 +518,42 @@ def get_task(db: Session, task_id: UUID) -> models.Task | None:
     return db.query(models.Task).filter(models.Task.id == task_id).first()
 
 
+def get_tasks_for_scheduling(db: Session, task_ids: list[UUID]) -> list[Row]:
+    """
+    Fetch the requested tasks in one query, together with their sub-goal's
+    `estimated_effort_minutes` and the number of tasks in that sub-goal
+    (`sibling_count`), computed in SQL. Unknown IDs are simply absent.
+    """
+    rows: list[Row] = []
+    for chunk in _chunks(list(set(task_ids)), 500):
+        sibling_counts = (
+            select(models.Task.subgoal_id, func.count().label("sibling_count"))
+            .where(
+                models.Task.subgoal_id.in_(
+                    select(models.Task.subgoal_id).where(models.Task.id.in_(chunk))
+                )
+            )
+            .group_by(models.Task.subgoal_id)
+            .subquery()
+        )
+        stmt = (
+            select(
+                models.Task.id,
+                models.Task.description,
+                models.Task.subgoal_id,
+                models.SubGoal.estimated_effort_minutes,
+                sibling_counts.c.sibling_count,
+            )
+            .outerjoin(models.SubGoal, models.SubGoal.id == models.Task.subgoal_id)
+            .outerjoin(
+                sibling_counts, sibling_counts.c.subgoal_id == models.Task.subgoal_id
+            )
+            .where(models.Task.id.in_(chunk))
+        )
+        rows.extend(db.execute(stmt).all())
+    return rows
+
+
 def get_tasks_by_sub_goal(
     db: Session, sub_goal_id: UUID, skip: int = 0, limit: int = 100
 ) -> list[models.Task]:
@@ -188,11 +582,68 @@ def create_task(
         db_task.actual_start = datetime.now(timezone.utc)
 
     db.add(db_task)
+    _adjust_progress(db, {sub_goal_id: (_is_done(db_task.status), 1)})
     db.commit()
     db.refresh(db_task)
+    # A new sibling shortens every task's share of the sub-goal's effort.
+    invalidate_sub_goals(sub_goal_id)
     return db_task
 
 
+def _new_task_row(task: schemas.TaskCreate, sub_goal_id: UUID, now: datetime) -> dict:
+    row = task.model_dump(exclude={"subgoal_id"})
+    row.setdefault("status", models.TaskStatus.TODO)
+    row.update(
+        id=uuid.uuid4(),
+        subgoal_id=sub_goal_id,
+        actual_start=None,
+        actual_end=None,
+        completed_at=None,
+    )
+    # If a task is created as IN_PROGRESS, mark the start time
+    if row["status"] == models.TaskStatus.IN_PROGRESS:
+        row["actual_start"] = now
+    return row
+
+
+def _insert_task_rows(db: Session, rows: list[dict]) -> list[dict]:
+    if rows:
+        db.execute(insert(models.Task), rows)
+        deltas: dict[UUID, tuple[int, int]] = {}
+        for row in rows:
+            done, total = deltas.get(row["subgoal_id"], (0, 0))
+            deltas[row["subgoal_id"]] = (done + _is_done(row["status"]), total + 1)
+        _adjust_progress(db, deltas)
+        db.commit()
+        invalidate_sub_goals(*{row["subgoal_id"] for row in rows})
+    return rows
+
+
+def create_tasks(
+    db: Session, tasks: list[schemas.TaskCreate], sub_goal_id: UUID
+) -> list[dict]:
+    """
+    Create many tasks for a given sub-goal with one batched insert.
+    Returns the inserted rows as dictionaries (matching the Task schema),
+    so no per-row refresh is needed.
+    """
+    now = datetime.now(timezone.utc)
+    return _insert_task_rows(db, [_new_task_row(t, sub_goal_id, now) for t in tasks])
+
+
+def create_tasks_for_sub_goals(
+    db: Session, tasks: list[schemas.TaskBulkCreate]
+) -> list[dict]:
+    """
+    Create many tasks, each under its own sub-goal, with one batched insert.
+    Parent sub-goals are expected to have been checked by the caller.
+    """
+    now = datetime.now(timezone.utc)
+    return _insert_task_rows(
+        db, [_new_task_row(t, t.subgoal_id, now) for t in tasks]
+    )
+
+
 def update_task(
     db: Session, db_task: models.Task, task_in: schemas.TaskUpdate
 ) -> models.Task:
@@ -215,12 +666,15 @@ def update_task(
     if update_data.get("status") == models.TaskStatus.IN_PROGRESS and db_task.status == models.TaskStatus.TODO:
         db_task.actual_start = datetime.now(timezone.utc)
 
+    was_done = _is_done(db_task.status)
     for key, value in update_data.items():
         setattr(db_task, key, value)
 
     db.add(db_task)
+    _adjust_progress(db, {db_task.subgoal_id: (_is_done(db_task.status) - was_done, 0)})
     db.commit()
     db.refresh(db_task)
+    invalidate_tasks(db_task.id)
     return db_task
 
 
@@ -230,8 +684,11 @@ def delete_task(db: Session, task_id: UUID) -> models.Task | None:
     """
     db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
     if db_task:
+        sub_goal_id = db_task.subgoal_id
+        _adjust_progress(db, {sub_goal_id: (-_is_done(db_task.status), -1)})
         db.delete(db_task)
         db.commit()
+        invalidate_sub_goals(sub_goal_id)
     return db_task
 
 
@@ -249,3 +706,299 @@ def get_tasks_by_date_range(
         )
         .all()
     )
+
+
+# ===================
+# Fast Read Functions
+# ===================
+
+# Read paths for the list endpoints that select only the columns of the
+# response schemas and build plain dicts from Core rows: no ORM instances,
+# identity map or pydantic validation. Keys and nesting match schemas.Goal,
+# schemas.SubGoal and schemas.Task, so the dicts can be serialized as is
+# (see responses.FastJSONResponse).
+
+_TASK_COLUMNS = (
+    models.Task.description,
+    models.Task.planned_start,
+    models.Task.planned_end,
+    models.Task.id,
+    models.Task.subgoal_id,
+    models.Task.status,
+    models.Task.actual_start,
+    models.Task.actual_end,
+    models.Task.completed_at,
+    models.Task.reminder_policy_id,
+)
+_SUB_GOAL_COLUMNS = (
+    models.SubGoal.description,
+    models.SubGoal.estimated_effort_minutes,
+    models.SubGoal.dependencies,
+    models.SubGoal.notes,
+    models.SubGoal.id,
+    models.SubGoal.parent_goal_id,
+    models.SubGoal.tasks_done,
+    models.SubGoal.tasks_total,
+    models.SubGoal.progress_percentage,
+)
+_GOAL_COLUMNS = (
+    models.Goal.title,
+    models.Goal.target_date,
+    models.Goal.methodology,
+    models.Goal.notes,
+    models.Goal.id,
+    models.Goal.tasks_done,
+    models.Goal.tasks_total,
+    models.Goal.progress_percentage,
+)
+
+
+def _dicts(db: Session, stmt) -> list[dict]:
+    result = db.execute(stmt)
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+
+def _keyset_dicts(
+    db: Session, stmt, id_column, cursor: str, limit: int
+) -> tuple[list[dict], str | None]:
+    """
+    Like _keyset_page, for a Core select returning dicts.
+    """
+    after_id = decode_cursor(cursor)
+    if after_id is not None:
+        stmt = stmt.where(id_column > after_id)
+    rows = _dicts(db, stmt.order_by(id_column).limit(limit + 1))
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1]["id"])
+    return rows, None
+
+
+def _attach_children(
+    db: Session, parents: list[dict], key: str, columns, parent_column
+) -> None:
+    """
+    Load the children of `parents` with batched `IN (...)` selects, the way
+    selectinload does, and store them as a list under `key` of each parent.
+    """
+    children: dict[UUID, list[dict]] = {parent["id"]: [] for parent in parents}
+    stmt = select(*columns, parent_column.label("_parent_id"))
+    for chunk in _chunks(list(children), 500):
+        for row in _dicts(db, stmt.where(parent_column.in_(chunk))):
+            children[row.pop("_parent_id")].append(row)
+    for parent in parents:
+        parent[key] = children[parent["id"]]
+
+
+class InvalidFieldsError(ValueError):
+    """Raised when a sparse fieldset names an unknown field or level."""
+
+
+_GOAL_TREE_LEVELS = (_GOAL_COLUMNS, _SUB_GOAL_COLUMNS, _TASK_COLUMNS)
+# Field prefixes naming the level of a goal tree a field belongs to.
+_GOAL_TREE_PREFIXES = {"": 0, "sub_goals": 1, "tasks": 2, "sub_goals.tasks": 2}
+
+
+def goal_tree_columns(depth: int = 2, fields: str | None = None) -> list[tuple]:
+    """
+    The columns to select at each level of a goal tree down to `depth`.
+
+    `fields` is an optional comma-separated sparse fieldset: plain names
+    select goal fields, `sub_goals.<name>` and `tasks.<name>` (or
+    `sub_goals.tasks.<name>`) those of the nested levels. A level with no
+    listed fields keeps all of them, and `id` is always included. Raises
+    InvalidFieldsError for unknown fields or fields below `depth`.
+    """
+    selected: list[set[str]] = [set() for _ in _GOAL_TREE_LEVELS]
+    for field in filter(None, (f.strip() for f in (fields or "").split(","))):
+        prefix, _, name = field.rpartition(".")
+        level = _GOAL_TREE_PREFIXES.get(prefix)
+        if level is None or name not in {c.key for c in _GOAL_TREE_LEVELS[level]}:
+            raise InvalidFieldsError(f"Unknown field '{field}'")
+        if level > depth:
+            raise InvalidFieldsError(f"Field '{field}' needs depth >= {level}")
+        selected[level].add(name)
+    return [
+        tuple(c for c in columns if not names or c.key in names or c.key == "id")
+        for columns, names in zip(_GOAL_TREE_LEVELS[: depth + 1], selected)
+    ]
+
+
+def _attach_goal_children(
+    db: Session, goals: list[dict], columns: list[tuple]
+) -> list[dict]:
+    # One query per level below the goals; none at all for depth 0.
+    if len(columns) > 1:
+        _attach_children(
+            db, goals, "sub_goals", columns[1], models.SubGoal.parent_goal_id
+        )
+    if len(columns) > 2:
+        sub_goals = [sub_goal for goal in goals for sub_goal in goal["sub_goals"]]
+        _attach_children(db, sub_goals, "tasks", columns[2], models.Task.subgoal_id)
+    return goals
+
+
+def get_goal_dict(
+    db: Session, goal_id: UUID, depth: int = 2, fields: str | None = None
+) -> dict | None:
+    """
+    get_goal as a plain dict, nested down to `depth` and restricted to
+    `fields` (see goal_tree_columns).
+    """
+    columns = goal_tree_columns(depth, fields)
+    goals = _dicts(db, select(*columns[0]).where(models.Goal.id == goal_id))
+    return _attach_goal_children(db, goals, columns)[0] if goals else None
+
+
+def get_goal_dicts(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    depth: int = 2,
+    fields: str | None = None,
+) -> list[dict]:
+    """
+    get_goals as plain dicts, nested down to `depth` and restricted to
+    `fields` (see goal_tree_columns).
+    """
+    columns = goal_tree_columns(depth, fields)
+    goals = _dicts(db, select(*columns[0]).offset(skip).limit(limit))
+    return _attach_goal_children(db, goals, columns)
+
+
+def get_goal_dicts_page(
+    db: Session,
+    cursor: str = "",
+    limit: int = 100,
+    depth: int = 2,
+    fields: str | None = None,
+) -> tuple[list[dict], str | None]:
+    """
+    Retrieve one keyset-paginated page of goals as plain dicts, nested down
+    to `depth` and restricted to `fields` (see goal_tree_columns). Returns the
+    goals and the cursor of the next page, if any.
+    """
+    columns = goal_tree_columns(depth, fields)
+    goals, next_cursor = _keyset_dicts(
+        db, select(*columns[0]), models.Goal.id, cursor, limit
+    )
+    return _attach_goal_children(db, goals, columns), next_cursor
+
+
+def get_task_dicts_by_sub_goal(
+    db: Session, sub_goal_id: UUID, skip: int = 0, limit: int = 100
+) -> list[dict]:
+    """
+    get_tasks_by_sub_goal as plain dicts.
+    """
+    stmt = (
+        select(*_TASK_COLUMNS)
+        .where(models.Task.subgoal_id == sub_goal_id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return _dicts(db, stmt)
+
+
+def get_task_dicts_page_by_sub_goal(
+    db: Session, sub_goal_id: UUID, cursor: str = "", limit: int = 100
+) -> tuple[list[dict], str | None]:
+    """
+    Retrieve one keyset-paginated page of tasks for a specific sub-goal, as
+    plain dicts.
+    """
+    stmt = select(*_TASK_COLUMNS).where(models.Task.subgoal_id == sub_goal_id)
+    return _keyset_dicts(db, stmt, models.Task.id, cursor, limit)
+
+
+def get_task_dicts_by_date_range(
+    db: Session, start_date: datetime, end_date: datetime
+) -> list[dict]:
+    """
+    get_tasks_by_date_range as plain dicts.
+    """
+    stmt = select(*_TASK_COLUMNS).where(
+        models.Task.planned_start >= start_date,
+        models.Task.planned_start <= end_date,
+    )
+    return _dicts(db, stmt)
+
+
+def iter_task_dicts_by_date_range(
+    db: Session, start_date: datetime, end_date: datetime, batch_size: int = 1000
+) -> Iterator[dict]:
+    """
+    Stream tasks that have a planned start date within a given date range,
+    ordered by planned start, as plain dicts. Rows are fetched `batch_size` at
+    a time (with a server-side cursor where the driver supports it), so memory
+    use stays bounded no matter how large the range is.
+    """
+    stmt = (
+        select(*_TASK_COLUMNS)
+        .where(
+            models.Task.planned_start >= start_date,
+            models.Task.planned_start <= end_date,
+        )
+        .order_by(models.Task.planned_start)
+        .execution_options(yield_per=batch_size)
+    )
+    result = db.execute(stmt)
+    keys = list(result.keys())
+    for row in result:
+        yield dict(zip(keys, row))
+
+
+# =============================
+# Saved Schedule CRUD Functions
+# =============================
+
+
+def get_user_schedule(db: Session, user_id: str) -> models.UserSchedule | None:
+    """
+    Retrieve the last schedule a user accepted, if any.
+    """
+    return db.get(models.UserSchedule, user_id)
+
+
+def save_user_schedule(
+    db: Session, user_id: str, entries: list[dict]
+) -> models.UserSchedule:
+    """
+    Store a user's accepted schedule, replacing the previous one.
+    """
+    db_schedule = db.get(models.UserSchedule, user_id)
+    if db_schedule is None:
+        db_schedule = models.UserSchedule(user_id=user_id)
+        db.add(db_schedule)
+    db_schedule.entries = entries
+    db_schedule.updated_at = datetime.now(timezone.utc)
+    db.commit()
+    return db_schedule
+
+
+def iter_finished_task_batches(
+    db: Session, batch_size: int = 10000
+) -> Iterator[list[Row]]:
+    """
+    Stream the planned and actual timestamps of every DONE or SKIPPED task
+    that had a planned start, `batch_size` rows at a time. Only the needed
+    columns are selected and no ORM objects are built, so memory use stays
+    bounded however long the history is.
+    """
+    stmt = (
+        select(
+            models.Task.planned_start,
+            models.Task.planned_end,
+            models.Task.actual_start,
+            models.Task.actual_end,
+            models.Task.completed_at,
+            models.Task.status,
+        )
+        .where(
+            models.Task.status.in_([models.TaskStatus.DONE, models.TaskStatus.SKIPPED]),
+            models.Task.planned_start.is_not(None),
+        )
+        .execution_options(yield_per=batch_size)
+    )
+    yield from db.execute(stmt).partitions()
@@ -1,17 +1,51 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from . import models
-from .database import engine
+from . import crud, models
+from .database import SessionLocal, engine
+from .manage import add_progress_columns
+from .ml.partitioned_optimizer import shutdown_window_pool
 from .routers import goals, subgoals, tasks, ml
 
 # This line creates the database tables based on the models defined in models.py
 # It will create the 'pathcraft.db' file in the root directory if it doesn't exist.
 models.Base.metadata.create_all(bind=engine)
+# create_all skips tables that already exist, so add any indexes introduced
+# after a database file was first created.
+for index in models.Task.__table__.indexes:
+    index.create(bind=engine, checkfirst=True)
+# Likewise the progress counters, which are then backfilled once from the tasks.
+if add_progress_columns(engine):
+    with SessionLocal() as db:
+        crud.recompute_progress(db)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create the reminder bandits and persist their rewards in the background
+    while the app runs. On shutdown, flush the rewards not yet written and
+    stop the optimization job workers and the shared window-solving pool.
+    """
+    reminder_manager = app.state.reminder_manager = ml.create_reminder_manager()
+    reminder_manager.start_write_behind(
+        interval_seconds=ml.REMINDER_FLUSH_INTERVAL_SECONDS,
+        max_pending=ml.REMINDER_FLUSH_MAX_PENDING,
+    )
+    try:
+        yield
+    finally:
+        reminder_manager.close()
+        ml.job_manager.shutdown()
+        shutdown_window_pool()
+
 
 app = FastAPI(
     title="PathCraft API",
     description="API for the PathCraft goal-setting and productivity application.",
     version="0.1.0 (MVP Phase 1)",
+    lifespan=lifespan,
 )
 
 # Include the routers
@@ -0,0 +1,69 @@
+"""
+Maintenance commands. Run from the pathcraft-api root:
+    python -m src.manage recompute-progress
+
+recompute-progress rebuilds the done/total task counters and the progress
+percentage of every goal and sub-goal from the tasks, adding the counter
+columns first if the database predates them.
+"""
+import argparse
+
+from sqlalchemy import inspect, text
+
+from . import crud, models
+from .database import SessionLocal, engine
+
+# create_all only creates missing tables, so columns added to an existing
+# table after a database file was created are added here.
+PROGRESS_COLUMNS = ("tasks_done", "tasks_total")
+
+
+def add_progress_columns(bind) -> list[str]:
+    """
+    Add the progress counter columns missing from the goals and sub_goals
+    tables. Returns the added columns as "table.column".
+    """
+    inspector = inspect(bind)
+    added = []
+    with bind.begin() as connection:
+        for table in (models.Goal.__table__, models.SubGoal.__table__):
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for name in PROGRESS_COLUMNS:
+                if name not in existing:
+                    connection.execute(text(
+                        f"ALTER TABLE {table.name} "
+                        f"ADD COLUMN {name} INTEGER NOT NULL DEFAULT 0"
+                    ))
+                    added.append(f"{table.name}.{name}")
+    return added
+
+
+def recompute_progress() -> tuple[int, int]:
+    models.Base.metadata.create_all(bind=engine)
+    add_progress_columns(engine)
+    db = SessionLocal()
+    try:
+        return crud.recompute_progress(db)
+    finally:
+        db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser(
+        "recompute-progress", help="rebuild the goal and sub-goal progress counters"
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "recompute-progress":
+        sub_goals, goals = recompute_progress()
+        print(f"Recomputed progress of {sub_goals} sub-goals and {goals} goals")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Offline replay evaluation of reminder bandit policies.
+
+A log of (user, arm, reward) events recorded while reminders were chosen
+uniformly at random is replayed against a candidate policy: for each event
+the policy picks an arm for that user, and only the events where it picked
+the logged arm count, both towards its estimated reward and as feedback for
+its own updates (Li et al., "Unbiased offline evaluation of contextual
+bandit-based news article recommendation algorithms"). With a uniform
+logging policy the estimate is unbiased, and about 1 / len(arms) of the
+events are used.
+
+Events are replayed in batches: the policy chooses for a whole batch from
+its state before the batch, the way the batch reminder endpoints do, and the
+matched rewards are applied at the end of the batch.
+
+Run from the pathcraft-api root, on a logged CSV (user_id,arm,reward) or on
+a synthetic log, which makes this the throughput benchmark of the policies:
+    python -m src.ml.bandit_replay --log rewards.csv
+    python -m src.ml.bandit_replay --events 1000000 --users 10000 \
+        --policy epsilon-greedy:0.05 --policy ucb1
+"""
+import argparse
+import csv
+import time
+
+import numpy as np
+
+REMINDER_ARMS = ['push_15_min', 'email_1_hour', 'sms_on_day']
+DEFAULT_BATCH_SIZE = 10000
+DEFAULT_POLICIES = ['epsilon-greedy:0.1', 'ucb1', 'thompson']
+
+
+class ReplayLog:
+    def __init__(self, users, arms, rewards, arm_names, user_ids=None):
+        """
+        users, arms: Integer arrays indexing user_ids and arm_names, one entry
+            per event.
+        rewards: Reward of each event, in [0, 1] for Thompson sampling.
+        user_ids: Names of the users, if known (synthetic logs have none).
+        """
+        self.users = np.asarray(users, dtype=np.int64)
+        self.arms = np.asarray(arms, dtype=np.int64)
+        self.rewards = np.asarray(rewards, dtype=np.float64)
+        self.arm_names = list(arm_names)
+        self.user_ids = user_ids
+        self.n_users = int(self.users.max()) + 1 if len(self.users) else 0
+
+    def __len__(self):
+        return len(self.users)
+
+    @classmethod
+    def from_events(cls, events):
+        """
+        Build a log from (user_id, arm, reward) tuples.
+        """
+        user_ids, arms, rewards = zip(*events)
+        user_names, users = np.unique(
+            np.array(user_ids, dtype=str), return_inverse=True
+        )
+        arm_names, arm_indices = np.unique(
+            np.array(arms, dtype=str), return_inverse=True
+        )
+        return cls(
+            users,
+            arm_indices,
+            np.array(rewards, dtype=float),
+            arm_names.tolist(),
+            user_names.tolist(),
+        )
+
+    def events(self):
+        user_ids = self.user_ids or [f'user_{i}' for i in range(self.n_users)]
+        for user, arm, reward in zip(self.users, self.arms, self.rewards):
+            yield user_ids[user], self.arm_names[arm], float(reward)
+
+
+def load_log(path):
+    """
+    Read a CSV log with user_id, arm and reward columns.
+    """
+    with open(path, newline='') as f:
+        rows = [
+            (row['user_id'], row['arm'], float(row['reward']))
+            for row in csv.DictReader(f)
+        ]
+    if not rows:
+        raise ValueError(f"{path} has no events")
+    return ReplayLog.from_events(rows)
+
+
+def save_log(log, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['user_id', 'arm', 'reward'])
+        writer.writerows(log.events())
+
+
+def synthetic_log(n_events, n_users=10000, arms=REMINDER_ARMS, seed=0, spread=0.1):
+    """
+    Generate a log with a uniform logging policy. Every user has their own
+    Bernoulli reward rate per arm: the arm's base rate (rising from 0.2 to
+    0.5 over `arms`) plus normal noise with standard deviation `spread`.
+    """
+    rng = np.random.default_rng(seed)
+    base = np.linspace(0.2, 0.5, len(arms))
+    rates = np.clip(base + rng.normal(0, spread, (n_users, len(arms))), 0, 1)
+    users = rng.integers(n_users, size=n_events)
+    logged_arms = rng.integers(len(arms), size=n_events)
+    rewards = (rng.random(n_events) < rates[users, logged_arms]).astype(np.float64)
+    return ReplayLog(users, logged_arms, rewards, arms)
+
+
+class ReplayPolicy:
+    """
+    A bandit policy over many users at once: per (user, arm) reward counts
+    and sums in two (users x arms) arrays.
+    """
+    name = 'policy'
+
+    def reset(self, n_users, n_arms):
+        self.counts = np.zeros((n_users, n_arms), dtype=np.int64)
+        self.sums = np.zeros((n_users, n_arms), dtype=np.float64)
+
+    def select(self, users, rng):
+        """
+        Arm index chosen for each entry of `users`.
+        """
+        raise NotImplementedError
+
+    def update(self, users, arms, rewards):
+        flat = users * self.counts.shape[1] + arms
+        cells, inverse = np.unique(flat, return_inverse=True)
+        self.counts.reshape(-1)[cells] += np.bincount(inverse)
+        self.sums.reshape(-1)[cells] += np.bincount(inverse, weights=rewards)
+
+
+class EpsilonGreedyPolicy(ReplayPolicy):
+    """
+    ReminderBandit's policy: a random arm with probability epsilon, otherwise
+    the arm with the highest mean reward (the first one on ties).
+    """
+
+    def __init__(self, epsilon=0.1):
+        self.epsilon = epsilon
+        self.name = f'epsilon-greedy:{epsilon:g}'
+
+    def select(self, users, rng):
+        values = self.sums[users] / np.maximum(self.counts[users], 1)
+        explore = rng.random(len(users)) < self.epsilon
+        random_arms = rng.integers(values.shape[1], size=len(users))
+        return np.where(explore, random_arms, values.argmax(axis=1))
+
+
+class UCB1Policy(ReplayPolicy):
+    """
+    Every arm once, then the arm maximizing mean + sqrt(c * ln(n) / n_arm).
+    """
+
+    def __init__(self, c=2.0):
+        self.c = c
+        self.name = 'ucb1' if c == 2.0 else f'ucb1:{c:g}'
+
+    def select(self, users, rng):
+        counts = self.counts[users]
+        total = np.maximum(counts.sum(axis=1, keepdims=True), 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means = self.sums[users] / counts
+            scores = means + np.sqrt(self.c * np.log(total) / counts)
+        scores[counts == 0] = np.inf
+        return scores.argmax(axis=1)
+
+
+class ThompsonSamplingPolicy(ReplayPolicy):
+    """
+    Draw from each arm's Beta(1 + successes, 1 + failures) posterior and play
+    the highest draw. Rewards must lie in [0, 1].
+    """
+    name = 'thompson'
+
+    def select(self, users, rng):
+        successes = self.sums[users]
+        failures = self.counts[users] - successes
+        return rng.beta(1 + successes, 1 + failures).argmax(axis=1)
+
+
+POLICIES = {
+    'epsilon-greedy': EpsilonGreedyPolicy,
+    'ucb1': UCB1Policy,
+    'thompson': ThompsonSamplingPolicy,
+}
+
+
+def make_policy(spec):
+    """
+    Build a policy from 'name' or 'name:parameter', e.g. 'epsilon-greedy:0.05'.
+    """
+    name, _, parameter = spec.partition(':')
+    if name not in POLICIES:
+        raise ValueError(f"Unknown policy {name!r}, expected one of {sorted(POLICIES)}")
+    if parameter and name == 'thompson':
+        raise ValueError("thompson takes no parameter")
+    return POLICIES[name](float(parameter)) if parameter else POLICIES[name]()
+
+
+def replay(log, policy, batch_size=DEFAULT_BATCH_SIZE, seed=0):
+    """
+    Replay `log` against `policy` (reset first). Returns a dict with the
+    number of events, the matched events, the estimated mean reward per
+    decision and the decisions per second.
+    """
+    rng = np.random.default_rng(seed)
+    policy.reset(log.n_users, len(log.arm_names))
+    matched = 0
+    reward = 0.0
+    started = time.perf_counter()
+    for start in range(0, len(log), batch_size):
+        users = log.users[start:start + batch_size]
+        arms = log.arms[start:start + batch_size]
+        rewards = log.rewards[start:start + batch_size]
+        hit = policy.select(users, rng) == arms
+        policy.update(users[hit], arms[hit], rewards[hit])
+        matched += int(hit.sum())
+        reward += float(rewards[hit].sum())
+    seconds = time.perf_counter() - started
+    return {
+        'policy': policy.name,
+        'events': len(log),
+        'matched': matched,
+        'mean_reward': reward / matched if matched else None,
+        'seconds': seconds,
+        'decisions_per_second': len(log) / seconds if seconds > 0 else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--log', default=None,
+                        help='CSV log to replay (default: a synthetic log)')
+    parser.add_argument('--events', type=int, default=1000000,
+                        help='synthetic events to generate')
+    parser.add_argument('--users', type=int, default=10000, help='synthetic users')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--policy', action='append', dest='policies',
+                        help="policy to evaluate, repeatable "
+                             f"(default: {' '.join(DEFAULT_POLICIES)})")
+    parser.add_argument('--save-log', default=None,
+                        help='also write the synthetic log to this CSV')
+    args = parser.parse_args(argv)
+
+    try:
+        policies = [make_policy(spec) for spec in args.policies or DEFAULT_POLICIES]
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.log:
+        log = load_log(args.log)
+    else:
+        log = synthetic_log(args.events, n_users=args.users, seed=args.seed)
+        if args.save_log:
+            save_log(log, args.save_log)
+
+    print(f"{len(log)} events, {log.n_users} users, arms {log.arm_names}; "
+          f"logged (uniform) mean reward {log.rewards.mean():.4f}")
+    print(f"{'policy':<22}{'matched':>10}{'mean reward':>14}{'decisions/s':>14}")
+    results = []
+    for policy in policies:
+        result = replay(log, policy, batch_size=args.batch_size, seed=args.seed)
+        mean_reward = 'n/a'
+        if result['mean_reward'] is not None:
+            mean_reward = f"{result['mean_reward']:.4f}"
+        print(f"{result['policy']:<22}{result['matched']:>10}{mean_reward:>14}"
+              f"{result['decisions_per_second']:>14,.0f}")
+        results.append(result)
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,381 @@
+"""
+Storage backends for ReminderBanditManager.
+
+A backend persists bandit states: plain dictionaries with 'user_id', 'arms'
+(in order), 'epsilon', 'counts' and 'values' (both keyed by arm).
+
+- JSONBanditStorage keeps every user in one JSON file (the original format).
+  Each save rewrites the file, atomically, so it suits small deployments and
+  migrations.
+- SQLBanditStorage keeps one row per (user, arm) in the application database
+  and upserts only the rows that changed, so a save costs the same whatever
+  the number of users. Rewards are added to the stored rows in the database
+  (count = count + :count), so several processes can record rewards for the
+  same user without overwriting each other.
+
+Migrate between them with export_json / import_json, or from the command line:
+    python -m src.ml.bandit_storage import bandit_data.json
+    python -m src.ml.bandit_storage export bandit_backup.json
+"""
+import json
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+
+from sqlalchemy import case, delete, insert, literal, select, update
+
+from ..models import ReminderBanditArm
+
+
+class BanditStorage(ABC):
+    """
+    Interface of a bandit storage backend.
+    """
+
+    @abstractmethod
+    def load(self, user_id):
+        """
+        Returns the state of one user's bandit, or None if it was never saved.
+        """
+
+    def load_many(self, user_ids):
+        """
+        Returns {user_id: state} for the given users that were ever saved.
+        """
+        states = {}
+        for user_id in user_ids:
+            state = self.load(user_id)
+            if state is not None:
+                states[user_id] = state
+        return states
+
+    def save(self, state, arms=None):
+        """
+        Persist a bandit state. With `arms`, only those arms changed.
+        """
+        self.save_many([state], arms=arms)
+
+    @abstractmethod
+    def save_many(self, states, arms=None):
+        """
+        Persist several bandit states at once. `arms` lists the changed arms,
+        either for every state or as {user_id: arms}; None means all arms.
+        """
+
+    def add_rewards(self, rows):
+        """
+        Add rewards to stored arms. Each row is a dict with 'user_id', 'arm',
+        'count' (the number of new rewards) and 'total' (their sum), plus the
+        'position' and 'epsilon' used if the arm is not stored yet.
+
+        The default merges the rows into the loaded states and saves those,
+        which is only safe while a single process writes to the storage.
+        """
+        states = self.load_many({row['user_id'] for row in rows})
+        changed = {}
+        for row in sorted(rows, key=lambda row: row['position']):
+            user_id, arm = row['user_id'], row['arm']
+            state = states.get(user_id)
+            if state is None:
+                state = states[user_id] = {
+                    'user_id': user_id, 'arms': [], 'epsilon': row['epsilon'],
+                    'counts': {}, 'values': {},
+                }
+            if arm not in state['counts']:
+                state['arms'].append(arm)
+                state['counts'][arm], state['values'][arm] = 0, 0.0
+            count = state['counts'][arm]
+            if row['count']:
+                state['counts'][arm] = count + row['count']
+                state['values'][arm] = (
+                    (state['values'][arm] * count + row['total']) / state['counts'][arm]
+                )
+            changed.setdefault(user_id, []).append(arm)
+        self.save_many(list(states.values()), arms=changed)
+
+    @abstractmethod
+    def load_all(self):
+        """
+        Yields every stored bandit state.
+        """
+
+
+class JSONBanditStorage(BanditStorage):
+    def __init__(self, path='bandit_data.json'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = None
+
+    def _read(self):
+        if self._data is None:
+            try:
+                with open(self.path, 'r') as f:
+                    self._data = json.load(f)
+            except FileNotFoundError:
+                self._data = {}
+        return self._data
+
+    def _write(self):
+        # Write a temporary file and rename it over the old one, so a crash
+        # mid-write never leaves a truncated file behind.
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(
+            dir=directory, prefix='.bandit_data.', suffix='.json'
+        )
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self._data, f, indent=4)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def load(self, user_id):
+        with self._lock:
+            data = self._read().get(user_id)
+        if data is None:
+            return None
+        return dict(data, user_id=user_id)
+
+    def save_many(self, states, arms=None):
+        with self._lock:
+            data = self._read()
+            for state in states:
+                data[state['user_id']] = {
+                    'arms': list(state['arms']),
+                    'epsilon': state['epsilon'],
+                    'counts': dict(state['counts']),
+                    'values': dict(state['values']),
+                }
+            self._write()
+
+    def load_all(self):
+        with self._lock:
+            data = dict(self._read())
+        for user_id, state in data.items():
+            yield dict(state, user_id=user_id)
+
+
+class SQLBanditStorage(BanditStorage):
+    # Users per IN (...) query in load_many.
+    LOAD_CHUNK_SIZE = 500
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def _dialect_insert(self):
+        # INSERT supporting ON CONFLICT, or None where the dialect has none.
+        dialect = self.engine.dialect.name
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        elif dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            return None
+        return dialect_insert(ReminderBanditArm)
+
+    def _upsert(self, connection, rows):
+        stmt = self._dialect_insert()
+        if stmt is not None:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ReminderBanditArm.user_id, ReminderBanditArm.arm],
+                set_={
+                    'position': stmt.excluded.position,
+                    'epsilon': stmt.excluded.epsilon,
+                    'count': stmt.excluded.count,
+                    'value': stmt.excluded.value,
+                },
+            )
+            connection.execute(stmt, rows)
+            return
+        # Other databases: replace the rows inside the same transaction.
+        for row in rows:
+            connection.execute(delete(ReminderBanditArm).where(
+                ReminderBanditArm.user_id == row['user_id'],
+                ReminderBanditArm.arm == row['arm'],
+            ))
+        connection.execute(insert(ReminderBanditArm), rows)
+
+    def load(self, user_id):
+        stmt = (
+            select(ReminderBanditArm)
+            .where(ReminderBanditArm.user_id == user_id)
+            .order_by(ReminderBanditArm.position)
+        )
+        with self.engine.connect() as connection:
+            rows = connection.execute(stmt).all()
+        if not rows:
+            return None
+        return _state_from_rows(user_id, rows)
+
+    def load_many(self, user_ids):
+        user_ids = list(dict.fromkeys(user_ids))
+        states = {}
+        with self.engine.connect() as connection:
+            for start in range(0, len(user_ids), self.LOAD_CHUNK_SIZE):
+                chunk = user_ids[start:start + self.LOAD_CHUNK_SIZE]
+                stmt = (
+                    select(ReminderBanditArm)
+                    .where(ReminderBanditArm.user_id.in_(chunk))
+                    .order_by(ReminderBanditArm.user_id, ReminderBanditArm.position)
+                )
+                for state in _group_states(connection.execute(stmt)):
+                    states[state['user_id']] = state
+        return states
+
+    def save_many(self, states, arms=None):
+        rows = []
+        for state in states:
+            if arms is None:
+                changed = state['arms']
+            elif isinstance(arms, dict):
+                changed = arms.get(state['user_id'], state['arms'])
+            else:
+                changed = arms
+            rows.extend(
+                {
+                    'user_id': state['user_id'],
+                    'arm': arm,
+                    'position': state['arms'].index(arm),
+                    'epsilon': state['epsilon'],
+                    'count': state['counts'][arm],
+                    'value': state['values'][arm],
+                }
+                for arm in changed
+            )
+        if rows:
+            with self.engine.begin() as connection:
+                self._upsert(connection, rows)
+
+    def add_rewards(self, rows):
+        # Increment the stored row instead of writing this process's copy of
+        # it, so concurrent writers never lose each other's rewards. The mean
+        # is merged in the same statement: the SET expressions all read the
+        # row as it was before the update.
+        if not rows:
+            return
+        values = [
+            {
+                'user_id': row['user_id'],
+                'arm': row['arm'],
+                'position': row['position'],
+                'epsilon': row['epsilon'],
+                'count': row['count'],
+                'value': row['total'] / row['count'] if row['count'] else 0.0,
+            }
+            for row in rows
+        ]
+        column = ReminderBanditArm.__table__.c
+        with self.engine.begin() as connection:
+            stmt = self._dialect_insert()
+            if stmt is not None:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[column.user_id, column.arm],
+                    set_={
+                        'count': column.count + stmt.excluded.count,
+                        'value': _merged_value(
+                            column.value, column.count,
+                            stmt.excluded.value, stmt.excluded.count,
+                        ),
+                    },
+                )
+                connection.execute(stmt, values)
+                return
+            # Other databases: update the row in place, inserting it if missing.
+            for row in values:
+                new_value, new_count = literal(row['value']), literal(row['count'])
+                result = connection.execute(
+                    update(ReminderBanditArm)
+                    .where(column.user_id == row['user_id'], column.arm == row['arm'])
+                    .values(
+                        count=column.count + new_count,
+                        value=_merged_value(
+                            column.value, column.count, new_value, new_count
+                        ),
+                    )
+                )
+                if result.rowcount == 0:
+                    connection.execute(insert(ReminderBanditArm), row)
+
+    def load_all(self):
+        stmt = select(ReminderBanditArm).order_by(
+            ReminderBanditArm.user_id, ReminderBanditArm.position
+        )
+        with self.engine.connect() as connection:
+            yield from _group_states(connection.execute(stmt))
+
+
+def _merged_value(value, count, new_value, new_count):
+    # Mean of `count` rewards averaging `value` and `new_count` averaging `new_value`.
+    return case(
+        (new_count == 0, value),
+        else_=(value * count + new_value * new_count) / (count + new_count),
+    )
+
+
+def _group_states(rows):
+    # Rows must be ordered by user, then position.
+    user_id, user_rows = None, []
+    for row in rows:
+        if row.user_id != user_id and user_rows:
+            yield _state_from_rows(user_id, user_rows)
+            user_rows = []
+        user_id = row.user_id
+        user_rows.append(row)
+    if user_rows:
+        yield _state_from_rows(user_id, user_rows)
+
+
+def _state_from_rows(user_id, rows):
+    return {
+        'user_id': user_id,
+        'arms': [row.arm for row in rows],
+        'epsilon': rows[0].epsilon,
+        'counts': {row.arm: row.count for row in rows},
+        'values': {row.arm: row.value for row in rows},
+    }
+
+
+def export_json(storage, path):
+    """
+    Write every bandit in `storage` to a JSON file in the original format.
+    Returns the number of bandits written.
+    """
+    target = JSONBanditStorage(path)
+    target._data = {}
+    states = list(storage.load_all())
+    target.save_many(states)
+    return len(states)
+
+
+def import_json(path, storage):
+    """
+    Copy every bandit from a JSON file in the original format into `storage`.
+    Returns the number of bandits imported.
+    """
+    states = list(JSONBanditStorage(path).load_all())
+    if states:
+        storage.save_many(states)
+    return len(states)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from ..database import engine
+    from ..models import Base
+
+    parser = argparse.ArgumentParser(
+        description='Move reminder bandits between bandit_data.json and the database.'
+    )
+    parser.add_argument('command', choices=['import', 'export'])
+    parser.add_argument('path')
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine, tables=[ReminderBanditArm.__table__])
+    storage = SQLBanditStorage(engine)
+    if args.command == 'import':
+        print(f"Imported {import_json(args.path, storage)} bandits from {args.path}")
+    else:
+        print(f"Exported {export_json(storage, args.path)} bandits to {args.path}")
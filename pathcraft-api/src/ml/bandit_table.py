@@ -0,0 +1,221 @@
+"""
+Array-backed epsilon-greedy bandits for many users sharing one set of arms.
+
+Where ReminderBandit keeps two dicts per user, BanditTable keeps every
+user's counts and values in one contiguous (users x arms) NumPy array each,
+addressed through a user -> row map. Selection and updates work on whole
+batches of users at once, and the arrays can be snapshotted to .npy files
+and memory-mapped back on restart instead of being re-parsed.
+
+ReminderBanditManager serves the reminder endpoints from one table per arm set.
+"""
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+META_FILE = 'meta.json'
+
+
+class BanditTable:
+    def __init__(self, arms, epsilon=0.1, capacity=1024, rng=None):
+        """
+        arms: The arms every user's bandit chooses from (one table per arm set).
+        epsilon: Exploration rate of users added to the table.
+        capacity: Initial number of rows; the arrays double when full.
+        rng: Optional numpy Generator, e.g. seeded for reproducible selection.
+        """
+        self.arms = list(arms)
+        self.epsilon = epsilon
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self._arm_index = {arm: k for k, arm in enumerate(self.arms)}
+        self.user_ids = []
+        self.user_rows = {}
+        self.counts = np.zeros((capacity, len(self.arms)), dtype=np.int64)
+        self.values = np.zeros((capacity, len(self.arms)), dtype=np.float64)
+        self.epsilons = np.full(capacity, epsilon, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def __contains__(self, user_id):
+        return user_id in self.user_rows
+
+    def _grow(self, size):
+        capacity = len(self.counts)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity)
+        used = len(self.user_ids)
+        # np.resize would repeat the data; copy into fresh (and writable) arrays.
+        for name, fill in (('counts', 0), ('values', 0.0), ('epsilons', self.epsilon)):
+            old = getattr(self, name)
+            new = np.full((capacity,) + old.shape[1:], fill, dtype=old.dtype)
+            new[:used] = old[:used]
+            setattr(self, name, new)
+
+    def rows(self, user_ids):
+        """
+        Row index of each user, adding unknown users with fresh bandits.
+        """
+        found = list(map(self.user_rows.get, user_ids))
+        if None not in found:
+            return np.array(found, dtype=np.int64)
+        rows = np.empty(len(user_ids), dtype=np.int64)
+        new_users = {}
+        for i, user_id in enumerate(user_ids):
+            row = self.user_rows.get(user_id)
+            if row is None:
+                row = new_users.setdefault(user_id, len(self.user_ids) + len(new_users))
+            rows[i] = row
+        if new_users:
+            # Grow before publishing the rows, so a reader that finds a row
+            # can always index the arrays with it.
+            self._grow(len(self.user_ids) + len(new_users))
+            self.user_ids.extend(new_users)
+            self.user_rows.update(new_users)
+        return rows
+
+    def arm_indices(self, arms):
+        try:
+            return np.fromiter(
+                (self._arm_index[arm] for arm in arms), dtype=np.int64, count=len(arms)
+            )
+        except KeyError as exc:
+            raise ValueError(
+                f"Unknown arm {exc.args[0]!r}, expected one of {self.arms}"
+            ) from None
+
+    def select_indices(self, user_ids):
+        """
+        Epsilon-greedy arm index for each user: with probability epsilon a
+        uniformly random arm, otherwise the one with the highest value.
+        """
+        rows = self.rows(user_ids)
+        greedy = self.values[rows].argmax(axis=1)
+        explore = self.rng.random(len(rows)) < self.epsilons[rows]
+        random_arms = self.rng.integers(len(self.arms), size=len(rows))
+        return np.where(explore, random_arms, greedy)
+
+    def select(self, user_ids):
+        """
+        Epsilon-greedy arm (by name) for each user.
+        """
+        return [self.arms[k] for k in self.select_indices(user_ids)]
+
+    def update(self, user_ids, arms, rewards, counts=None):
+        """
+        Record one reward per (user, arm) pair. A user and arm may appear more
+        than once; the result equals applying the rewards one at a time.
+        counts: If given, each entry instead stands for counts[i] rewards
+            adding up to rewards[i] (e.g. rewards already summed per pair).
+        """
+        flat = self.rows(user_ids) * len(self.arms) + self.arm_indices(arms)
+        cells, inverse = np.unique(flat, return_inverse=True)
+        n_new = np.bincount(inverse, weights=counts).astype(np.int64)
+        rewards = np.asarray(rewards, dtype=np.float64)
+        reward_sums = np.bincount(inverse, weights=rewards)
+
+        counts, values = self.counts.reshape(-1), self.values.reshape(-1)
+        old_counts = counts[cells]
+        total = old_counts + n_new
+        values[cells] = (values[cells] * old_counts + reward_sums) / total
+        counts[cells] = total
+
+    def update_one(self, user_id, arm, reward):
+        """
+        update() for a single reward, without the batch overhead.
+        """
+        if arm not in self._arm_index:
+            raise ValueError(f"Unknown arm {arm!r}, expected one of {self.arms}")
+        row, k = self.rows([user_id])[0], self._arm_index[arm]
+        n = self.counts[row, k] + 1
+        self.counts[row, k] = n
+        self.values[row, k] += (reward - self.values[row, k]) / n
+
+    def state(self, user_id):
+        """
+        The user's bandit as a storage state dict (see bandit_storage), or None.
+        """
+        row = self.user_rows.get(user_id)
+        if row is None:
+            return None
+        return {
+            'user_id': user_id,
+            'arms': list(self.arms),
+            'epsilon': float(self.epsilons[row]),
+            'counts': {arm: int(c) for arm, c in zip(self.arms, self.counts[row])},
+            'values': {arm: float(v) for arm, v in zip(self.arms, self.values[row])},
+        }
+
+    def states(self):
+        for user_id in self.user_ids:
+            yield self.state(user_id)
+
+    def load_states(self, states):
+        """
+        Add users from storage state dicts, or overwrite the ones already in
+        the table. Every state must have this table's arms.
+        """
+        states = list(states)
+        if not states:
+            return
+        rows = self.rows([state['user_id'] for state in states])
+        for name in ('counts', 'values'):
+            getattr(self, name)[rows] = [
+                [state[name][arm] for arm in self.arms] for state in states
+            ]
+        self.epsilons[rows] = [state['epsilon'] for state in states]
+
+    @classmethod
+    def from_states(cls, states, arms, epsilon=0.1, rng=None):
+        """
+        Build a table from storage state dicts, e.g. storage.load_all().
+        States whose arms differ from `arms` are skipped.
+        """
+        table = cls(arms, epsilon=epsilon, rng=rng)
+        table.load_states(s for s in states if list(s['arms']) == table.arms)
+        return table
+
+    def snapshot(self, directory):
+        """
+        Save the table as .npy files plus a small meta.json in `directory`.
+        The new snapshot is written next to the old one and swapped in by rename.
+        """
+        directory = Path(directory)
+        staging = directory.with_name(directory.name + '.tmp')
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        used = len(self.user_ids)
+        np.save(staging / 'user_ids.npy', np.array(self.user_ids, dtype=str))
+        np.save(staging / 'counts.npy', self.counts[:used])
+        np.save(staging / 'values.npy', self.values[:used])
+        np.save(staging / 'epsilons.npy', self.epsilons[:used])
+        meta = {'arms': self.arms, 'epsilon': self.epsilon}
+        (staging / META_FILE).write_text(json.dumps(meta))
+
+        retired = directory.with_name(directory.name + '.old')
+        shutil.rmtree(retired, ignore_errors=True)
+        if directory.exists():
+            os.rename(directory, retired)
+        os.rename(staging, directory)
+        shutil.rmtree(retired, ignore_errors=True)
+
+    @classmethod
+    def restore(cls, directory, mmap=True, rng=None):
+        """
+        Load a snapshot. With mmap the arrays are memory-mapped copy-on-write:
+        pages are read lazily, and updates stay in memory until the next snapshot.
+        """
+        directory = Path(directory)
+        meta = json.loads((directory / META_FILE).read_text())
+        mmap_mode = 'c' if mmap else None
+        table = cls(meta['arms'], epsilon=meta['epsilon'], capacity=0, rng=rng)
+        table.user_ids = np.load(directory / 'user_ids.npy').tolist()
+        table.user_rows = {user_id: row for row, user_id in enumerate(table.user_ids)}
+        table.counts = np.load(directory / 'counts.npy', mmap_mode=mmap_mode)
+        table.values = np.load(directory / 'values.npy', mmap_mode=mmap_mode)
+        table.epsilons = np.load(directory / 'epsilons.npy', mmap_mode=mmap_mode)
+        return table
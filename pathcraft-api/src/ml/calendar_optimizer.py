@@ -1,55 +1,460 @@
+import threading
+from bisect import bisect_right
+from datetime import timedelta
+
 from ortools.sat.python import cp_model
 
+
+class _IncumbentCallback(cp_model.CpSolverSolutionCallback):
+    """
+    Keeps the best solution CP-SAT has found so far, so a search that is cut
+    short by its deadline still returns its best incumbent.
+    """
+
+    def __init__(self, read_solution, on_solution=None):
+        super().__init__()
+        self._read_solution = read_solution
+        self._on_solution = on_solution
+        self.best_solution = None
+        self.best_objective = None
+
+    def on_solution_callback(self):
+        objective = self.ObjectiveValue()
+        if self.best_objective is not None and objective <= self.best_objective:
+            return
+        self.best_solution = self._read_solution(self.Value)
+        self.best_objective = objective
+        if self._on_solution is not None:
+            self._on_solution(self.best_solution[0], objective)
+
+
 class CalendarOptimizer:
-    def __init__(self, tasks, slots):
+    # CP-SAT objectives must be integral, so slot weights (e.g. productivity
+    # probabilities in [0, 1]) are scaled and rounded to integers.
+    WEIGHT_SCALE = 1000
+    # The interval engine prices tasks per weight level rather than per slot,
+    # so its model stays linear in the number of tasks.
+    WEIGHT_LEVELS = 20
+
+    # 'greedy': first-fit-decreasing over slots ranked by weight (fast, no solver).
+    # 'exact': CP-SAT over the full model.
+    # 'anytime': greedy answer as a hint, then CP-SAT improves it until the deadline.
+    MODES = ('greedy', 'exact', 'anytime')
+
+    # 'boolean': one 0/1 variable per (task, slot) pair with a capacity constraint
+    #     per slot; tasks are then laid out back-to-back inside their slot.
+    # 'interval': one start variable and interval per task on a single minute
+    #     timeline with AddNoOverlap; the start domain is the union of the slots the
+    #     task fits in. Weights are quantized to WEIGHT_LEVELS levels, so the model
+    #     grows linearly with the number of tasks, and it yields exact start times.
+    #     It is always warm-started from the greedy schedule.
+    ENGINES = ('boolean', 'interval')
+
+    def __init__(self, tasks, slots, slot_weights=None, time_limit_seconds=None,
+                 num_workers=None, mode='exact', on_solution=None, engine='boolean',
+                 hint=None, should_stop=None):
         """
         tasks: A list of tasks, where each task is a dictionary with 'name' and 'duration'.
         slots: A list of available time slots, where each slot is a dictionary with 'name', 'start', and 'end'.
+        slot_weights: Optional per-slot weights (e.g. predicted productivity).
+            When given, the optimizer maximizes the expected productive
+            minutes, sum(weight * duration). Without weights it only looks for
+            a feasible assignment.
+        time_limit_seconds: Optional wall-clock budget for the solver.
+        num_workers: Optional number of CP-SAT search workers.
+        mode: One of MODES.
+        on_solution: Optional callback(assignment, objective) called for every improving
+            solution (the greedy one included), e.g. to report progress.
+        engine: One of ENGINES, the CP-SAT formulation used by 'exact' and 'anytime'.
+        hint: Optional slot index (or None) per task, e.g. from a previous schedule,
+            passed to CP-SAT as a solution hint. In 'anytime' mode it takes
+            precedence over the greedy answer for the tasks it covers.
+        should_stop: Optional callable polled while CP-SAT runs; once it returns
+            True the search is stopped and the best solution so far is kept.
         """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown mode '{mode}', expected one of {self.MODES}")
+        if engine not in self.ENGINES:
+            raise ValueError(
+                f"Unknown engine '{engine}', expected one of {self.ENGINES}"
+            )
         self.tasks = tasks
         self.slots = slots
+        self.slot_weights = slot_weights
+        self.time_limit_seconds = time_limit_seconds
+        self.num_workers = num_workers
+        self.mode = mode
+        self.on_solution = on_solution
+        self.engine = engine
+        self.hint = hint
+        self.should_stop = should_stop
         self.model = cp_model.CpModel()
         self.solver = cp_model.CpSolver()
+        # Solver status name ('OPTIMAL', 'FEASIBLE', 'INFEASIBLE', ...) of the last run.
+        self.status = None
+        # Slot index chosen for each task by the last run, or None if it failed.
+        self.assignment = None
+        # (start, end) datetimes of each task from the last successful run.
+        self.task_times = None
 
-    def optimize(self):
+    def _slot_capacities(self):
+        # Duration in minutes
+        return [
+            int((slot['end'] - slot['start']).total_seconds() / 60)
+            for slot in self.slots
+        ]
+
+    def _scaled_weights(self):
+        if self.slot_weights is None:
+            return None
+        return [int(round(w * self.WEIGHT_SCALE)) for w in self.slot_weights]
+
+    def _objective_value(self, assignment):
+        weights = self._scaled_weights()
+        if weights is None:
+            return 0
+        return sum(
+            weights[j] * self.tasks[i]['duration'] for i, j in enumerate(assignment)
+        )
+
+    def _report(self, assignment, objective):
+        if self.on_solution is not None:
+            self.on_solution(assignment, objective)
+
+    def _sequence_within_slots(self, assignment):
         """
-        Find the optimal assignment of tasks to slots.
+        Lay the tasks of each slot out back-to-back from the slot's start.
         """
+        cursors = [slot['start'] for slot in self.slots]
+        task_times = []
+        for i, j in enumerate(assignment):
+            start = cursors[j]
+            cursors[j] = start + timedelta(minutes=self.tasks[i]['duration'])
+            task_times.append((start, cursors[j]))
+        return task_times
+
+    def greedy_assignment(self):
+        """
+        First-fit-decreasing bin packing: the longest tasks are placed first,
+        each into the highest-weighted slot that still has room for it.
+        Returns a list with the slot index of every task, or None if some task
+        does not fit anywhere.
+        """
+        remaining = self._slot_capacities()
+        weights = self.slot_weights
+        if weights is None:
+            weights = [0] * len(self.slots)
+        ranked_slots = sorted(range(len(self.slots)), key=lambda j: -weights[j])
+        order = sorted(range(len(self.tasks)), key=lambda i: -self.tasks[i]['duration'])
+
+        assignment = [None] * len(self.tasks)
+        for i in order:
+            duration = self.tasks[i]['duration']
+            for j in ranked_slots:
+                if remaining[j] >= duration:
+                    remaining[j] -= duration
+                    assignment[i] = j
+                    break
+            else:
+                return None
+        return assignment
+
+    def _build_boolean_model(self, hint=None):
+        """
+        Add the task x slot boolean formulation to self.model. Returns a function
+        that reads (assignment, task_times) from solver values.
+        """
+        capacities = self._slot_capacities()
+
         # Create the variables.
         # task_in_slot[i, j] is 1 if task i is assigned to slot j, and 0 otherwise.
+        # Slots that are too short for a task never get a variable for it.
         task_in_slot = {}
         for i, task in enumerate(self.tasks):
             for j, slot in enumerate(self.slots):
-                task_in_slot[i, j] = self.model.NewBoolVar(f'task_{i}_in_slot_{j}')
+                if task['duration'] <= capacities[j]:
+                    task_in_slot[i, j] = self.model.NewBoolVar(f'task_{i}_in_slot_{j}')
 
         # Each task must be assigned to exactly one slot.
         for i, task in enumerate(self.tasks):
-            self.model.Add(sum(task_in_slot[i, j] for j, slot in enumerate(self.slots)) == 1)
+            self.model.Add(sum(
+                task_in_slot[i, j]
+                for j in range(len(self.slots))
+                if (i, j) in task_in_slot
+            ) == 1)
 
         # The total duration of tasks in a slot must not exceed the slot's duration.
         for j, slot in enumerate(self.slots):
-            slot_duration = (slot['end'] - slot['start']).total_seconds() / 60 # Duration in minutes
-            self.model.Add(sum(task_in_slot[i, j] * self.tasks[i]['duration'] for i, task in enumerate(self.tasks)) <= int(slot_duration))
+            self.model.Add(sum(
+                task_in_slot[i, j] * self.tasks[i]['duration']
+                for i in range(len(self.tasks))
+                if (i, j) in task_in_slot
+            ) <= capacities[j])
+
+        # Maximize expected productivity if the slots are weighted.
+        weights = self._scaled_weights()
+        if weights is not None:
+            self.model.Maximize(sum(
+                var * weights[j] * self.tasks[i]['duration']
+                for (i, j), var in task_in_slot.items()
+            ))
+
+        if hint is not None:
+            for (i, j), var in task_in_slot.items():
+                if hint[i] is not None:
+                    self.model.AddHint(var, hint[i] == j)
+
+        def read_solution(value):
+            assignment = [None] * len(self.tasks)
+            for (i, j), var in task_in_slot.items():
+                if value(var):
+                    assignment[i] = j
+            return assignment, self._sequence_within_slots(assignment)
+
+        return read_solution
+
+    def _weight_levels(self):
+        """
+        Bucket the scaled slot weights into at most WEIGHT_LEVELS distinct values.
+        Returns (level of each slot, value of each level).
+        """
+        weights = self._scaled_weights()
+        distinct = sorted(set(weights))
+        if len(distinct) <= self.WEIGHT_LEVELS:
+            index = {w: level for level, w in enumerate(distinct)}
+            return [index[w] for w in weights], distinct
+        low, high = distinct[0], distinct[-1]
+        levels = [(w - low) * (self.WEIGHT_LEVELS - 1) // (high - low) for w in weights]
+        totals, counts = [0] * self.WEIGHT_LEVELS, [0] * self.WEIGHT_LEVELS
+        for level, w in zip(levels, weights):
+            totals[level] += w
+            counts[level] += 1
+        # Each level is priced at the mean weight of its slots.
+        values = [
+            totals[level] // counts[level] if counts[level] else 0
+            for level in range(self.WEIGHT_LEVELS)
+        ]
+        return levels, values
+
+    def _build_interval_model(self, hint=None):
+        """
+        Add the single-timeline interval formulation to self.model. Times are
+        whole minutes from the earliest slot start. Returns a function that reads
+        (assignment, task_times) from solver values, or None without building
+        anything if some task fits in no slot.
+        """
+        origin = min(slot['start'] for slot in self.slots) if self.slots else None
+        # Round slot bounds inwards to whole minutes.
+        slot_starts = [
+            -(-int((slot['start'] - origin).total_seconds()) // 60)
+            for slot in self.slots
+        ]
+        slot_ends = [
+            int((slot['end'] - origin).total_seconds()) // 60 for slot in self.slots
+        ]
+        slot_lengths = [end - start for start, end in zip(slot_starts, slot_ends)]
+        # Such a task would get an empty start domain, which CP-SAT rejects as
+        # MODEL_INVALID; the boolean model is simply infeasible.
+        longest = max(slot_lengths, default=0)
+        if any(task['duration'] > longest for task in self.tasks):
+            return None
+        if self.slot_weights is not None:
+            slot_levels, level_values = self._weight_levels()
+        else:
+            slot_levels, level_values = [0] * len(self.slots), [0]
+        # Start times can only be hinted for a complete assignment.
+        complete_hint = hint is not None and all(j is not None for j in hint)
+        hint_times = self._sequence_within_slots(hint) if complete_hint else None
+
+        # Domains only depend on the duration (and level), so build each once.
+        domains = {}
+
+        def start_domain(duration, level=None):
+            key = duration, level
+            if key not in domains:
+                domains[key] = cp_model.Domain.FromIntervals([
+                    [slot_starts[j], slot_ends[j] - duration]
+                    for j in range(len(self.slots))
+                    if slot_lengths[j] >= duration
+                    and (level is None or slot_levels[j] == level)
+                ])
+            return domains[key]
+
+        levels_by_duration = {}
+        start_vars, level_vars, intervals, objective_terms = [], [], [], []
+        for i, task in enumerate(self.tasks):
+            duration = task['duration']
+            # The start domain is the union of the feasible start ranges of every
+            # slot the task fits in, so it always lands entirely inside a slot.
+            start_var = self.model.NewIntVarFromDomain(
+                start_domain(duration), f'task_{i}_start'
+            )
+            intervals.append(self.model.NewFixedSizeIntervalVar(
+                start_var, duration, f'task_{i}_interval'
+            ))
+            if complete_hint:
+                hint_start = int((hint_times[i][0] - origin).total_seconds()) // 60
+                self.model.AddHint(start_var, hint_start)
+
+            # With weights, one literal per weight level (not per slot) says which
+            # group of equally-weighted slots the task starts in.
+            task_levels = {}
+            if self.slot_weights is not None:
+                if duration not in levels_by_duration:
+                    levels_by_duration[duration] = sorted({
+                        slot_levels[j] for j in range(len(self.slots))
+                        if slot_lengths[j] >= duration
+                    })
+                for level in levels_by_duration[duration]:
+                    in_level = self.model.NewBoolVar(f'task_{i}_level_{level}')
+                    self.model.AddLinearExpressionInDomain(
+                        start_var, start_domain(duration, level)
+                    ).OnlyEnforceIf(in_level)
+                    objective_terms.append(in_level * level_values[level] * duration)
+                    if hint is not None and hint[i] is not None:
+                        self.model.AddHint(in_level, slot_levels[hint[i]] == level)
+                    task_levels[level] = in_level
+                self.model.AddExactlyOne(task_levels.values())
+            start_vars.append(start_var)
+            level_vars.append(task_levels)
+
+        # One person, one timeline: no two tasks may overlap.
+        self.model.AddNoOverlap(intervals)
+
+        if objective_terms:
+            self.model.Maximize(sum(objective_terms))
+
+        by_start = sorted(range(len(self.slots)), key=lambda j: slot_starts[j])
+        sorted_starts = [slot_starts[j] for j in by_start]
+
+        def locate_slot(start, duration, level):
+            # Walk back from the last slot starting at or before `start`; with
+            # disjoint slots the first candidate is the answer.
+            for k in range(bisect_right(sorted_starts, start) - 1, -1, -1):
+                j = by_start[k]
+                fits = start + duration <= slot_ends[j]
+                if fits and (level is None or slot_levels[j] == level):
+                    return j
+            return None
+
+        def read_solution(value):
+            assignment, task_times = [], []
+            for i, var in enumerate(start_vars):
+                duration = self.tasks[i]['duration']
+                offset = value(var)
+                level = next(
+                    (level for level, lit in level_vars[i].items() if value(lit)), None
+                )
+                assignment.append(locate_slot(offset, duration, level))
+                start = origin + timedelta(minutes=offset)
+                task_times.append((start, start + timedelta(minutes=duration)))
+            return assignment, task_times
+
+        return read_solution
+
+    def _solve_cp_sat(self, hint=None):
+        """
+        Build the model for self.engine and solve it. Returns the best
+        (assignment, task_times) found, or None, and sets self.status.
+        """
+        if self.engine == 'interval':
+            read_solution = self._build_interval_model(hint)
+            if read_solution is None:
+                self.status = 'INFEASIBLE'
+                return None
+            # A full presolve of one long NoOverlap can eat the whole time budget
+            # before the warm start is even tried.
+            self.solver.parameters.max_presolve_iterations = 1
+        else:
+            read_solution = self._build_boolean_model(hint)
+
+        if self.time_limit_seconds is not None:
+            self.solver.parameters.max_time_in_seconds = self.time_limit_seconds
+        if self.num_workers is not None:
+            self.solver.parameters.num_workers = self.num_workers
 
         # Solve the model.
-        status = self.solver.Solve(self.model)
+        callback = _IncumbentCallback(read_solution, self._report)
+        solved = threading.Event()
+        if self.should_stop is not None:
+            threading.Thread(
+                target=self._watch_for_stop, args=(solved,), daemon=True
+            ).start()
+        try:
+            status = self.solver.Solve(self.model, callback)
+        finally:
+            solved.set()
+        self.status = self.solver.StatusName(status)
 
-        # Print the solution.
         if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
-            solution = {}
-            for j, slot in enumerate(self.slots):
-                solution[slot['name']] = []
-                for i, task in enumerate(self.tasks):
-                    if self.solver.Value(task_in_slot[i, j]) == 1:
-                        solution[slot['name']].append(task['name'])
-            return solution
+            if callback.best_solution is not None:
+                return callback.best_solution
+            return read_solution(self.solver.Value)
+        return None
+
+    def _watch_for_stop(self, solved, poll_seconds=0.05):
+        # Keep asking until Solve returns: a stop requested before the search
+        # has started would otherwise be lost.
+        while not solved.wait(poll_seconds):
+            if self.should_stop():
+                self.solver.StopSearch()
+
+    def optimize(self):
+        """
+        Find the optimal assignment of tasks to slots.
+        Returns a dictionary mapping each slot name to the names of its tasks,
+        or None if no assignment was found. The slot index and (start, end) of
+        every task are kept in self.assignment and self.task_times.
+        """
+        result = None
+        if self.mode == 'greedy':
+            greedy = self.greedy_assignment()
+            self.status = 'FEASIBLE' if greedy is not None else 'UNKNOWN'
+            if greedy is not None:
+                self._report(greedy, self._objective_value(greedy))
+                result = greedy, self._sequence_within_slots(greedy)
+        elif self.mode == 'anytime' or self.engine == 'interval':
+            greedy = self.greedy_assignment()
+            if greedy is not None:
+                self._report(greedy, self._objective_value(greedy))
+            hint = greedy
+            if self.hint is not None:
+                hint = [
+                    j if j is not None else (greedy[i] if greedy is not None else None)
+                    for i, j in enumerate(self.hint)
+                ]
+            result = self._solve_cp_sat(hint=hint)
+            if greedy is not None and (
+                result is None
+                or self._objective_value(result[0]) < self._objective_value(greedy)
+            ):
+                # CP-SAT ran out of time (or, on the interval engine's quantized
+                # weights, settled) before beating the greedy schedule.
+                result = greedy, self._sequence_within_slots(greedy)
+                self.status = 'FEASIBLE'
         else:
+            result = self._solve_cp_sat(hint=self.hint)
+
+        if result is None:
+            self.assignment, self.task_times = None, None
             return None
 
+        self.assignment, self.task_times = result
+        solution = {slot['name']: [] for slot in self.slots}
+        for i, j in enumerate(self.assignment):
+            solution[self.slots[j]['name']].append(self.tasks[i]['name'])
+        return solution
+
+
 if __name__ == '__main__':
+    from datetime import datetime
+
     # Example usage
-    tasks = [{'name': 'Task 1', 'duration': 2}, {'name': 'Task 2', 'duration': 1}]
-    slots = [{'name': 'Slot A', 'start': 9, 'end': 12}, {'name': 'Slot B', 'start': 13, 'end': 15}]
+    now = datetime.now()
+    tasks = [{'name': 'Task 1', 'duration': 120}, {'name': 'Task 2', 'duration': 60}]
+    slots = [{'name': 'Slot A', 'start': now, 'end': now + timedelta(hours=3)},
+             {'name': 'Slot B', 'start': now + timedelta(hours=4),
+              'end': now + timedelta(hours=6)}]
 
     optimizer = CalendarOptimizer(tasks, slots)
     solution = optimizer.optimize()
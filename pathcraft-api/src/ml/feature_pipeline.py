@@ -0,0 +1,89 @@
+import numpy as np
+
+from .. import crud
+from ..models import TaskStatus
+from .slot_selector import SlotSelector
+
+# Columns of every feature block.
+FEATURES = ('hour', 'weekday', 'lateness_minutes', 'duration_ratio')
+# A finished task counts as productive if it was done, started at most this
+# late and took at most this multiple of its planned time.
+PRODUCTIVE_MAX_LATENESS_MINUTES = 30
+PRODUCTIVE_MAX_DURATION_RATIO = 1.5
+DEFAULT_BATCH_SIZE = 10000
+
+
+def _seconds(values):
+    return np.array(
+        [v.timestamp() if v is not None else np.nan for v in values], dtype=float
+    )
+
+
+def feature_block(rows):
+    """
+    Turn a batch of rows from crud.iter_finished_task_batches into (X, y).
+    X has one column per FEATURES entry:
+      hour, weekday: of the planned start
+      lateness_minutes: actual start minus planned start (0 if never started)
+      duration_ratio: actual over planned duration (1 if either is unknown)
+    y is 1 for productive tasks (see PRODUCTIVE_*) and 0 otherwise.
+    """
+    planned_start = _seconds(row.planned_start for row in rows)
+    planned_end = _seconds(row.planned_end for row in rows)
+    actual_start = _seconds(row.actual_start for row in rows)
+    finished = _seconds(row.completed_at or row.actual_end for row in rows)
+
+    hour = np.array([row.planned_start.hour for row in rows], dtype=float)
+    weekday = np.array([row.planned_start.weekday() for row in rows], dtype=float)
+    lateness = np.nan_to_num((actual_start - planned_start) / 60, nan=0.0)
+    planned = planned_end - planned_start
+    actual = finished - actual_start
+    known = np.isfinite(planned) & np.isfinite(actual) & (planned > 0)
+    ratio = np.ones(len(rows))
+    ratio[known] = actual[known] / planned[known]
+
+    done = np.array([row.status == TaskStatus.DONE for row in rows])
+    y = (
+        done
+        & (lateness <= PRODUCTIVE_MAX_LATENESS_MINUTES)
+        & (ratio <= PRODUCTIVE_MAX_DURATION_RATIO)
+    ).astype(int)
+    return np.column_stack([hour, weekday, lateness, ratio]), y
+
+
+def iter_feature_blocks(db, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Stream (X, y) blocks of at most `batch_size` finished tasks from the DB.
+    """
+    for rows in crud.iter_finished_task_batches(db, batch_size):
+        yield feature_block(rows)
+
+
+def incremental_slot_model():
+    """
+    Default estimator for train_slot_selector_from_history: a categorical
+    naive Bayes over (hour, weekday), whose partial_fit just adds up counts.
+    """
+    from sklearn.naive_bayes import CategoricalNB
+
+    return CategoricalNB(min_categories=[SlotSelector.HOURS, SlotSelector.WEEKDAYS])
+
+
+def train_slot_selector_from_history(db, batch_size=DEFAULT_BATCH_SIZE, model=None):
+    """
+    Train a SlotSelector on the (hour, weekday) of every finished task, one
+    block at a time, so memory use is bounded by batch_size rather than by
+    the size of the history. `model` must support partial_fit.
+    Returns (selector, number of tasks trained on).
+    """
+    if model is None:
+        model = incremental_slot_model()
+    selector = SlotSelector(model=model)
+    n_samples = 0
+    for X, y in iter_feature_blocks(db, batch_size):
+        selector.partial_train(X[:, :2].astype(int), y)
+        n_samples += len(y)
+    if n_samples == 0:
+        raise ValueError("No finished tasks with a planned start to train on")
+    selector.compile()
+    return selector, n_samples
@@ -0,0 +1,216 @@
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+# Job life cycle: queued -> running -> succeeded | failed | cancelled.
+FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a job is submitted while every worker and queue slot is taken."""
+
+
+# Set in each worker process by _init_worker.
+_progress_queue = None
+_cancel_flags = None
+
+
+def _init_worker(progress_queue, cancel_flags):
+    global _progress_queue, _cancel_flags
+    _progress_queue = progress_queue
+    _cancel_flags = cancel_flags
+
+
+def _run_job(job_id, slot, factory, args, kwargs):
+    """
+    Build an optimizer with factory(*args, **kwargs) and run it, reporting
+    progress back to the parent. Runs in a worker process.
+    """
+    if _cancel_flags[slot]:
+        return None
+    _progress_queue.put((job_id, 'status', {'status': 'running'}))
+
+    def on_solution(assignment, objective):
+        _progress_queue.put((job_id, 'incumbent', {'objective': objective}))
+
+    def should_stop():
+        return bool(_cancel_flags[slot])
+
+    optimizer = factory(
+        *args, on_solution=on_solution, should_stop=should_stop, **kwargs
+    )
+    optimizer.optimize()
+    return optimizer.status, optimizer.assignment, optimizer.task_times
+
+
+class Job:
+    def __init__(self, job_id, context=None, on_success=None):
+        self.id = job_id
+        self.status = 'queued'
+        # Progress events as {'event': ..., 'data': ...}, in arrival order.
+        self.events = [{'event': 'status', 'data': {'status': 'queued'}}]
+        self.best_objective = None
+        # (status, assignment, task_times) of the optimizer once succeeded.
+        self.result = None
+        self.error = None
+        # Whatever the caller needs to turn the result into a response.
+        self.context = context if context is not None else {}
+        self.on_success = on_success
+        self.created_at = time.time()
+        self.future = None
+        self.slot = None
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATUSES
+
+
+class JobManager:
+    """
+    Runs optimizer jobs on a bounded local process pool, so long solves never
+    occupy the web server's threads.
+
+    At most max_workers jobs run at once and at most max_queued more wait for a
+    worker; beyond that submit() raises QueueFullError. Workers report their
+    progress (start, every incumbent) over a multiprocessing queue, and a
+    running job is cancelled through a shared flag that its optimizer polls.
+    No broker is involved: jobs live in this process and are lost on restart.
+    """
+
+    def __init__(self, max_workers=2, max_queued=16, max_finished=1000):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.max_finished = max_finished
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        # One cancel flag per job that can be in the system at the same time.
+        self._free_slots = list(range(max_workers + max_queued))
+        self._executor = None
+        self._progress_queue = None
+        self._cancel_flags = None
+
+    def _start(self):
+        # 'spawn' keeps workers clear of locks held by the server's threads
+        # at fork time.
+        context = multiprocessing.get_context('spawn')
+        self._progress_queue = context.Queue()
+        self._cancel_flags = context.Array('b', len(self._free_slots), lock=False)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._progress_queue, self._cancel_flags),
+        )
+        threading.Thread(target=self._listen, daemon=True).start()
+
+    def _listen(self):
+        while True:
+            message = self._progress_queue.get()
+            if message is None:
+                return
+            job_id, event, data = message
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job.finished:
+                    continue
+                if event == 'status':
+                    job.status = data['status']
+                elif event == 'incumbent':
+                    job.best_objective = data['objective']
+                job.events.append({'event': event, 'data': data})
+
+    def submit(self, factory, args=(), kwargs=None, context=None, on_success=None):
+        """
+        Queue factory(*args, **kwargs).optimize() and return its Job at once.
+        factory and its arguments must be picklable, and the optimizer must
+        accept the on_solution and should_stop options of CalendarOptimizer.
+
+        on_success: Optional callable(job), run exactly once when the job
+            succeeds, before the job is reported as succeeded (e.g. to store
+            its result). It runs without the manager lock, so a slow write
+            never holds up polls, event streams or submit(). If it raises,
+            the job fails with that error.
+        """
+        with self._lock:
+            if not self._free_slots:
+                pending = self.max_workers + self.max_queued
+                raise QueueFullError(f"{pending} optimization jobs are already pending")
+            if self._executor is None:
+                self._start()
+            job = Job(uuid.uuid4().hex, context, on_success)
+            job.slot = self._free_slots.pop()
+            self._cancel_flags[job.slot] = 0
+            self._jobs[job.id] = job
+            job.future = self._executor.submit(
+                _run_job, job.id, job.slot, factory, args, kwargs or {}
+            )
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+        return job
+
+    def _finish(self, job, future):
+        error = None
+        with self._lock:
+            if future.cancelled() or self._cancel_flags[job.slot]:
+                status = 'cancelled'
+            elif future.exception() is not None:
+                status, error = 'failed', str(future.exception())
+            else:
+                status, job.result = 'succeeded', future.result()
+        if status == 'succeeded' and job.on_success is not None:
+            try:
+                job.on_success(job)
+            except Exception as exc:
+                status, error = 'failed', str(exc)
+        with self._lock:
+            job.status, job.error = status, error
+            job.events.append({'event': 'status', 'data': {'status': job.status}})
+            self._free_slots.append(job.slot)
+
+            finished = [job_id for job_id, j in self._jobs.items() if j.finished]
+            for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+                del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def events_since(self, job_id, index):
+        """
+        Returns (events after `index`, finished) for a job, read atomically,
+        or None if there is no such job (any more: finished jobs are evicted).
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return job.events[index:], job.finished
+
+    def cancel(self, job_id):
+        """
+        Cancel a queued or running job. A running solve stops at its next
+        check and its partial result is discarded. Returns the job, or None.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return job
+            self._cancel_flags[job.slot] = 1
+        job.future.cancel()
+        return job
+
+    def shutdown(self):
+        """
+        Cancel everything and stop the worker processes.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+            if executor is None:
+                return
+            for job in self._jobs.values():
+                if not job.finished:
+                    self._cancel_flags[job.slot] = 1
+        executor.shutdown(wait=True, cancel_futures=True)
+        self._progress_queue.put(None)
@@ -0,0 +1,178 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+SLOT_SELECTOR = 'slot_selector'
+# Version reported for the model trained in-process when nothing is published.
+FALLBACK_VERSION = 'fallback'
+FALLBACK_SEED = 0
+
+DEFAULT_MODEL_DIR = Path(__file__).resolve().parents[2] / 'models'
+MODEL_FILE = 'model.joblib'
+METADATA_FILE = 'metadata.json'
+LATEST_FILE = 'LATEST'
+
+
+def model_dir():
+    return Path(os.environ.get('PATHCRAFT_MODEL_DIR', DEFAULT_MODEL_DIR))
+
+
+def _write_atomic(path, text):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+    with os.fdopen(fd, 'w') as f:
+        f.write(text)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+class ModelRegistry:
+    """
+    Versioned model artifacts on disk, loaded lazily and at most once.
+
+    Layout: <root>/<name>/<version>/model.joblib (+ metadata.json), with
+    <root>/<name>/LATEST naming the version served by default. A version
+    directory is written under a temporary name and renamed into place, and
+    LATEST is swapped atomically, so readers never see a half-written model.
+    Artifacts are stored uncompressed so their NumPy arrays can be memory-mapped
+    and shared between worker processes through the page cache.
+    """
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root is not None else model_dir()
+        self._lock = threading.Lock()
+        # name -> (version, model)
+        self._loaded = {}
+
+    def publish(self, name, model, metadata=None, version=None):
+        """
+        Store `model` as a new version of `name` and make it the latest.
+        Returns the version.
+        """
+        version = version or datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+        model_root = self.root / name
+        model_root.mkdir(parents=True, exist_ok=True)
+        target = model_root / version
+        if target.exists():
+            raise FileExistsError(f"{name} version {version} is already published")
+
+        staging = Path(tempfile.mkdtemp(dir=model_root, prefix=f'.{version}.'))
+        try:
+            joblib.dump(model, staging / MODEL_FILE)
+            metadata = dict(metadata or {}, name=name, version=version,
+                            published_at=datetime.now(timezone.utc).isoformat())
+            (staging / METADATA_FILE).write_text(json.dumps(metadata, indent=2))
+            # mkdtemp creates owner-only directories; serving processes may run
+            # as another user.
+            os.chmod(staging, 0o755)
+            os.rename(staging, target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        _write_atomic(model_root / LATEST_FILE, version)
+        return version
+
+    def latest_version(self, name):
+        try:
+            return (self.root / name / LATEST_FILE).read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def versions(self, name):
+        model_root = self.root / name
+        if not model_root.is_dir():
+            return []
+        return sorted(
+            p.name for p in model_root.iterdir()
+            if p.is_dir() and not p.name.startswith('.')
+        )
+
+    def metadata(self, name, version=None):
+        version = version or self.latest_version(name)
+        return json.loads((self.root / name / version / METADATA_FILE).read_text())
+
+    def load(self, name, version=None):
+        """
+        Read a version (default: the latest) of `name` from disk.
+        """
+        version = version or self.latest_version(name)
+        if version is None:
+            raise FileNotFoundError(f"No published version of {name} in {self.root}")
+        return joblib.load(self.root / name / version / MODEL_FILE, mmap_mode='r')
+
+    def get(self, name, fallback=None, prepare=None):
+        """
+        The latest version of `name`, loaded on first use and kept in memory.
+        Returns (version, model). If nothing is published, `fallback()` builds
+        the model instead (reported as FALLBACK_VERSION). `prepare(model)` is
+        applied once to a model loaded from disk.
+        """
+        with self._lock:
+            if name not in self._loaded:
+                version = self.latest_version(name)
+                if version is not None:
+                    model = self.load(name, version)
+                    if prepare is not None:
+                        prepare(model)
+                    self._loaded[name] = version, model
+                elif fallback is not None:
+                    logger.warning(
+                        "No published %s model in %s, training a fallback",
+                        name, self.root,
+                    )
+                    self._loaded[name] = FALLBACK_VERSION, fallback()
+                else:
+                    raise FileNotFoundError(
+                        f"No published version of {name} in {self.root}"
+                    )
+            return self._loaded[name]
+
+    def reload(self, name=None):
+        """
+        Forget loaded models so the next get() picks up newly published versions.
+        """
+        with self._lock:
+            if name is None:
+                self._loaded.clear()
+            else:
+                self._loaded.pop(name, None)
+
+
+def train_fallback_slot_selector():
+    """
+    Train a SlotSelector on seeded dummy data, so every process that has to
+    fall back ends up with the same model.
+    """
+    from .slot_selector import SlotSelector, get_dummy_data
+
+    selector = SlotSelector()
+    selector.train(*get_dummy_data(seed=FALLBACK_SEED))
+    return selector
+
+
+model_registry = ModelRegistry()
+
+
+def _compile_slot_selector(selector):
+    # Artifacts published before the lookup table existed are compiled on load.
+    if getattr(selector, 'table', None) is None:
+        selector.compile()
+
+
+def get_slot_selector(registry=None):
+    """
+    Returns (version, SlotSelector) from the registry.
+    """
+    return (registry or model_registry).get(
+        SLOT_SELECTOR,
+        fallback=train_fallback_slot_selector,
+        prepare=_compile_slot_selector,
+    )
@@ -0,0 +1,274 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .calendar_optimizer import CalendarOptimizer
+from .rescheduling import ScheduleRepairer
+
+# Window solves share one process pool for the life of the server, sized to
+# the machine, instead of starting (and tearing down) workers per request.
+WINDOW_POOL_WORKERS = os.cpu_count() or 1
+# Share of the time budget kept for reconciliation when the first pass
+# already left tasks unplaced.
+RECONCILE_SHARE = 0.25
+
+_window_pool = None
+_window_pool_lock = threading.Lock()
+
+
+def window_pool():
+    """
+    The shared window-solving pool, started on first use.
+    """
+    global _window_pool
+    with _window_pool_lock:
+        if _window_pool is None:
+            # 'spawn' keeps workers clear of locks held by the server's
+            # threads at fork time, as in jobs.JobManager.
+            _window_pool = ProcessPoolExecutor(
+                max_workers=WINDOW_POOL_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _window_pool
+
+
+def shutdown_window_pool():
+    """
+    Stop the shared pool's workers; the next optimize() starts a new pool.
+    """
+    global _window_pool
+    with _window_pool_lock:
+        pool, _window_pool = _window_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _day_key(slot):
+    return slot['start'].date()
+
+
+def _week_key(slot):
+    return slot['start'].isocalendar()[:2]
+
+
+def group_slots(slots, partition='day'):
+    """
+    Group slot indices into windows by calendar day or ISO week of their start.
+    Windows are returned in chronological order.
+    """
+    if partition == 'day':
+        key = _day_key
+    elif partition == 'week':
+        key = _week_key
+    else:
+        raise ValueError(
+            f"Unknown partition '{partition}', "
+            f"expected one of {PartitionedOptimizer.PARTITIONS}"
+        )
+    windows = {}
+    for j in sorted(range(len(slots)), key=lambda j: slots[j]['start']):
+        windows.setdefault(key(slots[j]), []).append(j)
+    return list(windows.values())
+
+
+def pre_assign(tasks, slots, slot_weights=None):
+    """
+    First-fit-decreasing over slots ranked by weight, like
+    CalendarOptimizer.greedy_assignment, but tasks that fit nowhere are left
+    unassigned (None) instead of failing the whole run.
+    """
+    remaining = [
+        int((slot['end'] - slot['start']).total_seconds() / 60) for slot in slots
+    ]
+    weights = slot_weights if slot_weights is not None else [0] * len(slots)
+    ranked_slots = sorted(range(len(slots)), key=lambda j: -weights[j])
+    assignment = [None] * len(tasks)
+    for i in sorted(range(len(tasks)), key=lambda i: -tasks[i]['duration']):
+        for j in ranked_slots:
+            if remaining[j] >= tasks[i]['duration']:
+                remaining[j] -= tasks[i]['duration']
+                assignment[i] = j
+                break
+    return assignment
+
+
+def _solve_window(tasks, slots, slot_weights, options):
+    # Runs in a worker process, so everything in and out must be picklable.
+    optimizer = CalendarOptimizer(
+        tasks, slots, slot_weights=slot_weights, **options
+    )
+    optimizer.optimize()
+    return optimizer.status, optimizer.assignment, optimizer.task_times
+
+
+class PartitionedOptimizer:
+    """
+    Splits a large scheduling problem into independent windows of slots
+    (one per day or week) and solves the windows in parallel.
+
+    1. A capacity-aware first-fit-decreasing pass assigns each task to a slot,
+       which decides its window. Every window therefore gets a set of tasks
+       that is known to fit.
+    2. Each window is solved by its own CalendarOptimizer on the shared
+       window pool, free to rearrange its tasks across its own slots.
+    3. Tasks the first pass could not place are reconciled afterwards by a
+       ScheduleRepairer that keeps the window results pinned and solves the
+       leftovers over the remaining gaps (or, failing that, re-solves everything).
+
+    Exposes the same optimize() / status / assignment / task_times interface
+    as CalendarOptimizer.
+    """
+
+    PARTITIONS = ('day', 'week')
+
+    def __init__(self, tasks, slots, slot_weights=None, partition='day',
+                 max_workers=None, time_limit_seconds=None, num_workers=None,
+                 **optimizer_options):
+        """
+        tasks, slots, slot_weights: As for CalendarOptimizer.
+        partition: One of PARTITIONS.
+        max_workers: Windows solved at once on the shared pool, at most (and
+            by default) WINDOW_POOL_WORKERS. With 1 they are solved in this
+            process, e.g. inside a job worker.
+        time_limit_seconds: Overall budget for the windows and the
+            reconciliation pass together. Each window gets its share of it,
+            so all windows together take about this long on max_workers cores.
+        num_workers: CP-SAT workers for the reconciliation pass. Window solves
+            use one worker each, the parallelism comes from the pool.
+        optimizer_options: Passed on to every CalendarOptimizer (mode, engine).
+        """
+        if partition not in self.PARTITIONS:
+            raise ValueError(
+                f"Unknown partition '{partition}', expected one of {self.PARTITIONS}"
+            )
+        self.tasks = tasks
+        self.slots = slots
+        if slot_weights is not None:
+            slot_weights = [float(w) for w in slot_weights]
+        self.slot_weights = slot_weights
+        self.partition = partition
+        self.max_workers = min(
+            max_workers or WINDOW_POOL_WORKERS, WINDOW_POOL_WORKERS
+        )
+        self.time_limit_seconds = time_limit_seconds
+        self.num_workers = num_workers
+        self.optimizer_options = optimizer_options
+        self.status = None
+        self.assignment = None
+        self.task_times = None
+
+    def _window_problems(self, windows, pre_assignment, time_limit):
+        slot_window = {j: w for w, window in enumerate(windows) for j in window}
+        window_tasks = [[] for _ in windows]
+        for i, j in enumerate(pre_assignment):
+            if j is not None:
+                window_tasks[slot_window[j]].append(i)
+
+        if time_limit is not None:
+            time_limit *= min(1.0, self.max_workers / max(1, len(windows)))
+        options = dict(
+            self.optimizer_options, time_limit_seconds=time_limit, num_workers=1
+        )
+
+        problems = []
+        for window, task_indices in zip(windows, window_tasks):
+            if task_indices:
+                weights = None
+                if self.slot_weights is not None:
+                    weights = [self.slot_weights[j] for j in window]
+                tasks = [self.tasks[i] for i in task_indices]
+                slots = [self.slots[j] for j in window]
+                args = tasks, slots, weights, options
+                problems.append((window, task_indices, args))
+        return problems
+
+    def _solve_windows(self, problems):
+        """
+        Solve the window problems, at most max_workers at a time on the shared
+        pool. Returns their results in order.
+        """
+        if len(problems) <= 1 or self.max_workers <= 1:
+            return [_solve_window(*args) for _, _, args in problems]
+        pool = window_pool()
+        results = [None] * len(problems)
+        queued = iter(enumerate(problems))
+        running = {}
+        while True:
+            for k, (_, _, args) in queued:
+                running[pool.submit(_solve_window, *args)] = k
+                if len(running) >= self.max_workers:
+                    break
+            if not running:
+                return results
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+
+    def optimize(self):
+        """
+        Solve every window, then reconcile. Returns a dictionary mapping each
+        slot name to the names of its tasks, or None if no schedule was found.
+        """
+        started = time.monotonic()
+        windows = group_slots(self.slots, self.partition)
+        pre_assignment = pre_assign(self.tasks, self.slots, self.slot_weights)
+        window_time_limit = self.time_limit_seconds
+        if window_time_limit is not None and None in pre_assignment:
+            window_time_limit *= 1 - RECONCILE_SHARE
+        problems = self._window_problems(windows, pre_assignment, window_time_limit)
+        results = self._solve_windows(problems)
+
+        assignment = [None] * len(self.tasks)
+        task_times = [None] * len(self.tasks)
+        for (window, task_indices, _), result in zip(problems, results):
+            _, window_assignment, window_times = result
+            if window_assignment is None:
+                continue
+            for i, k, times in zip(task_indices, window_assignment, window_times):
+                assignment[i], task_times[i] = window[k], times
+
+        if any(j is None for j in assignment):
+            time_left = None
+            if self.time_limit_seconds is not None:
+                elapsed = time.monotonic() - started
+                time_left = max(0.0, self.time_limit_seconds - elapsed)
+            self._reconcile(assignment, task_times, time_left)
+        else:
+            # Each window may be optimal, but tasks never move between windows,
+            # so the whole is only known to be feasible.
+            self.assignment, self.task_times = assignment, task_times
+            self.status = 'FEASIBLE'
+
+        if self.assignment is None:
+            return None
+        solution = {slot['name']: [] for slot in self.slots}
+        for i, j in enumerate(self.assignment):
+            solution[self.slots[j]['name']].append(self.tasks[i]['name'])
+        return solution
+
+    def _reconcile(self, assignment, task_times, time_limit):
+        """
+        Place the tasks no window took around the ones that are already
+        scheduled, within what is left of the time budget.
+        """
+        tasks = [dict(task, id=i) for i, task in enumerate(self.tasks)]
+        previous = {
+            str(i): {
+                'slot': j,
+                'start': times[0],
+                'end': times[1],
+                'duration': self.tasks[i]['duration'],
+            }
+            for i, (j, times) in enumerate(zip(assignment, task_times))
+            if j is not None
+        }
+        repairer = ScheduleRepairer(
+            tasks, self.slots, previous, slot_weights=self.slot_weights,
+            time_limit_seconds=time_limit, num_workers=self.num_workers,
+            **self.optimizer_options,
+        )
+        repairer.optimize()
+        self.assignment, self.task_times = repairer.assignment, repairer.task_times
+        self.status = 'FEASIBLE' if repairer.assignment is not None else repairer.status
@@ -18,8 +18,15 @@ The system is designed as follows:
 - Personalization: The system maintains a separate bandit for each user to personalize the reminder strategy to their preferences.
 """
 
+import logging
+import threading
+from contextlib import ExitStack
+
 import numpy as np
 
+from .bandit_storage import JSONBanditStorage
+from .bandit_table import BanditTable
+
 class ReminderBandit:
     def __init__(self, user_id, arms, epsilon=0.1):
         self.user_id = user_id
@@ -50,47 +57,322 @@ class ReminderBandit:
         new_value = ((n - 1) / n) * value + (1 / n) * reward
         self.values[arm] = new_value
 
-import json
+    def update_many(self, arm, count, total):
+        """
+        Apply `count` rewards adding up to `total` at once; the same as
+        calling update() for each of them.
+        """
+        if count == 0:
+            return
+        n = self.counts[arm]
+        self.counts[arm] = n + count
+        self.values[arm] = (self.values[arm] * n + total) / (n + count)
+
+
+logger = logging.getLogger(__name__)
 
 class ReminderBanditManager:
-    def __init__(self, storage_path='bandit_data.json'):
-        self.storage_path = storage_path
-        self.bandits = self._load_bandits()
-
-    def _load_bandits(self):
-        try:
-            with open(self.storage_path, 'r') as f:
-                data = json.load(f)
-                bandits = {}
-                for user_id, bandit_data in data.items():
-                    bandit = ReminderBandit(user_id, bandit_data['arms'], bandit_data['epsilon'])
-                    bandit.counts = bandit_data['counts']
-                    bandit.values = bandit_data['values']
-                    bandits[user_id] = bandit
-                return bandits
-        except FileNotFoundError:
-            return {}
-
-    def _save_bandits(self):
-        data = {}
-        for user_id, bandit in self.bandits.items():
-            data[user_id] = {
-                'arms': bandit.arms,
-                'epsilon': bandit.epsilon,
-                'counts': bandit.counts,
-                'values': bandit.values,
-            }
-        with open(self.storage_path, 'w') as f:
-            json.dump(data, f, indent=4)
+    # Users share this many update locks, picked by hash of the user id.
+    LOCK_STRIPES = 64
+
+    def __init__(
+        self, storage_path='bandit_data.json', storage=None, lock_stripes=LOCK_STRIPES
+    ):
+        """
+        storage: A BanditStorage backend. Defaults to a JSONBanditStorage at
+        storage_path. Bandits are loaded from storage on first use.
+
+        The bandits are served from one BanditTable per set of arms, so
+        selection and updates work on whole batches of users at once.
+        get_bandit() hands out a ReminderBandit copy of a user's row.
+
+        Updates to one user's row are serialized by that user's lock stripe;
+        selection reads the tables without locking. Rewards are queued and
+        added to the stored bandits by flush(): right away by default, or in
+        the background once start_write_behind() was called. Only the rewards
+        are written, never this process's copy of a bandit, so several
+        processes can share one storage.
+        """
+        if storage is None:
+            storage = JSONBanditStorage(storage_path)
+        self.storage = storage
+        # {tuple(arms): BanditTable}, and the table holding each user's row.
+        self.tables = {}
+        self._user_tables = {}
+        # Adding users may grow a table, which takes every lock stripe.
+        self._add_lock = threading.Lock()
+        # Users whose bandit was created here and never saved: their first
+        # write must store every arm, not just the rewarded ones.
+        self._unsaved = set()
+        self._locks = [threading.Lock() for _ in range(lock_stripes)]
+        # {user_id: {arm: (count, total)}} of rewards waiting for the next flush.
+        self._unwritten = {}
+        self._pending = 0
+        self._unwritten_lock = threading.Lock()
+        # Flushes and saves run one at a time, so a saved bandit never has its
+        # rewards added a second time.
+        self._flush_lock = threading.Lock()
+        self._flusher = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self.flush_interval_seconds = None
+        self.flush_max_pending = None
+
+    def _lock_for(self, user_id):
+        return self._locks[hash(user_id) % len(self._locks)]
+
+    def _locked(self, user_ids):
+        # Take the stripes of all these users, always in the same order.
+        stack = ExitStack()
+        stripes = {hash(user_id) % len(self._locks) for user_id in user_ids}
+        for stripe in sorted(stripes):
+            stack.enter_context(self._locks[stripe])
+        return stack
+
+    @staticmethod
+    def _to_state(bandit):
+        return {
+            'user_id': bandit.user_id,
+            'arms': bandit.arms,
+            'epsilon': bandit.epsilon,
+            'counts': bandit.counts,
+            'values': bandit.values,
+        }
+
+    @staticmethod
+    def _from_state(state):
+        bandit = ReminderBandit(state['user_id'], state['arms'], state['epsilon'])
+        bandit.counts = state['counts']
+        bandit.values = state['values']
+        return bandit
+
+    def _put(self, states, replace=False):
+        """
+        Add users to the tables of their arms. Users already present are
+        kept (another thread may have added them), unless `replace`.
+        """
+        with self._add_lock, ExitStack() as stack:
+            for lock in self._locks:
+                stack.enter_context(lock)
+            by_arms = {}
+            for state in states:
+                if replace or state['user_id'] not in self._user_tables:
+                    by_arms.setdefault(tuple(state['arms']), []).append(state)
+            for arms, arm_states in by_arms.items():
+                table = self.tables.get(arms)
+                if table is None:
+                    table = self.tables[arms] = BanditTable(arms)
+                table.load_states(arm_states)
+                for state in arm_states:
+                    self._user_tables[state['user_id']] = table
+
+    def _load_missing(self, user_ids, arms, epsilon):
+        missing = [
+            user_id for user_id in dict.fromkeys(user_ids)
+            if user_id not in self._user_tables
+        ]
+        if not missing:
+            return
+        stored = self.storage.load_many(missing)
+        new = [user_id for user_id in missing if user_id not in stored]
+        fresh = [
+            self._to_state(ReminderBandit(user_id, arms, epsilon)) for user_id in new
+        ]
+        self._put(list(stored.values()) + fresh)
+        self._unsaved.update(new)
 
     def get_bandit(self, user_id, arms, epsilon=0.1):
-        if user_id not in self.bandits:
-            self.bandits[user_id] = ReminderBandit(user_id, arms, epsilon)
-        return self.bandits[user_id]
+        """
+        A copy of the user's bandit, loading or creating it first. Changes
+        to the copy are kept by passing it to save_bandit().
+        """
+        self._load_missing([user_id], arms, epsilon)
+        with self._lock_for(user_id):
+            return self._from_state(self._user_tables[user_id].state(user_id))
+
+    def _by_table(self, user_ids):
+        # {table: indices into user_ids} of loaded users.
+        groups = {}
+        for i, user_id in enumerate(user_ids):
+            groups.setdefault(self._user_tables[user_id], []).append(i)
+        return groups
 
-    def save_bandit(self, bandit):
-        self.bandits[bandit.user_id] = bandit
-        self._save_bandits()
+    def suggest_arms(self, user_ids, arms, epsilon=0.1):
+        """
+        Select an arm for each user in one go: missing bandits are loaded with
+        one storage call, and the users of each table share one
+        BanditTable.select() draw.
+        """
+        self._load_missing(user_ids, arms, epsilon)
+        suggestions = [None] * len(user_ids)
+        for table, indices in self._by_table(user_ids).items():
+            chosen = table.select([user_ids[i] for i in indices])
+            for i, arm in zip(indices, chosen):
+                suggestions[i] = arm
+        return suggestions
+
+    def record_reward(self, user_id, arm, reward, arms, epsilon=0.1):
+        """
+        Apply one reward under the user's lock and persist it (see flush).
+        Raises ValueError if the user's bandit has no such arm.
+        """
+        self._load_missing([user_id], arms, epsilon)
+        table = self._user_tables[user_id]
+        if arm not in table.arms:
+            raise ValueError(f"Unknown arms: {[arm]}")
+        with self._lock_for(user_id):
+            table.update_one(user_id, arm, reward)
+        self._queue({user_id: {arm: (1, reward)}})
+        self._persist()
+
+    def record_rewards(self, rewards, arms, epsilon=0.1):
+        """
+        Apply many (user_id, arm, reward) events: rewards for the same user
+        and arm are coalesced into one update, and all changed bandits are
+        persisted with a single storage call. Raises ValueError, before
+        changing anything, if an event names an arm its user's bandit lacks.
+        Returns the number of (user, arm) pairs updated.
+        """
+        totals = {}
+        for user_id, arm, reward in rewards:
+            count, total = totals.get((user_id, arm), (0, 0.0))
+            totals[user_id, arm] = count + 1, total + reward
+        pairs = list(totals)
+        self._load_missing([user_id for user_id, _ in pairs], arms, epsilon)
+        groups = self._by_table([user_id for user_id, _ in pairs])
+        unknown = sorted({
+            pairs[i][1] for table, indices in groups.items()
+            for i in indices if pairs[i][1] not in table.arms
+        })
+        if unknown:
+            raise ValueError(f"Unknown arms: {unknown}")
+
+        for table, indices in groups.items():
+            user_ids = [pairs[i][0] for i in indices]
+            with self._locked(user_ids):
+                table.update(
+                    user_ids,
+                    [pairs[i][1] for i in indices],
+                    [totals[pairs[i]][1] for i in indices],
+                    counts=[totals[pairs[i]][0] for i in indices],
+                )
+        changed = {}
+        for (user_id, arm), count_total in totals.items():
+            changed.setdefault(user_id, {})[arm] = count_total
+        self._queue(changed)
+        self._persist()
+        return len(totals)
+
+    def save_bandit(self, bandit, arms=None):
+        """
+        Store a bandit as it is, replacing the stored state of its arms. Pass
+        the arms that changed (e.g. the one just rewarded) to let the storage
+        write only those.
+        """
+        with self._flush_lock:
+            state = self._to_state(bandit)
+            state['counts'] = dict(bandit.counts)
+            state['values'] = dict(bandit.values)
+            self._put([state], replace=True)
+            # The bandit replaces whatever rewards were queued for its user.
+            with self._unwritten_lock:
+                self._unwritten.pop(bandit.user_id, None)
+            if arms is None or bandit.user_id in self._unsaved:
+                arms = bandit.arms
+            self.storage.save(state, arms=arms)
+            self._unsaved.discard(bandit.user_id)
+
+    def _queue(self, rewards):
+        # rewards: {user_id: {arm: (count, total)}}
+        with self._unwritten_lock:
+            for user_id, arm_rewards in rewards.items():
+                queued = self._unwritten.setdefault(user_id, {})
+                self._pending += len(arm_rewards)
+                for arm, (count, total) in arm_rewards.items():
+                    queued_count, queued_total = queued.get(arm, (0, 0.0))
+                    queued[arm] = queued_count + count, queued_total + total
+            full = (
+                self.flush_max_pending is not None
+                and self._pending >= self.flush_max_pending
+            )
+        if full:
+            self._wake.set()
+
+    def _persist(self):
+        # With write-behind, the flusher thread persists the queued rewards.
+        if self._flusher is None:
+            self.flush()
+
+    def flush(self):
+        """
+        Add every queued reward to the storage with one call. If the storage
+        fails, the rewards stay queued for the next flush and the error is
+        raised. Returns the number of bandits written.
+        """
+        with self._flush_lock:
+            with self._unwritten_lock:
+                unwritten, self._unwritten = self._unwritten, {}
+                self._pending = 0
+            if not unwritten:
+                return 0
+            rows = []
+            for user_id, arm_rewards in unwritten.items():
+                table = self._user_tables[user_id]
+                epsilon = float(table.epsilons[table.user_rows[user_id]])
+                for position, arm in enumerate(table.arms):
+                    if arm in arm_rewards or user_id in self._unsaved:
+                        count, total = arm_rewards.get(arm, (0, 0.0))
+                        rows.append({
+                            'user_id': user_id, 'arm': arm, 'position': position,
+                            'epsilon': epsilon, 'count': count, 'total': total,
+                        })
+            try:
+                self.storage.add_rewards(rows)
+            except BaseException:
+                self._queue(unwritten)
+                raise
+            self._unsaved.difference_update(unwritten)
+            return len(unwritten)
+
+    def start_write_behind(self, interval_seconds=0.5, max_pending=1000):
+        """
+        Persist in the background instead of on every update: a flusher thread
+        writes the dirty bandits every interval_seconds, or sooner once
+        max_pending arm updates are waiting. Call close() to stop it.
+        """
+        if self._flusher is not None:
+            return
+        self.flush_interval_seconds = interval_seconds
+        self.flush_max_pending = max_pending
+        self._stop.clear()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name='bandit-flusher', daemon=True
+        )
+        self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception(
+                    "Flushing reminder bandits failed, retrying in %ss",
+                    self.flush_interval_seconds,
+                )
+
+    def close(self):
+        """
+        Stop the write-behind flusher, if any, and flush what is left.
+        """
+        flusher, self._flusher = self._flusher, None
+        if flusher is not None:
+            self._stop.set()
+            self._wake.set()
+            flusher.join()
+            self.flush_max_pending = None
+        self.flush()
 
 if __name__ == '__main__':
     # Example usage
@@ -0,0 +1,209 @@
+from datetime import datetime
+
+from .calendar_optimizer import CalendarOptimizer
+
+
+def schedule_entries(tasks, slots, assignment, task_times):
+    """
+    Turn a solved schedule into JSON-friendly entries that can be persisted
+    and later fed back to ScheduleRepairer via previous_from_entries.
+    """
+    return [
+        {
+            'task_id': str(task['id']),
+            'duration': task['duration'],
+            'slot_start': slots[j]['start'].isoformat(),
+            'slot_end': slots[j]['end'].isoformat(),
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+        }
+        for task, j, (start, end) in zip(tasks, assignment, task_times)
+    ]
+
+
+def previous_from_entries(entries, slots):
+    """
+    Map persisted schedule entries onto the slots of a new request.
+    Returns {task_id: {'slot', 'start', 'end', 'duration'}}, where 'slot' is the
+    index of the identical slot in `slots`, or None if that slot is gone.
+    """
+    slot_index = {(slot['start'], slot['end']): j for j, slot in enumerate(slots)}
+    previous = {}
+    for entry in entries:
+        key = (
+            datetime.fromisoformat(entry['slot_start']),
+            datetime.fromisoformat(entry['slot_end']),
+        )
+        previous[entry['task_id']] = {
+            'slot': slot_index.get(key),
+            'start': datetime.fromisoformat(entry['start']),
+            'end': datetime.fromisoformat(entry['end']),
+            'duration': entry['duration'],
+        }
+    return previous
+
+
+class ScheduleRepairer:
+    """
+    Re-plans a previously accepted schedule after a few tasks changed.
+
+    A task is affected if it is listed in changed_task_ids, is new, changed
+    duration, or its slot is no longer available. Every slot that held an
+    affected task is re-optimized from scratch; all other tasks keep their
+    slot and exact times. The free tasks are solved by a CalendarOptimizer over
+    the gaps the pinned tasks leave, hinted with their previous slots, so the
+    model only grows with the size of the change. If they no longer fit, the
+    whole schedule is re-solved, still hinted with the previous one.
+
+    Exposes the same optimize() / status / assignment / task_times interface
+    as CalendarOptimizer.
+    """
+
+    def __init__(self, tasks, slots, previous, changed_task_ids=(), slot_weights=None,
+                 **optimizer_options):
+        """
+        tasks: A list of tasks, each a dictionary with 'id', 'name' and 'duration'.
+        slots: A list of available time slots with 'name', 'start' and 'end'.
+        previous: {task_id: {'slot', 'start', 'end', 'duration'}}, see
+            previous_from_entries.
+        changed_task_ids: IDs of tasks that must be re-planned even if they look
+            unchanged.
+        slot_weights: Optional per-slot weights, as for CalendarOptimizer.
+        optimizer_options: Passed on to CalendarOptimizer (mode, engine, time
+            limit, ...).
+        """
+        self.tasks = tasks
+        self.slots = slots
+        self.previous = previous
+        self.changed_task_ids = {str(task_id) for task_id in changed_task_ids}
+        self.slot_weights = slot_weights
+        self.optimizer_options = optimizer_options
+        self.status = None
+        self.assignment = None
+        self.task_times = None
+        # Indices of the tasks that were re-planned by the last run.
+        self.free_tasks = None
+
+    def _is_affected(self, task):
+        key = str(task['id'])
+        before = self.previous.get(key)
+        return (
+            key in self.changed_task_ids
+            or before is None
+            or before['slot'] is None
+            or before['duration'] != task['duration']
+        )
+
+    def split_tasks(self):
+        """
+        Returns (pinned, free): pinned maps a task index to its previous
+        (slot, start, end), free lists the indices of the tasks to re-plan.
+        """
+        affected = [self._is_affected(task) for task in self.tasks]
+        touched_slots = {
+            self.previous[str(task['id'])]['slot']
+            for task, is_affected in zip(self.tasks, affected)
+            if is_affected and str(task['id']) in self.previous
+        }
+        pinned, free = {}, []
+        for i, task in enumerate(self.tasks):
+            before = self.previous.get(str(task['id']))
+            if affected[i] or before['slot'] in touched_slots:
+                free.append(i)
+            else:
+                pinned[i] = before['slot'], before['start'], before['end']
+        return pinned, free
+
+    def _free_windows(self, pinned):
+        """
+        Split every slot around its pinned tasks. Returns the gaps as slot
+        dictionaries plus the index of the slot each gap belongs to.
+        """
+        busy = {}
+        for j, start, end in pinned.values():
+            busy.setdefault(j, []).append((start, end))
+        windows, parents = [], []
+        for j, slot in enumerate(self.slots):
+            cursor = slot['start']
+            for start, end in sorted(busy.get(j, [])) + [(slot['end'], slot['end'])]:
+                if (start - cursor).total_seconds() >= 60:
+                    windows.append({
+                        'name': f"{slot['name']} gap {len(windows)}",
+                        'start': cursor,
+                        'end': start,
+                    })
+                    parents.append(j)
+                cursor = max(cursor, end)
+        return windows, parents
+
+    def _full_solve(self):
+        hint = [
+            self.previous[str(task['id'])]['slot']
+            if str(task['id']) in self.previous else None
+            for task in self.tasks
+        ]
+        optimizer = CalendarOptimizer(
+            self.tasks, self.slots, slot_weights=self.slot_weights, hint=hint,
+            **self.optimizer_options,
+        )
+        optimizer.optimize()
+        self.free_tasks = list(range(len(self.tasks)))
+        return optimizer
+
+    def optimize(self):
+        """
+        Repair the previous schedule. Returns a dictionary mapping each slot
+        name to the names of its tasks, or None if no schedule was found.
+        """
+        pinned, free = self.split_tasks()
+        windows, parents = self._free_windows(pinned)
+        free_tasks = [self.tasks[i] for i in free]
+
+        sub_assignment, sub_times = [], []
+        if free_tasks:
+            hint = []
+            for task in free_tasks:
+                before = self.previous.get(str(task['id']))
+                slot = before['slot'] if before is not None else None
+                seconds = task['duration'] * 60
+                hint.append(next((
+                    k for k, window in enumerate(windows)
+                    if parents[k] == slot
+                    and (window['end'] - window['start']).total_seconds() >= seconds
+                ), None))
+            weights = None
+            if self.slot_weights is not None:
+                weights = [self.slot_weights[j] for j in parents]
+            optimizer = CalendarOptimizer(
+                free_tasks, windows, slot_weights=weights, hint=hint,
+                **self.optimizer_options,
+            )
+            if optimizer.optimize() is None:
+                optimizer = self._full_solve()
+                self.status = optimizer.status
+                self.assignment = optimizer.assignment
+                self.task_times = optimizer.task_times
+                return self._solution()
+            self.status = optimizer.status
+            sub_assignment, sub_times = optimizer.assignment, optimizer.task_times
+        else:
+            # Nothing changed: the previous schedule stands as it is.
+            self.status = 'FEASIBLE'
+
+        assignment = [None] * len(self.tasks)
+        task_times = [None] * len(self.tasks)
+        for i, (j, start, end) in pinned.items():
+            assignment[i], task_times[i] = j, (start, end)
+        for i, k, times in zip(free, sub_assignment, sub_times):
+            assignment[i], task_times[i] = parents[k], times
+        self.assignment, self.task_times = assignment, task_times
+        self.free_tasks = free
+        return self._solution()
+
+    def _solution(self):
+        if self.assignment is None:
+            return None
+        solution = {slot['name']: [] for slot in self.slots}
+        for i, j in enumerate(self.assignment):
+            solution[self.slots[j]['name']].append(self.tasks[i]['name'])
+        return solution
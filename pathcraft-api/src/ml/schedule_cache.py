@@ -0,0 +1,145 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+def fingerprint(*parts):
+    """
+    Canonical, order-sensitive hash of JSON-serializable request parts
+    (UUIDs and datetimes are serialized as strings).
+    """
+    payload = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def task_tag(task_id):
+    return f'task:{task_id}'
+
+
+def sub_goal_tag(sub_goal_id):
+    return f'sub_goal:{sub_goal_id}'
+
+
+class ScheduleCache:
+    """
+    Thread-safe LRU cache with a time-to-live for optimizer results.
+
+    Every entry carries tags (see task_tag / sub_goal_tag) naming the rows it
+    was derived from, and invalidate() drops all entries with a given tag.
+    Concurrent misses on the same key are coalesced: the first caller computes,
+    the others wait for its result ("single flight").
+    """
+
+    def __init__(self, maxsize=256, ttl_seconds=300.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (expires_at, value, tags), least recently used first.
+        self._entries = OrderedDict()
+        self._keys_by_tag = {}
+        self._in_flight = {}
+        # Bumped by every invalidation, so a result computed while its inputs
+        # were changing is returned to its callers but never stored.
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    def _drop(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for `key`, computing it with `compute()` on a
+        miss. `compute` returns (value, tags); with tags=None the value is
+        returned but not cached (e.g. a failed solve).
+        """
+        leader = False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                self._drop(key)
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                self.misses += 1
+                future = self._in_flight[key] = Future()
+                leader, generation = True, self._generation
+        if not leader:
+            return future.result()
+
+        try:
+            value, tags = compute()
+        except BaseException as exc:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            del self._in_flight[key]
+            if tags is not None and generation == self._generation:
+                expires = self._clock() + self.ttl_seconds
+                self._entries[key] = expires, value, frozenset(tags)
+                for tag in tags:
+                    self._keys_by_tag.setdefault(tag, set()).add(key)
+                while len(self._entries) > self.maxsize:
+                    self._drop(next(iter(self._entries)))
+        future.set_result(value)
+        return value
+
+    def invalidate(self, *tags):
+        """
+        Drop every entry derived from any of the given tags.
+        """
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for key in list(self._keys_by_tag.get(tag, ())):
+                    self._drop(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'invalidations': self.invalidations,
+                'size': len(self._entries),
+            }
+
+
+# Shared by the optimize endpoint and the CRUD functions that invalidate it.
+schedule_cache = ScheduleCache()
+
+
+def invalidate_tasks(*task_ids):
+    schedule_cache.invalidate(*(task_tag(task_id) for task_id in task_ids))
+
+
+def invalidate_sub_goals(*sub_goal_ids):
+    schedule_cache.invalidate(
+        *(sub_goal_tag(sub_goal_id) for sub_goal_id in sub_goal_ids)
+    )
@@ -2,9 +2,24 @@ import numpy as np
 from sklearn.ensemble import GradientBoostingClassifier
 
 class SlotSelector:
-    def __init__(self):
-        self.model = GradientBoostingClassifier(n_estimators=100, learning_rate=0.1, max_depth=3, random_state=0)
+    # With (hour, weekday) features there are only 24 x 7 possible inputs, so a
+    # trained model is compiled into a table of their probabilities.
+    HOURS = 24
+    WEEKDAYS = 7
+
+    def __init__(self, model=None):
+        """
+        model: Optional scikit-learn classifier to use instead of the default
+            gradient-boosting ensemble, e.g. one with partial_fit for partial_train().
+        """
+        if model is None:
+            model = GradientBoostingClassifier(
+                n_estimators=100, learning_rate=0.1, max_depth=3, random_state=0
+            )
+        self.model = model
         self._is_trained = False
+        # Probability of each class for every (hour, weekday), shape (24, 7, n_classes).
+        self.table = None
 
     def train(self, X, y):
         """
@@ -14,6 +29,55 @@ class SlotSelector:
         """
         self.model.fit(X, y)
         self._is_trained = True
+        self.compile()
+
+    def partial_train(self, X, y, classes=(0, 1)):
+        """
+        Update the model with one more chunk of training data. Needs a model
+        with partial_fit; call compile() once the last chunk is in.
+        """
+        self.model.partial_fit(X, y, classes=np.asarray(classes))
+        self._is_trained = True
+        self.table = None
+
+    def compile(self):
+        """
+        Materialize the model's probabilities for every (hour, weekday) into
+        self.table, so predicting for those features is an array lookup.
+        Only applies to models trained on exactly these two features.
+        """
+        if not self._is_trained:
+            raise RuntimeError("Model has not been trained yet.")
+        if self.model.n_features_in_ != 2:
+            self.table = None
+            return
+        hours, weekdays = np.meshgrid(
+            np.arange(self.HOURS), np.arange(self.WEEKDAYS), indexing='ij'
+        )
+        grid = np.column_stack([hours.ravel(), weekdays.ravel()])
+        probabilities = self.model.predict_proba(grid)
+        self.table = probabilities.reshape(self.HOURS, self.WEEKDAYS, -1)
+
+    def _table_lookup(self, X):
+        """
+        Rows of the compiled table for X, or None if X is not all integer
+        (hour, weekday) pairs in range and must go through the model.
+        """
+        # Artifacts published before compile() existed have no table.
+        table = getattr(self, 'table', None)
+        X = np.asarray(X)
+        if table is None or X.ndim != 2 or X.shape[1] != 2:
+            return None
+        if not np.issubdtype(X.dtype, np.integer):
+            return None
+        hours, weekdays = X[:, 0], X[:, 1]
+        in_range = (
+            (hours >= 0) & (hours < self.HOURS)
+            & (weekdays >= 0) & (weekdays < self.WEEKDAYS)
+        )
+        if not np.all(in_range):
+            return None
+        return table[hours, weekdays]
 
     def predict(self, X):
         """
@@ -21,7 +85,10 @@ class SlotSelector:
         """
         if not self._is_trained:
             raise RuntimeError("Model has not been trained yet.")
-        return self.model.predict(X)
+        probabilities = self._table_lookup(X)
+        if probabilities is None:
+            return self.model.predict(X)
+        return self.model.classes_[probabilities.argmax(axis=1)]
 
     def predict_proba(self, X):
         """
@@ -29,16 +96,22 @@ class SlotSelector:
         """
         if not self._is_trained:
             raise RuntimeError("Model has not been trained yet.")
-        return self.model.predict_proba(X)
+        probabilities = self._table_lookup(X)
+        if probabilities is None:
+            return self.model.predict_proba(X)
+        return probabilities
+
 
-def get_dummy_data():
+def get_dummy_data(seed=None, n_samples=100):
     """
     Generate some dummy data for training the model.
+    With a seed the data (and so the trained model) is reproducible.
     """
+    rng = np.random.RandomState(seed) if seed is not None else np.random
     # Features: time of day (0-23), day of week (0-6)
-    X = np.random.randint(0, 24, size=(100, 2))
+    X = rng.randint(0, 24, size=(n_samples, 2))
     # Target: whether the slot was productive (0 or 1)
-    y = np.random.randint(0, 2, size=100)
+    y = rng.randint(0, 2, size=n_samples)
     return X, y
 
 if __name__ == '__main__':
@@ -0,0 +1,74 @@
+"""
+Train a SlotSelector and publish it to the model registry.
+
+Run from the pathcraft-api root:
+    python -m src.ml.train --source history
+    python -m src.ml.train --source dummy --model-dir /srv/pathcraft/models \
+        --samples 5000 --seed 42
+
+'history' trains incrementally on the finished tasks in the database;
+'dummy' trains on generated data.
+
+Serving processes load the latest published version on first use; running
+processes keep the version they loaded until they restart.
+"""
+import argparse
+
+from .model_registry import SLOT_SELECTOR, ModelRegistry, model_dir
+from .slot_selector import SlotSelector, get_dummy_data
+
+
+def train_slot_selector(n_samples=100, seed=0):
+    selector = SlotSelector()
+    selector.train(*get_dummy_data(seed=seed, n_samples=n_samples))
+    return selector
+
+
+def train_slot_selector_from_db(batch_size):
+    from ..database import SessionLocal
+    from .feature_pipeline import train_slot_selector_from_history
+
+    db = SessionLocal()
+    try:
+        return train_slot_selector_from_history(db, batch_size=batch_size)
+    finally:
+        db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--model-dir', default=None,
+                        help=f'registry root (default: {model_dir()})')
+    parser.add_argument('--version', default=None,
+                        help='version name (default: a UTC timestamp)')
+    parser.add_argument('--source', choices=['dummy', 'history'], default='dummy')
+    parser.add_argument('--samples', type=int, default=100,
+                        help='dummy samples to generate')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the dummy data')
+    parser.add_argument('--batch-size', type=int, default=10000,
+                        help='tasks per chunk read from the database')
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry(args.model_dir)
+    if args.source == 'history':
+        try:
+            selector, n_samples = train_slot_selector_from_db(args.batch_size)
+        except ValueError as exc:
+            parser.exit(1, f"{exc}\n")
+        metadata = {'training_data': 'history', 'samples': n_samples}
+    else:
+        selector = train_slot_selector(n_samples=args.samples, seed=args.seed)
+        metadata = {
+            'training_data': 'dummy', 'samples': args.samples, 'seed': args.seed
+        }
+    version = registry.publish(
+        SLOT_SELECTOR, selector, metadata=metadata, version=args.version
+    )
+    print(f"Published {SLOT_SELECTOR} version {version} to {registry.root}")
+    return version
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,8 @@ from sqlalchemy import (
     ForeignKey,
     Integer,
     Enum,
+    Float,
+    Index,
     JSON,
 )
 from sqlalchemy.dialects.postgresql import UUID
@@ -32,7 +34,10 @@ class Goal(Base):
         "SubGoal", back_populates="parent_goal", cascade="all, delete-orphan"
     )
 
-    # New field for progress tracking
+    # Progress rollup over the tasks of all sub-goals, maintained by crud on
+    # every task change (see crud._adjust_progress).
+    tasks_done = Column(Integer, default=0, nullable=False)
+    tasks_total = Column(Integer, default=0, nullable=False)
     progress_percentage = Column(Integer, default=0, nullable=False)
 
     def __repr__(self):
@@ -59,7 +64,9 @@ class SubGoal(Base):
         "Task", back_populates="sub_goal", cascade="all, delete-orphan"
     )
 
-    # New field for progress tracking
+    # Progress rollup over the sub-goal's tasks, maintained by crud.
+    tasks_done = Column(Integer, default=0, nullable=False)
+    tasks_total = Column(Integer, default=0, nullable=False)
     progress_percentage = Column(Integer, default=0, nullable=False)
 
     def __repr__(self):
@@ -75,13 +82,19 @@ class TaskStatus(PyEnum):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Serve date-range schedule queries, optionally narrowed by status,
+        # and per-sub-goal timelines without scanning the whole table.
+        Index("ix_tasks_planned_start_status", "planned_start", "status"),
+        Index("ix_tasks_subgoal_id_planned_start", "subgoal_id", "planned_start"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     subgoal_id = Column(
         UUID(as_uuid=True), ForeignKey("sub_goals.id"), nullable=False, index=True
     )
     description = Column(String, nullable=False)  # Adding description for clarity
-    planned_start = Column(DateTime(timezone=True), nullable=True)
+    planned_start = Column(DateTime(timezone=True), nullable=True, index=True)
     planned_end = Column(DateTime(timezone=True), nullable=True)
     actual_start = Column(DateTime(timezone=True), nullable=True)
     actual_end = Column(DateTime(timezone=True), nullable=True)
@@ -95,3 +108,34 @@ class Task(Base):
 
     def __repr__(self):
         return f"<Task(description='{self.description}', status='{self.status.value}')>"
+
+
+class UserSchedule(Base):
+    __tablename__ = "user_schedules"
+
+    # The last schedule a user accepted, kept so it can be repaired incrementally.
+    user_id = Column(String, primary_key=True)
+    entries = Column(JSON, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<UserSchedule(user_id='{self.user_id}', tasks={len(self.entries)})>"
+
+
+class ReminderBanditArm(Base):
+    __tablename__ = "reminder_bandit_arms"
+
+    # One row per (user, arm), so recording a reward rewrites a single row.
+    user_id = Column(String, primary_key=True)
+    arm = Column(String, primary_key=True)
+    # Order of the arm in the user's bandit.
+    position = Column(Integer, nullable=False)
+    epsilon = Column(Float, nullable=False)
+    count = Column(Integer, default=0, nullable=False)
+    value = Column(Float, default=0.0, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<ReminderBanditArm(user_id='{self.user_id}', arm='{self.arm}', "
+            f"count={self.count})>"
+        )
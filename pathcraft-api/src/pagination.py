@@ -0,0 +1,38 @@
+import base64
+import binascii
+import json
+from uuid import UUID
+
+# Keyset (cursor) pagination helpers.
+# A cursor is an opaque, URL-safe token that encodes the sort key of the last
+# row on the previous page. Clients must treat it as a black box and simply
+# send it back to fetch the next page.
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a client sends a cursor that cannot be decoded."""
+
+
+def encode_cursor(last_id: UUID) -> str:
+    """
+    Encode the ID of the last row on a page into an opaque cursor.
+    """
+    payload = json.dumps({"id": str(last_id)}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> UUID | None:
+    """
+    Decode a cursor back into the ID it was built from.
+    An empty cursor means "start from the first page" and decodes to None.
+    """
+    if not cursor:
+        return None
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return UUID(payload["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursorError("Invalid pagination cursor") from exc
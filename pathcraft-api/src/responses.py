@@ -0,0 +1,37 @@
+import orjson
+from fastapi import Response
+
+# Fast JSON responses for read paths that build plain rows instead of ORM
+# objects. orjson serializes dicts and lists of str, int, UUID, datetime and
+# Enum values directly, with the same output as the response models (UTC
+# datetimes end in "Z", as pydantic writes them).
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+class FastJSONResponse(Response):
+    """
+    A JSON response serialized with orjson.
+
+    Returning one from an endpoint skips FastAPI's response_model validation
+    and encoding, so its content must already have the shape of the declared
+    response_model (which still documents the endpoint).
+    """
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def ndjson_batches(rows, batch_size: int):
+    """
+    Serialize plain rows as NDJSON, emitting one chunk per `batch_size` rows.
+    """
+    lines = []
+    for row in rows:
+        lines.append(orjson.dumps(row, option=ORJSON_OPTIONS))
+        if len(lines) >= batch_size:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
@@ -1,10 +1,16 @@
+from datetime import datetime
 from uuid import UUID
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from .. import crud, schemas, decomposition
 from ..database import get_db
+from ..pagination import NEXT_CURSOR_HEADER, InvalidCursorError
+from ..responses import FastJSONResponse
+
+# A dashboard can fetch up to this many goal summaries in one request.
+MAX_SUMMARY_PAGE_SIZE = 10000
 
 router = APIRouter(
     prefix="/goals",
@@ -21,24 +27,108 @@ def create_new_goal(goal: schemas.GoalCreate, db: Session = Depends(get_db)):
     return crud.create_goal(db=db, goal=goal)
 
 
+DEPTH_DESCRIPTION = (
+    "How much of the goal tree to return: 0 the goals only, 1 with their "
+    "sub-goals, 2 with the sub-goals' tasks too."
+)
+FIELDS_DESCRIPTION = (
+    "Comma-separated fields to return, e.g. "
+    "`title,sub_goals.description,tasks.status`. Levels without listed fields "
+    "return all of them; `id` is always returned."
+)
+
+
 @router.get("/", response_model=List[schemas.Goal])
-def read_all_goals(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_all_goals(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    depth: int = Query(2, ge=0, le=2, description=DEPTH_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_db),
+):
     """
     Retrieve all goals with pagination.
+
+    Passing `cursor` switches to keyset pagination: send an empty cursor for the
+    first page, then the value of the `X-Next-Cursor` response header for the
+    following ones. The header is absent on the last page.
+
+    `depth` and `fields` trim the tree: levels below `depth` are not queried
+    at all, and only the listed columns are selected. The goals are then
+    partial objects of the documented schema.
+
+    Goals are read as plain rows and serialized directly (see FastJSONResponse).
     """
-    goals = crud.get_goals(db, skip=skip, limit=limit)
-    return goals
+    try:
+        if cursor is None:
+            return FastJSONResponse(crud.get_goal_dicts(
+                db, skip=skip, limit=limit, depth=depth, fields=fields
+            ))
+        goals, next_cursor = crud.get_goal_dicts_page(
+            db, cursor=cursor, limit=limit, depth=depth, fields=fields
+        )
+    except (InvalidCursorError, crud.InvalidFieldsError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return FastJSONResponse(goals, headers=headers)
+
+
+# Declared before /{goal_id} so that "summary" is not parsed as a goal ID.
+@router.get("/summary", response_model=List[schemas.GoalSummary])
+def read_goal_summaries(
+    response: Response,
+    cursor: str = "",
+    limit: int = Query(100, ge=1, le=MAX_SUMMARY_PAGE_SIZE),
+    methodology: Optional[str] = None,
+    target_date_from: Optional[datetime] = None,
+    target_date_to: Optional[datetime] = None,
+    overdue_only: bool = False,
+    db: Session = Depends(get_db),
+):
+    """
+    Retrieve task counts by status, overdue counts and the next due date of
+    each goal, aggregated in the database in a single query.
+
+    Results are keyset-paginated like GET /goals with a cursor: follow the
+    `X-Next-Cursor` response header. Filter by methodology, by target date
+    range, or with `overdue_only` to goals that have overdue tasks.
+    """
+    try:
+        summaries, next_cursor = crud.get_goal_summaries(
+            db,
+            cursor=cursor,
+            limit=limit,
+            methodology=methodology,
+            target_date_from=target_date_from,
+            target_date_to=target_date_to,
+            overdue_only=overdue_only,
+        )
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return summaries
 
 
 @router.get("/{goal_id}", response_model=schemas.Goal)
-def read_single_goal(goal_id: UUID, db: Session = Depends(get_db)):
+def read_single_goal(
+    goal_id: UUID,
+    depth: int = Query(2, ge=0, le=2, description=DEPTH_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_db),
+):
     """
-    Retrieve a single goal by its ID.
+    Retrieve a single goal by its ID, trimmed by `depth` and `fields` like
+    GET /goals/.
     """
-    db_goal = crud.get_goal(db, goal_id=goal_id)
-    if db_goal is None:
+    try:
+        goal = crud.get_goal_dict(db, goal_id=goal_id, depth=depth, fields=fields)
+    except crud.InvalidFieldsError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if goal is None:
         raise HTTPException(status_code=404, detail="Goal not found")
-    return db_goal
+    return FastJSONResponse(goal)
 
 
 @router.post(
@@ -55,10 +145,11 @@ def decompose_goal_and_create_sub_goals(goal_id: UUID, db: Session = Depends(get
     This endpoint will:
     1. Find the parent goal.
     2. Use the decomposition service to generate a list of sub-goals.
-    3. If a template is found, create and save the new sub-goals.
+    3. If a template is found, create and save the new sub-goals in a single
+       transaction.
     4. Return the list of newly created sub-goals.
     """
-    db_goal = crud.get_goal(db, goal_id=goal_id)
+    db_goal = crud.get_goal_row(db, goal_id=goal_id)
     if db_goal is None:
         raise HTTPException(status_code=404, detail="Goal not found")
 
@@ -72,12 +163,7 @@ def decompose_goal_and_create_sub_goals(goal_id: UUID, db: Session = Depends(get
             ),
         )
 
-    created_sub_goals = [
-        crud.create_sub_goal(db=db, sub_goal=sub_goal_schema, goal_id=goal_id)
-        for sub_goal_schema in sub_goals_to_create
-    ]
-
-    return created_sub_goals
+    return crud.create_sub_goals(db=db, sub_goals=sub_goals_to_create, goal_id=goal_id)
 
 
 @router.put("/{goal_id}", response_model=schemas.Goal)
@@ -85,13 +171,14 @@ def update_existing_goal(
     goal_id: UUID, goal_in: schemas.GoalUpdate, db: Session = Depends(get_db)
 ):
     """
-    Update a goal's details.
+    Update a goal's details. Only the goal's own row is loaded for the update;
+    the returned tree is read like GET /goals/{goal_id}.
     """
-    db_goal = crud.get_goal(db, goal_id=goal_id)
+    db_goal = crud.get_goal_row(db, goal_id=goal_id)
     if db_goal is None:
         raise HTTPException(status_code=404, detail="Goal not found")
-    updated_goal = crud.update_goal(db=db, db_goal=db_goal, goal_in=goal_in)
-    return updated_goal
+    crud.update_goal(db=db, db_goal=db_goal, goal_in=goal_in)
+    return FastJSONResponse(crud.get_goal_dict(db, goal_id=goal_id))
 
 
 @router.delete("/{goal_id}", response_model=schemas.Goal)
@@ -1,89 +1,471 @@
-from fastapi import APIRouter, Depends
+import asyncio
+import json
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from .. import crud, schemas
-from ..database import get_db
-from ..ml.slot_selector import SlotSelector, get_dummy_data
+from ..database import engine, get_db
+from ..ml.bandit_storage import SQLBanditStorage
+from ..ml.model_registry import get_slot_selector
 from ..ml.calendar_optimizer import CalendarOptimizer
+from ..ml.partitioned_optimizer import PartitionedOptimizer
+from ..ml.rescheduling import ScheduleRepairer, previous_from_entries, schedule_entries
+from ..ml.schedule_cache import fingerprint, schedule_cache, sub_goal_tag, task_tag
+from ..ml.jobs import JobManager, QueueFullError
+from ..ml.reminder_system import ReminderBanditManager
 import numpy as np
 
 router = APIRouter()
 
-# In a real application, the model would be trained and loaded once, not on every request.
-# For this example, we'll train it on dummy data each time.
-slot_selector = SlotSelector()
-X_train, y_train = get_dummy_data()
-slot_selector.train(X_train, y_train)
 
-from ..ml.reminder_system import ReminderBanditManager
+def create_reminder_manager():
+    """
+    The app's reminder bandits, created once by main.lifespan. They live in
+    the application database, one row per (user, arm); existing
+    bandit_data.json files can be imported with
+    `python -m src.ml.bandit_storage import`.
+    """
+    return ReminderBanditManager(storage=SQLBanditStorage(engine))
+
 
-reminder_manager = ReminderBanditManager()
+def get_reminder_manager(request: Request) -> ReminderBanditManager:
+    return request.app.state.reminder_manager
+
+
+# While the app runs, rewards are persisted in the background (see main.lifespan):
+# every REMINDER_FLUSH_INTERVAL_SECONDS, or once this many arm updates are waiting.
+REMINDER_FLUSH_INTERVAL_SECONDS = 0.5
+REMINDER_FLUSH_MAX_PENDING = 1000
+
+# These would likely be configurable.
+REMINDER_ARMS = ['push_15_min', 'email_1_hour', 'sms_on_day']
 
 @router.post("/reminders/suggest", response_model=schemas.ReminderSuggestion)
-def suggest_reminder(suggestion_request: schemas.ReminderSuggestionRequest):
+def suggest_reminder(
+    suggestion_request: schemas.ReminderSuggestionRequest,
+    reminder_manager: ReminderBanditManager = Depends(get_reminder_manager),
+):
     """
     Suggests a reminder strategy for a given user.
     """
-    arms = ['push_15_min', 'email_1_hour', 'sms_on_day']  # These would likely be configurable
-    bandit = reminder_manager.get_bandit(user_id=suggestion_request.user_id, arms=arms)
-    suggestion = bandit.select_arm()
+    # The same table-backed draw as the batch endpoint.
+    [suggestion] = reminder_manager.suggest_arms(
+        [suggestion_request.user_id], arms=REMINDER_ARMS
+    )
     return schemas.ReminderSuggestion(user_id=suggestion_request.user_id, suggestion=suggestion)
 
+
+@router.post("/reminders/suggest/batch", response_model=schemas.ReminderSuggestionBatch)
+def suggest_reminders(
+    batch: schemas.ReminderSuggestionBatchRequest,
+    reminder_manager: ReminderBanditManager = Depends(get_reminder_manager),
+):
+    """
+    Suggests a reminder strategy for each of many users, in request order.
+    """
+    suggestions = reminder_manager.suggest_arms(batch.user_ids, arms=REMINDER_ARMS)
+    return {
+        "suggestions": [
+            {"user_id": user_id, "suggestion": suggestion}
+            for user_id, suggestion in zip(batch.user_ids, suggestions)
+        ]
+    }
+
 @router.post("/reminders/reward")
-def reward_reminder(reward_request: schemas.ReminderReward):
+def reward_reminder(
+    reward_request: schemas.ReminderReward,
+    reminder_manager: ReminderBanditManager = Depends(get_reminder_manager),
+):
     """
     Updates the reminder bandit with a reward.
     """
-    arms = ['push_15_min', 'email_1_hour', 'sms_on_day']
-    bandit = reminder_manager.get_bandit(user_id=reward_request.user_id, arms=arms)
-    bandit.update(arm=reward_request.arm, reward=reward_request.reward)
-    reminder_manager.save_bandit(bandit)
+    try:
+        reminder_manager.record_reward(
+            reward_request.user_id,
+            reward_request.arm,
+            reward_request.reward,
+            arms=REMINDER_ARMS,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
     return {"status": "ok"}
 
-@router.post("/schedule/optimize", response_model=schemas.Schedule)
-def optimize_schedule(schedule_request: schemas.ScheduleRequest, db: Session = Depends(get_db)):
+
+@router.post(
+    "/reminders/reward/batch", response_model=schemas.ReminderRewardBatchResult
+)
+def reward_reminders(
+    batch: schemas.ReminderRewardBatch,
+    reminder_manager: ReminderBanditManager = Depends(get_reminder_manager),
+):
     """
-    Optimizes the schedule for a given set of tasks and available time slots.
+    Updates the reminder bandits with many rewards. Rewards for the same user
+    and arm are applied as one update, and the batch is persisted at once;
+    if any reward names an unknown arm, none of them are applied.
+    """
+    try:
+        updated = reminder_manager.record_rewards(
+            ((r.user_id, r.arm, r.reward) for r in batch.rewards), arms=REMINDER_ARMS
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return {"status": "ok", "rewards": len(batch.rewards), "updated": updated}
+
+
+DEFAULT_TASK_DURATION_MINUTES = 30
+# Keep a single solve from pinning a worker thread (and every core) indefinitely.
+DEFAULT_SOLVER_TIME_LIMIT_SECONDS = 10.0
+DEFAULT_SOLVER_NUM_WORKERS = 4
+
+# Background optimization jobs run on their own processes, never on the
+# threads that serve requests.
+SCHEDULE_JOB_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+SCHEDULE_JOB_QUEUE_DEPTH = 16
+SCHEDULE_JOB_EVENTS_POLL_SECONDS = 0.2
+
+job_manager = JobManager(
+    max_workers=SCHEDULE_JOB_WORKERS, max_queued=SCHEDULE_JOB_QUEUE_DEPTH
+)
+
+
+def load_tasks_with_duration(db: Session, task_ids):
+    """
+    Load the requested tasks with one batched query and derive each task's
+    duration as its sub-goal's estimated effort split evenly across the
+    sub-goal's tasks. Tasks are returned in request order; unknown IDs are skipped.
+    """
+    rows = {row.id: row for row in crud.get_tasks_for_scheduling(db, task_ids)}
+    found = [rows[task_id] for task_id in task_ids if task_id in rows]
+    if not found:
+        return []
+
+    effort = np.array([row.estimated_effort_minutes or 0 for row in found], dtype=float)
+    siblings = np.array([row.sibling_count or 0 for row in found], dtype=float)
+    has_estimate = (effort != 0) & (siblings > 0)
+    durations = np.full(len(found), DEFAULT_TASK_DURATION_MINUTES, dtype=int)
+    # Truncate towards zero like int() does.
+    durations[has_estimate] = np.trunc(effort[has_estimate] / siblings[has_estimate])
+
+    return [
+        {
+            "id": row.id,
+            "subgoal_id": row.subgoal_id,
+            "name": row.description,
+            "duration": int(duration),
+        }
+        for row, duration in zip(found, durations)
+    ]
+
+
+def _optimizer_spec(db: Session, schedule_request: schemas.ScheduleRequest, slots):
+    """
+    Load the requested tasks and pick the optimizer for the request.
+    Returns (tasks, factory, args, kwargs); factory(*args, **kwargs) builds the
+    optimizer. Everything is picklable, so it can also run in a job worker.
     """
     # 1. Get tasks from the database
-    tasks_with_duration = []
-    for task_id in schedule_request.task_ids:
-        task = crud.get_task(db, task_id)
-        if task:
-            sub_goal = crud.get_sub_goal(db, task.subgoal_id)
-            if sub_goal and sub_goal.estimated_effort_minutes and len(sub_goal.tasks) > 0:
-                duration = int(sub_goal.estimated_effort_minutes / len(sub_goal.tasks))
-            else:
-                duration = 30  # Default duration if not specified
-            tasks_with_duration.append({"id": task.id, "name": task.description, "duration": duration})
-
-    # 2. Get available slots from the request
-    slots = [{"name": f"Slot {i}", "start": slot.start, "end": slot.end} for i, slot in enumerate(schedule_request.available_slots)]
-
-    # 3. Use the SlotSelector to predict the best slots
+    tasks_with_duration = load_tasks_with_duration(db, schedule_request.task_ids)
+
+    # 2. Use the SlotSelector to predict the best slots
     # This is a simplified example. In a real application, you would create features
     # for each slot and predict its productivity.
+    # The model is published with `python -m src.ml.train` and loaded on first use.
+    _, slot_selector = get_slot_selector()
     slot_features = np.array([[slot['start'].hour, slot['start'].weekday()] for slot in slots])
     slot_probabilities = slot_selector.predict_proba(slot_features)[:, 1]
 
-    # 4. Use the CalendarOptimizer to assign tasks to slots
-    # We can use the slot probabilities as a preference for the optimizer.
-    # This is a simplified example. A more complex implementation would incorporate
-    # the probabilities into the optimization objective.
-    optimizer = CalendarOptimizer(tasks_with_duration, slots)
-    solution = optimizer.optimize()
-
-    if solution:
-        # 5. Format the solution into the response model
-        optimized_slots = []
-        for slot_name, assigned_tasks in solution.items():
-            slot_info = next((s for s in schedule_request.available_slots if f"Slot {schedule_request.available_slots.index(s)}" == slot_name), None)
-            if slot_info:
-                assigned_task_ids = []
-                for task_name in assigned_tasks:
-                    task_info = next((t for t in tasks_with_duration if t['name'] == task_name), None)
-                    if task_info:
-                        assigned_task_ids.append(task_info['id'])
-                optimized_slots.append(schemas.OptimizedSlot(start=slot_info.start, end=slot_info.end, task_ids=assigned_task_ids))
-        return schemas.Schedule(optimized_slots=optimized_slots)
+    # 3. Use the CalendarOptimizer to assign tasks to slots
+    # The slot probabilities weight the objective, so longer tasks are pulled
+    # towards the slots where the user is most likely to be productive.
+    optimizer_options = dict(
+        slot_weights=slot_probabilities,
+        time_limit_seconds=(
+            schedule_request.time_limit_seconds or DEFAULT_SOLVER_TIME_LIMIT_SECONDS
+        ),
+        num_workers=schedule_request.num_workers or DEFAULT_SOLVER_NUM_WORKERS,
+        mode=schedule_request.mode,
+        engine=schedule_request.engine,
+    )
+    saved = None
+    if schedule_request.repair and schedule_request.user_id is not None:
+        saved = crud.get_user_schedule(db, schedule_request.user_id)
+    if saved is not None:
+        # Repair the user's last schedule instead of starting from scratch.
+        previous = previous_from_entries(saved.entries, slots)
+        args = tasks_with_duration, slots, previous
+        kwargs = dict(
+            changed_task_ids=schedule_request.changed_task_ids, **optimizer_options
+        )
+        return tasks_with_duration, ScheduleRepairer, args, kwargs
+    args = tasks_with_duration, slots
+    if schedule_request.partition is not None:
+        kwargs = dict(partition=schedule_request.partition, **optimizer_options)
+        return tasks_with_duration, PartitionedOptimizer, args, kwargs
+    return tasks_with_duration, CalendarOptimizer, args, optimizer_options
+
+
+def _solve_schedule(db: Session, schedule_request: schemas.ScheduleRequest, slots):
+    """
+    Load the requested tasks and solve them into `slots`.
+    Returns (tasks, status, assignment, task_times); the assignment is None if
+    no schedule was found.
+    """
+    tasks_with_duration, factory, args, kwargs = _optimizer_spec(
+        db, schedule_request, slots
+    )
+    optimizer = factory(*args, **kwargs)
+    optimizer.optimize()
+    return (
+        tasks_with_duration,
+        optimizer.status,
+        optimizer.assignment,
+        optimizer.task_times,
+    )
+
+
+def _cached_solve(db: Session, schedule_request: schemas.ScheduleRequest, slots):
+    """
+    _solve_schedule through the shared result cache. Identical requests share
+    one entry (and one in-flight solve); the CRUD layer invalidates it when any
+    of its tasks, or the sub-goals their durations derive from, change.
+    """
+    # A newly published model changes the slot weights, so its version is part
+    # of the key.
+    model_version, _ = get_slot_selector()
+    key = fingerprint(
+        schedule_request.model_dump(
+            mode="json", exclude={"user_id", "repair", "changed_task_ids"}
+        ),
+        model_version,
+    )
+
+    def compute():
+        result = _solve_schedule(db, schedule_request, slots)
+        tasks, _, assignment, _ = result
+        if assignment is None:
+            return result, None
+        tags = {task_tag(task["id"]) for task in tasks}
+        tags |= {sub_goal_tag(task["subgoal_id"]) for task in tasks}
+        return result, tags
+
+    return schedule_cache.get_or_compute(key, compute)
+
+
+@router.post("/schedule/optimize", response_model=schemas.Schedule)
+def optimize_schedule(
+    schedule_request: schemas.ScheduleRequest, db: Session = Depends(get_db)
+):
+    """
+    Optimizes the schedule for a given set of tasks and available time slots.
+    Results are cached; repairs depend on the user's saved schedule and are
+    always solved afresh.
+    """
+    slots = _request_slots(schedule_request)
+    if schedule_request.repair:
+        result = _solve_schedule(db, schedule_request, slots)
     else:
-        return {"optimized_slots": []}
+        result = _cached_solve(db, schedule_request, slots)
+    return _schedule_response(db, schedule_request, slots, *result)
+
+
+def _request_slots(schedule_request: schemas.ScheduleRequest):
+    return [
+        {"name": f"Slot {i}", "start": slot.start, "end": slot.end}
+        for i, slot in enumerate(schedule_request.available_slots)
+    ]
+
+
+def _schedule_response(
+    db: Session,
+    schedule_request: schemas.ScheduleRequest,
+    slots,
+    tasks_with_duration,
+    solver_status,
+    assignment,
+    task_times,
+):
+    """
+    Save the schedule for the request's user (if any) and format it into the
+    response model.
+    """
+    if assignment is not None and schedule_request.user_id is not None:
+        crud.save_user_schedule(
+            db,
+            schedule_request.user_id,
+            schedule_entries(tasks_with_duration, slots, assignment, task_times),
+        )
+    return _format_schedule(
+        schedule_request, tasks_with_duration, solver_status, assignment, task_times
+    )
+
+
+def _format_schedule(
+    schedule_request: schemas.ScheduleRequest,
+    tasks_with_duration,
+    solver_status,
+    assignment,
+    task_times,
+):
+    if assignment is None:
+        return schemas.Schedule(optimized_slots=[], status=solver_status)
+
+    optimized_slots = [
+        schemas.OptimizedSlot(start=slot.start, end=slot.end, task_ids=[])
+        for slot in schedule_request.available_slots
+    ]
+    for task, slot_index, (start, end) in zip(
+        tasks_with_duration, assignment, task_times
+    ):
+        optimized_slot = optimized_slots[slot_index]
+        optimized_slot.task_ids.append(task['id'])
+        optimized_slot.scheduled_tasks.append(
+            schemas.ScheduledTask(task_id=task['id'], start=start, end=end)
+        )
+    return schemas.Schedule(optimized_slots=optimized_slots, status=solver_status)
+
+
+@router.get("/schedule/cache/stats", response_model=schemas.ScheduleCacheStats)
+def schedule_cache_stats():
+    """
+    Hit/miss counters of the schedule result cache.
+    """
+    return schedule_cache.stats()
+
+
+# ============================
+# Background Optimization Jobs
+# ============================
+
+
+def _get_job_or_404(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def _greedy_schedule(
+    schedule_request: schemas.ScheduleRequest, slots, tasks_with_duration, slot_weights
+):
+    """
+    The greedy schedule an 'anytime' job starts from, found in milliseconds
+    and returned with the job while CP-SAT improves on it. It is never saved.
+    """
+    greedy = CalendarOptimizer(
+        tasks_with_duration, slots, slot_weights=slot_weights, mode="greedy"
+    )
+    greedy.optimize()
+    if greedy.assignment is None:
+        return None
+    return _format_schedule(
+        schedule_request,
+        tasks_with_duration,
+        greedy.status,
+        greedy.assignment,
+        greedy.task_times,
+    )
+
+
+def _job_response(job) -> schemas.ScheduleJob:
+    # Reads never save anything: the schedule was stored when the job finished.
+    return schemas.ScheduleJob(
+        job_id=job.id,
+        status=job.status,
+        best_objective=job.best_objective,
+        result=job.context.get("response"),
+        error=job.error,
+    )
+
+
+@router.post(
+    "/schedule/jobs",
+    response_model=schemas.ScheduleJob,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def create_schedule_job(
+    schedule_request: schemas.ScheduleRequest, db: Session = Depends(get_db)
+):
+    """
+    Queue an optimization on the background worker pool and return its job ID
+    at once. In 'anytime' mode the greedy schedule comes back right away as
+    the job's result, and is replaced by the solver's once the job succeeds.
+    Returns 429 when the queue is full.
+    """
+    slots = _request_slots(schedule_request)
+    tasks_with_duration, factory, args, kwargs = _optimizer_spec(
+        db, schedule_request, slots
+    )
+    if factory is PartitionedOptimizer:
+        # The job already has a worker process of its own.
+        kwargs["max_workers"] = 1
+    bind = db.get_bind()
+    context = {}
+    if schedule_request.mode == "anytime" and factory is not ScheduleRepairer:
+        # Found before the solve is queued, so a fast job's result is never
+        # overwritten with it. Repairs start from the saved schedule instead.
+        context["response"] = _greedy_schedule(
+            schedule_request, slots, tasks_with_duration, kwargs["slot_weights"]
+        )
+
+    def on_success(job):
+        # Runs once, when the job finishes, with a session of its own: the
+        # request's session is long closed by then.
+        with Session(bind) as session:
+            job.context["response"] = _schedule_response(
+                session, schedule_request, slots, tasks_with_duration, *job.result
+            )
+
+    try:
+        job = job_manager.submit(
+            factory, args, kwargs, context=context, on_success=on_success
+        )
+    except QueueFullError as exc:
+        raise HTTPException(status_code=429, detail=str(exc))
+    return _job_response(job)
+
+
+@router.get("/schedule/jobs/{job_id}", response_model=schemas.ScheduleJob)
+def read_schedule_job(job_id: str):
+    """
+    Status of an optimization job, with its schedule once it has succeeded
+    (an 'anytime' job's greedy schedule until then).
+    """
+    return _job_response(_get_job_or_404(job_id))
+
+
+@router.get("/schedule/jobs/{job_id}/events")
+async def stream_schedule_job_events(job_id: str):
+    """
+    Server-sent events for a job: 'status' on every state change and
+    'incumbent' with the objective of every improving solution. The stream
+    ends when the job has finished (or has been evicted meanwhile).
+    """
+    first = job_manager.events_since(job_id, 0)
+    if first is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        sent = 0
+        batch = first
+        while batch is not None:
+            new_events, finished = batch
+            for event in new_events:
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+            sent += len(new_events)
+            if finished:
+                return
+            await asyncio.sleep(SCHEDULE_JOB_EVENTS_POLL_SECONDS)
+            batch = job_manager.events_since(job_id, sent)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@router.delete("/schedule/jobs/{job_id}", response_model=schemas.ScheduleJob)
+def cancel_schedule_job(job_id: str):
+    """
+    Cancel a queued or running optimization job.
+    """
+    _get_job_or_404(job_id)
+    return _job_response(job_manager.cancel(job_id))
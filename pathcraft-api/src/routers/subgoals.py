@@ -1,10 +1,11 @@
 from uuid import UUID
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
 from .. import crud, models, schemas
 from ..database import get_db
+from ..pagination import NEXT_CURSOR_HEADER, InvalidCursorError
 
 router = APIRouter(
     tags=["Sub-Goals"],
@@ -24,24 +25,39 @@ def create_sub_goal_for_goal(
     Create a new sub-goal for a specific goal.
     """
     # First, check if the parent goal exists
-    db_goal = crud.get_goal(db, goal_id=goal_id)
-    if db_goal is None:
+    if not crud.goal_exists(db, goal_id=goal_id):
         raise HTTPException(status_code=404, detail="Parent goal not found")
     return crud.create_sub_goal(db=db, sub_goal=sub_goal, goal_id=goal_id)
 
 
 @router.get("/goals/{goal_id}/subgoals/", response_model=List[schemas.SubGoal])
 def read_sub_goals_for_goal(
-    goal_id: UUID, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
+    goal_id: UUID,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
 ):
     """
     Retrieve all sub-goals for a specific goal.
+
+    Passing `cursor` switches to keyset pagination (see `GET /goals/`).
     """
-    db_goal = crud.get_goal(db, goal_id=goal_id)
-    if db_goal is None:
+    if not crud.goal_exists(db, goal_id=goal_id):
         raise HTTPException(status_code=404, detail="Parent goal not found")
 
-    sub_goals = crud.get_sub_goals_by_goal(db, goal_id=goal_id, skip=skip, limit=limit)
+    if cursor is None:
+        return crud.get_sub_goals_by_goal(db, goal_id=goal_id, skip=skip, limit=limit)
+
+    try:
+        sub_goals, next_cursor = crud.get_sub_goals_page_by_goal(
+            db, goal_id=goal_id, cursor=cursor, limit=limit
+        )
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return sub_goals
 
 
@@ -1,17 +1,22 @@
 from uuid import UUID
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from datetime import date, datetime
 from .. import crud, schemas
 from ..database import get_db
+from ..pagination import NEXT_CURSOR_HEADER, InvalidCursorError
+from ..responses import FastJSONResponse, ndjson_batches
 
 router = APIRouter(
     tags=["Tasks"],
     responses={404: {"description": "Not found"}},
 )
 
+SCHEDULE_STREAM_BATCH_SIZE = 1000
+
 
 @router.get(
     "/schedule/",
@@ -19,19 +24,40 @@ router = APIRouter(
     summary="Get Task Schedule for a Date Range",
 )
 def get_schedule_for_date_range(
-    start_date: date, end_date: date, db: Session = Depends(get_db)
+    start_date: date,
+    end_date: date,
+    stream: bool = False,
+    db: Session = Depends(get_db),
 ):
     """
     Retrieve all tasks scheduled to start within a given date range.
+
+    With `stream=true` the tasks are sent as newline-delimited JSON
+    (`application/x-ndjson`), ordered by planned start, while they are still
+    being read from the database.
+
+    Tasks are read as plain rows and serialized directly (see FastJSONResponse).
     """
     # Convert date objects to datetime objects for the query
     start_datetime = datetime.combine(start_date, datetime.min.time())
     end_datetime = datetime.combine(end_date, datetime.max.time())
 
-    tasks = crud.get_tasks_by_date_range(
+    if stream:
+        tasks = crud.iter_task_dicts_by_date_range(
+            db,
+            start_date=start_datetime,
+            end_date=end_datetime,
+            batch_size=SCHEDULE_STREAM_BATCH_SIZE,
+        )
+        return StreamingResponse(
+            ndjson_batches(tasks, SCHEDULE_STREAM_BATCH_SIZE),
+            media_type="application/x-ndjson",
+        )
+
+    tasks = crud.get_task_dicts_by_date_range(
         db, start_date=start_datetime, end_date=end_datetime
     )
-    return tasks
+    return FastJSONResponse(tasks)
 
 
 @router.post(
@@ -47,32 +73,89 @@ def create_task_for_subgoal(
     Create a new task for a specific sub-goal.
     """
     # Check if the parent sub-goal exists
-    db_subgoal = crud.get_sub_goal(db, sub_goal_id=subgoal_id)
-    if db_subgoal is None:
+    if not crud.sub_goal_exists(db, sub_goal_id=subgoal_id):
         raise HTTPException(status_code=404, detail="Parent sub-goal not found")
 
     return crud.create_task(db=db, task=task, sub_goal_id=subgoal_id)
 
 
+@router.post(
+    "/subgoals/{subgoal_id}/tasks/bulk",
+    response_model=List[schemas.Task],
+    status_code=status.HTTP_201_CREATED,
+    summary="Create Many Tasks for a Sub-Goal",
+)
+def create_tasks_for_subgoal(
+    subgoal_id: UUID, tasks: List[schemas.TaskCreate], db: Session = Depends(get_db)
+):
+    """
+    Create a batch of tasks for a specific sub-goal in one transaction.
+    """
+    if not crud.sub_goal_exists(db, sub_goal_id=subgoal_id):
+        raise HTTPException(status_code=404, detail="Parent sub-goal not found")
+
+    return crud.create_tasks(db=db, tasks=tasks, sub_goal_id=subgoal_id)
+
+
+@router.post(
+    "/tasks/bulk",
+    response_model=List[schemas.Task],
+    status_code=status.HTTP_201_CREATED,
+    summary="Create Many Tasks Across Sub-Goals",
+)
+def create_tasks_across_subgoals(
+    tasks: List[schemas.TaskBulkCreate], db: Session = Depends(get_db)
+):
+    """
+    Create a batch of tasks, each under the sub-goal named by its `subgoal_id`,
+    in one transaction. Every distinct parent is checked once; if any is
+    missing, nothing is written.
+    """
+    missing = crud.get_missing_sub_goal_ids(db, {task.subgoal_id for task in tasks})
+    if missing:
+        missing_ids = ", ".join(sorted(str(sub_goal_id) for sub_goal_id in missing))
+        raise HTTPException(
+            status_code=404, detail=f"Parent sub-goals not found: {missing_ids}"
+        )
+
+    return crud.create_tasks_for_sub_goals(db=db, tasks=tasks)
+
+
 @router.get(
     "/subgoals/{subgoal_id}/tasks/",
     response_model=List[schemas.Task],
     summary="Read Tasks for a Sub-Goal",
 )
 def read_tasks_for_subgoal(
-    subgoal_id: UUID, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
+    subgoal_id: UUID,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
 ):
     """
     Retrieve all tasks for a specific sub-goal.
+
+    Passing `cursor` switches to keyset pagination (see `GET /goals/`).
     """
-    db_subgoal = crud.get_sub_goal(db, sub_goal_id=subgoal_id)
-    if db_subgoal is None:
+    if not crud.sub_goal_exists(db, sub_goal_id=subgoal_id):
         raise HTTPException(status_code=404, detail="Parent sub-goal not found")
 
-    tasks = crud.get_tasks_by_sub_goal(
-        db, sub_goal_id=subgoal_id, skip=skip, limit=limit
-    )
-    return tasks
+    if cursor is None:
+        return FastJSONResponse(
+            crud.get_task_dicts_by_sub_goal(
+                db, sub_goal_id=subgoal_id, skip=skip, limit=limit
+            )
+        )
+
+    try:
+        tasks, next_cursor = crud.get_task_dicts_page_by_sub_goal(
+            db, sub_goal_id=subgoal_id, cursor=cursor, limit=limit
+        )
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return FastJSONResponse(tasks, headers=headers)
 
 
 @router.get(
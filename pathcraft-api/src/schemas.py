@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Literal, Optional
 from uuid import UUID
 from datetime import datetime
 
@@ -20,6 +20,10 @@ class TaskCreate(TaskBase):
     reminder_policy_id: Optional[str] = None
 
 
+class TaskBulkCreate(TaskCreate):
+    subgoal_id: UUID
+
+
 class TaskUpdate(BaseModel):
     description: Optional[str] = None
     planned_start: Optional[datetime] = None
@@ -50,7 +54,6 @@ class SubGoalBase(BaseModel):
     estimated_effort_minutes: Optional[int] = None
     dependencies: Optional[List[UUID]] = None
     notes: Optional[str] = None
-    progress_percentage: int = 0
 
 
 class SubGoalCreate(SubGoalBase):
@@ -62,12 +65,15 @@ class SubGoalUpdate(BaseModel):
     estimated_effort_minutes: Optional[int] = None
     dependencies: Optional[List[UUID]] = None
     notes: Optional[str] = None
-    progress_percentage: Optional[int] = None
 
 
 class SubGoal(SubGoalBase):
     id: UUID
     parent_goal_id: UUID
+    # Maintained by the server as tasks are created, completed and deleted.
+    tasks_done: int = 0
+    tasks_total: int = 0
+    progress_percentage: int = 0
     tasks: List[Task] = []
 
     model_config = ConfigDict(from_attributes=True)
@@ -83,7 +89,6 @@ class GoalBase(BaseModel):
     target_date: datetime
     methodology: str = "custom"
     notes: Optional[str] = None
-    progress_percentage: int = 0
 
 
 class GoalCreate(GoalBase):
@@ -95,16 +100,43 @@ class GoalUpdate(BaseModel):
     target_date: Optional[datetime] = None
     methodology: Optional[str] = None
     notes: Optional[str] = None
-    progress_percentage: Optional[int] = None
 
 
 class Goal(GoalBase):
     id: UUID
+    # Maintained by the server over the tasks of all sub-goals.
+    tasks_done: int = 0
+    tasks_total: int = 0
+    progress_percentage: int = 0
     sub_goals: List[SubGoal] = []
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class GoalSummary(BaseModel):
+    """
+    Dashboard aggregates of one goal, computed over the tasks of all its sub-goals.
+    """
+
+    id: UUID
+    title: str
+    target_date: datetime
+    methodology: str
+    progress_percentage: int
+    tasks_total: int
+    tasks_todo: int
+    tasks_in_progress: int
+    tasks_done: int
+    tasks_skipped: int
+    # Open (todo or in-progress) tasks whose planned end, or start if there is
+    # no end, has passed.
+    tasks_overdue: int
+    # Earliest upcoming planned end (or start) of an open task.
+    next_due: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 # Pydantic v2 automatically handles forward references,
 # so model_rebuild() is often not needed if types are annotated correctly.
 # If issues arise, it can be called here:
@@ -122,14 +154,66 @@ class TimeSlot(BaseModel):
 class ScheduleRequest(BaseModel):
     task_ids: List[UUID]
     available_slots: List[TimeSlot]
+    # 'greedy' answers in milliseconds, 'exact' runs CP-SAT, and 'anytime'
+    # starts CP-SAT from the greedy schedule and keeps the best one by the deadline.
+    # /schedule/optimize answers once the solve is done; an 'anytime' job
+    # returns the greedy schedule at once (see /schedule/jobs).
+    mode: Literal["greedy", "exact", "anytime"] = "exact"
+    # 'interval' schedules every task on one timeline with exact start times
+    # and scales to much larger problems than the 'boolean' task x slot model.
+    engine: Literal["boolean", "interval"] = "boolean"
+    # Solver budget; the server defaults apply when these are omitted.
+    time_limit_seconds: Optional[float] = Field(default=None, gt=0)
+    num_workers: Optional[int] = Field(default=None, ge=1)
+    # Split the horizon into per-day or per-week windows that are solved in
+    # parallel; worthwhile for long horizons with many tasks.
+    partition: Optional[Literal["day", "week"]] = None
+    # With a user_id the resulting schedule is saved for that user. With
+    # repair=True it is instead patched from the saved one: only the slots
+    # holding changed (or new) tasks are re-planned, everything else stays put.
+    user_id: Optional[str] = None
+    repair: bool = False
+    changed_task_ids: List[UUID] = []
+
+
+class ScheduledTask(BaseModel):
+    task_id: UUID
+    start: datetime
+    end: datetime
 
 class OptimizedSlot(BaseModel):
     start: datetime
     end: datetime
     task_ids: List[UUID]
+    scheduled_tasks: List[ScheduledTask] = []
 
 class Schedule(BaseModel):
     optimized_slots: List[OptimizedSlot]
+    # 'OPTIMAL' if the solver proved optimality, 'FEASIBLE' if the budget ran
+    # out with a valid (but maybe improvable) schedule, otherwise the failure status.
+    status: Optional[str] = None
+
+
+class ScheduleJob(BaseModel):
+    job_id: str
+    # 'queued', 'running', 'succeeded', 'failed' or 'cancelled'
+    status: str
+    # Objective of the best solution found so far, while the job runs.
+    best_objective: Optional[float] = None
+    # The schedule once the job has succeeded; for 'anytime' jobs the greedy
+    # schedule until then.
+    result: Optional[Schedule] = None
+    error: Optional[str] = None
+
+
+class ScheduleCacheStats(BaseModel):
+    hits: int
+    misses: int
+    # Requests that waited on an identical in-flight solve instead of starting
+    # their own.
+    coalesced: int
+    invalidations: int
+    size: int
 
 class ReminderSuggestionRequest(BaseModel):
     user_id: str
@@ -142,3 +226,26 @@ class ReminderReward(BaseModel):
     user_id: str
     arm: str
     reward: float
+
+
+# Largest batch accepted by the batch reminder endpoints.
+MAX_REMINDER_BATCH = 10000
+
+
+class ReminderSuggestionBatchRequest(BaseModel):
+    user_ids: List[str] = Field(min_length=1, max_length=MAX_REMINDER_BATCH)
+
+
+class ReminderSuggestionBatch(BaseModel):
+    suggestions: List[ReminderSuggestion]
+
+
+class ReminderRewardBatch(BaseModel):
+    rewards: List[ReminderReward] = Field(min_length=1, max_length=MAX_REMINDER_BATCH)
+
+
+class ReminderRewardBatchResult(BaseModel):
+    status: str
+    rewards: int
+    # Distinct (user, arm) pairs the rewards were coalesced into.
+    updated: int
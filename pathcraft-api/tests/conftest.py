@@ -6,7 +6,10 @@ from datetime import datetime, timezone
 
 from src.main import app
 from src.database import get_db
+from src.ml.bandit_storage import SQLBanditStorage
+from src.ml.reminder_system import ReminderBanditManager
 from src.models import Base
+from src.routers.ml import get_reminder_manager
 
 # ====================
 # Test Fixtures
@@ -41,9 +44,21 @@ def db_session():
 
 
 @pytest.fixture(scope="function")
-def client(db_session: Session):
+def reminder_manager(db_session: Session):
     """
-    Pytest fixture to provide a TestClient with the get_db dependency overridden.
+    Pytest fixture to provide a ReminderBanditManager that stores its bandits
+    in the in-memory test database.
+    """
+    manager = ReminderBanditManager(storage=SQLBanditStorage(engine))
+    yield manager
+    manager.close()
+
+
+@pytest.fixture(scope="function")
+def client(db_session: Session, reminder_manager: ReminderBanditManager):
+    """
+    Pytest fixture to provide a TestClient with the get_db and
+    get_reminder_manager dependencies overridden.
     This allows tests to interact with the in-memory test database.
     """
 
@@ -51,9 +66,11 @@ def client(db_session: Session):
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_reminder_manager] = lambda: reminder_manager
     yield TestClient(app)
-    # Clean up the dependency override after the test
+    # Clean up the dependency overrides after the test
     del app.dependency_overrides[get_db]
+    app.dependency_overrides.pop(get_reminder_manager, None)
 
 
 # Helper fixture to create a goal for tests that need one
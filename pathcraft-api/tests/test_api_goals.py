@@ -1,3 +1,5 @@
+import pytest
+from uuid import UUID, uuid4
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone, timedelta
@@ -88,6 +90,7 @@ def test_update_goal(client: TestClient):
     data = update_response.json()
     assert data["title"] == "Updated Title"
     assert data["id"] == goal_id
+    assert client.put(f"/goals/{uuid4()}", json={"title": "X"}).status_code == 404
 
 
 def test_delete_goal(client: TestClient):
@@ -152,3 +155,287 @@ def test_decompose_goal_endpoint(client: TestClient):
     get_response = client.get(f"/goals/{goal_id}/subgoals/")
     assert get_response.status_code == 200
     assert len(get_response.json()) == 5
+
+
+def test_read_goals_with_cursor_pagination(client: TestClient):
+    """
+    Test walking through GET /goals using keyset (cursor) pagination.
+    """
+    target_date_str = datetime.now(timezone.utc).isoformat()
+    for i in range(5):
+        client.post(
+            "/goals/", json={"title": f"Goal {i}", "target_date": target_date_str}
+        )
+
+    seen_ids = []
+    cursor = ""
+    pages = 0
+    while cursor is not None:
+        response = client.get("/goals/", params={"cursor": cursor, "limit": 2})
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 2
+        seen_ids.extend(goal["id"] for goal in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        pages += 1
+
+    assert pages == 3
+    assert len(seen_ids) == 5
+    assert len(set(seen_ids)) == 5
+
+
+def test_read_goals_with_invalid_cursor(client: TestClient):
+    """
+    Test that a malformed cursor is rejected with a 400 error.
+    """
+    response = client.get("/goals/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_decompose_goal_inserts_sub_goals_in_one_statement(
+    client: TestClient, db_session: Session
+):
+    """
+    Test that decomposition writes all generated sub-goals with a single INSERT
+    and returns them in template order.
+    """
+    from sqlalchemy import event
+
+    from src.decomposition import DECOMPOSITION_TEMPLATES
+
+    target_date = datetime.now(timezone.utc).isoformat()
+    goal_id = client.post(
+        "/goals/", json={"title": "Build a shed", "target_date": target_date}
+    ).json()["id"]
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.post(f"/goals/{goal_id}/decompose")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 201
+    descriptions = [sub_goal["description"] for sub_goal in response.json()]
+    assert descriptions == DECOMPOSITION_TEMPLATES["build"]
+    inserts = [s for s in statements if s.lstrip().upper().startswith("INSERT")]
+    assert len(inserts) == 1
+    # Only the goal's own row is looked up, never its existing tree.
+    lookups = statements[:statements.index(inserts[0])]
+    assert not any("FROM tasks" in s or "FROM sub_goals" in s for s in lookups)
+
+
+def test_read_goal_summaries(client: TestClient, db_session: Session):
+    """
+    Test that GET /goals/summary aggregates task counts, overdue counts and
+    the next due date per goal in one query, with filters and pagination.
+    """
+    from sqlalchemy import event
+
+    now = datetime.now(timezone.utc)
+    target_date = now.isoformat()
+    busy = client.post(
+        "/goals/",
+        json={"title": "Busy", "target_date": target_date, "methodology": "SMART"},
+    ).json()
+    idle = client.post(
+        "/goals/", json={"title": "Idle", "target_date": target_date}
+    ).json()
+    sub_goals = [
+        client.post(f"/goals/{busy['id']}/subgoals/", json={"description": d}).json()
+        for d in ("A", "B")
+    ]
+    soon = now + timedelta(days=1)
+    late = (now - timedelta(hours=1)).isoformat()
+    started = (now - timedelta(days=2)).isoformat()
+    later = (now + timedelta(days=3)).isoformat()
+    tasks = [
+        (sub_goals[0], {"planned_start": started}, "todo"),
+        (sub_goals[0], {"planned_end": late}, "in-progress"),
+        (sub_goals[0], {"planned_end": late}, "done"),
+        (sub_goals[1], {"planned_end": soon.isoformat()}, "todo"),
+        (sub_goals[1], {"planned_end": later}, "skipped"),
+        (sub_goals[1], {}, "todo"),
+    ]
+    for sub_goal, dates, status in tasks:
+        task = client.post(
+            f"/subgoals/{sub_goal['id']}/tasks/", json={"description": "T", **dates}
+        ).json()
+        client.put(f"/tasks/{task['id']}", json={"status": status})
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/goals/summary")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200, response.text
+    assert len(statements) == 1 and "GROUP BY" in statements[0]
+    summaries = {summary["id"]: summary for summary in response.json()}
+    summary = summaries[busy["id"]]
+    assert (
+        summary["tasks_total"],
+        summary["tasks_todo"],
+        summary["tasks_in_progress"],
+        summary["tasks_done"],
+        summary["tasks_skipped"],
+        summary["tasks_overdue"],
+    ) == (6, 3, 1, 1, 1, 2)
+    next_due = datetime.fromisoformat(summary["next_due"])
+    if next_due.tzinfo is None:
+        next_due = next_due.replace(tzinfo=timezone.utc)
+    assert abs(next_due - soon) < timedelta(seconds=1)
+    assert summaries[idle["id"]]["tasks_total"] == 0
+    assert summaries[idle["id"]]["next_due"] is None
+
+    filtered = client.get("/goals/summary", params={"methodology": "SMART"}).json()
+    assert [s["id"] for s in filtered] == [busy["id"]]
+    overdue = client.get("/goals/summary", params={"overdue_only": True}).json()
+    assert [s["id"] for s in overdue] == [busy["id"]]
+
+    first_page = client.get("/goals/summary", params={"limit": 1})
+    cursor = first_page.headers["X-Next-Cursor"]
+    second_page = client.get("/goals/summary", params={"limit": 1, "cursor": cursor})
+    assert "X-Next-Cursor" not in second_page.headers
+    assert {first_page.json()[0]["id"], second_page.json()[0]["id"]} == set(summaries)
+    assert client.get("/goals/summary", params={"cursor": "bad"}).status_code == 400
+
+
+def test_fast_read_path_matches_response_models(
+    client: TestClient, db_session: Session
+):
+    """
+    Test that the list endpoints, which serialize plain rows with orjson,
+    return exactly what validating the ORM objects through the response
+    models produces.
+    """
+    from typing import List
+
+    from pydantic import TypeAdapter
+    from sqlalchemy import event
+
+    from src import crud, schemas
+
+    now = datetime.now(timezone.utc)
+    for i in range(3):
+        goal = client.post(
+            "/goals/",
+            json={"title": f"Goal {i}", "target_date": now.isoformat(), "notes": "n"},
+        ).json()
+        sub_goal = client.post(
+            f"/goals/{goal['id']}/subgoals/",
+            json={"description": "S", "estimated_effort_minutes": 30},
+        ).json()
+        for j in range(2):
+            task = client.post(
+                f"/subgoals/{sub_goal['id']}/tasks/",
+                json={"description": f"T{j}", "planned_start": now.isoformat()},
+            ).json()
+            client.put(f"/tasks/{task['id']}", json={"status": "done"})
+    db_session.expire_all()
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/goals/")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert len(statements) == 3  # goals, sub-goals, tasks
+    expected = TypeAdapter(List[schemas.Goal]).dump_python(
+        crud.get_goals(db_session), mode="json"
+    )
+    assert response.json() == expected
+    assert response.json()[0]["sub_goals"][0]["tasks"][0]["status"] == "done"
+
+    tasks = TypeAdapter(List[schemas.Task])
+    sub_goal_id = expected[0]["sub_goals"][0]["id"]
+    assert client.get(f"/subgoals/{sub_goal_id}/tasks/").json() == tasks.dump_python(
+        crud.get_tasks_by_sub_goal(db_session, UUID(sub_goal_id)), mode="json"
+    )
+    day = now.date().isoformat()
+    schedule = client.get("/schedule/", params={"start_date": day, "end_date": day})
+    assert schedule.headers["content-type"] == "application/json"
+    assert len(schedule.json()) == 6
+    page = client.get("/goals/", params={"cursor": "", "limit": 2})
+    first_ids = sorted(goal["id"] for goal in expected)[:2]
+    assert [goal["id"] for goal in page.json()] == first_ids
+    assert "X-Next-Cursor" in page.headers
+
+
+def test_read_goals_with_depth_and_fields(client: TestClient, db_session: Session):
+    """
+    Test that `depth` skips the child queries and `fields` trims every level
+    of the goal tree, for the list and the single-goal endpoints.
+    """
+    from sqlalchemy import event
+
+    target_date = datetime.now(timezone.utc).isoformat()
+    goal = client.post(
+        "/goals/", json={"title": "Goal", "target_date": target_date}
+    ).json()
+    sub_goal = client.post(
+        f"/goals/{goal['id']}/subgoals/",
+        json={"description": "S", "notes": "long notes"},
+    ).json()
+    for i in range(3):
+        client.post(f"/subgoals/{sub_goal['id']}/tasks/", json={"description": f"T{i}"})
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    def get(path, **params):
+        statements.clear()
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            response = client.get(path, params=params)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        assert response.status_code == 200, response.text
+        return response
+
+    full = get("/goals/")
+    shallow = get("/goals/", depth=0, fields="title")
+    assert len(statements) == 1
+    assert shallow.json() == [{"title": "Goal", "id": goal["id"]}]
+    assert len(shallow.content) * 10 < len(full.content)
+
+    listing = get("/goals/", depth=1, fields="sub_goals.description").json()
+    assert len(statements) == 2
+    assert "tasks" not in listing[0]["sub_goals"][0]
+    assert listing[0]["sub_goals"] == [{"description": "S", "id": sub_goal["id"]}]
+    assert listing[0]["title"] == "Goal"
+
+    single = get(f"/goals/{goal['id']}", fields="title,tasks.status").json()
+    assert len(statements) == 3
+    assert set(single) == {"id", "title", "sub_goals"}
+    assert single["sub_goals"][0]["notes"] == "long notes"
+    full_tasks = full.json()[0]["sub_goals"][0]["tasks"]
+    assert single["sub_goals"][0]["tasks"] == [
+        {"id": task["id"], "status": "todo"} for task in full_tasks
+    ]
+    assert get(f"/goals/{goal['id']}", depth=0).json()["progress_percentage"] == 0
+    assert len(statements) == 1
+
+    assert client.get("/goals/", params={"fields": "secret"}).status_code == 400
+    too_deep = {"depth": 0, "fields": "tasks.status"}
+    assert client.get("/goals/", params=too_deep).status_code == 400
+    assert client.get(f"/goals/{goal['id']}", params={"depth": 3}).status_code == 422
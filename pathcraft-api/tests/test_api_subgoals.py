@@ -108,3 +108,18 @@ def test_delete_sub_goal(client: TestClient, test_goal: dict):
     # Verify it's gone
     get_response = client.get(f"/subgoals/{sub_goal_id}")
     assert get_response.status_code == 404
+
+
+def test_create_sub_goal_after_parent_deleted(client: TestClient, test_goal: dict):
+    """
+    Test that the parent existence check does not serve a stale answer after
+    the parent goal has been deleted within the same session.
+    """
+    goal_id = test_goal["id"]
+    first = client.post(f"/goals/{goal_id}/subgoals/", json={"description": "Before"})
+    assert first.status_code == 201
+
+    assert client.delete(f"/goals/{goal_id}").status_code == 200
+
+    second = client.post(f"/goals/{goal_id}/subgoals/", json={"description": "After"})
+    assert second.status_code == 404
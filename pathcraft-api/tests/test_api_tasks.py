@@ -209,3 +209,216 @@ def test_get_schedule_for_date_range(client: TestClient, test_sub_goal: dict):
     response_empty = client.get(f"/schedule/?start_date={far_future}&end_date={far_future}")
     assert response_empty.status_code == 200
     assert len(response_empty.json()) == 0
+
+
+def test_read_tasks_for_subgoal_with_cursor_pagination(
+    client: TestClient, test_sub_goal: dict
+):
+    """
+    Test keyset pagination of the tasks listing for a sub-goal.
+    """
+    subgoal_id = test_sub_goal["id"]
+    for i in range(3):
+        client.post(f"/subgoals/{subgoal_id}/tasks/", json={"description": f"Task {i}"})
+
+    first = client.get(
+        f"/subgoals/{subgoal_id}/tasks/", params={"cursor": "", "limit": 2}
+    )
+    assert first.status_code == 200
+    assert len(first.json()) == 2
+    next_cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get(
+        f"/subgoals/{subgoal_id}/tasks/", params={"cursor": next_cursor, "limit": 2}
+    )
+    assert second.status_code == 200
+    assert len(second.json()) == 1
+    assert "X-Next-Cursor" not in second.headers
+
+    ids = [t["id"] for t in first.json() + second.json()]
+    assert len(set(ids)) == 3
+
+
+def test_create_task_for_nonexistent_subgoal(client: TestClient):
+    """
+    Test that creating a task under a non-existent sub-goal fails.
+    """
+    import uuid
+
+    response = client.post(
+        f"/subgoals/{uuid.uuid4()}/tasks/", json={"description": "This should fail"}
+    )
+    assert response.status_code == 404
+
+
+def test_create_tasks_in_bulk_for_subgoal(client: TestClient, test_sub_goal: dict):
+    """
+    Test creating many tasks for one sub-goal with the bulk endpoint.
+    """
+    subgoal_id = test_sub_goal["id"]
+    payload = [{"description": f"Imported task {i}"} for i in range(50)]
+
+    response = client.post(f"/subgoals/{subgoal_id}/tasks/bulk", json=payload)
+    assert response.status_code == 201, response.text
+    data = response.json()
+    assert len(data) == 50
+    assert all(task["subgoal_id"] == subgoal_id for task in data)
+    assert all(task["status"] == "todo" for task in data)
+
+    listing = client.get(f"/subgoals/{subgoal_id}/tasks/", params={"limit": 100})
+    assert len(listing.json()) == 50
+
+
+def test_create_tasks_in_bulk_across_subgoals(client: TestClient, test_goal: dict):
+    """
+    Test the cross-sub-goal bulk endpoint, including the all-or-nothing
+    behaviour when one parent does not exist.
+    """
+    import uuid
+
+    goal_id = test_goal["id"]
+    first, second = (
+        client.post(f"/goals/{goal_id}/subgoals/", json={"description": d}).json()
+        for d in ("A", "B")
+    )
+
+    payload = [
+        {"subgoal_id": first["id"], "description": "A1"},
+        {"subgoal_id": second["id"], "description": "B1"},
+        {"subgoal_id": second["id"], "description": "B2"},
+    ]
+    response = client.post("/tasks/bulk", json=payload)
+    assert response.status_code == 201, response.text
+    assert [task["subgoal_id"] for task in response.json()] == [
+        first["id"],
+        second["id"],
+        second["id"],
+    ]
+
+    bad_payload = [
+        {"subgoal_id": first["id"], "description": "A2"},
+        {"subgoal_id": str(uuid.uuid4()), "description": "Orphan"},
+    ]
+    response = client.post("/tasks/bulk", json=bad_payload)
+    assert response.status_code == 404
+    listing = client.get(f"/subgoals/{first['id']}/tasks/")
+    assert [task["description"] for task in listing.json()] == ["A1"]
+
+
+def test_get_schedule_for_date_range_streaming(client: TestClient, test_sub_goal: dict):
+    """
+    Test that GET /schedule?stream=true returns the same tasks as NDJSON,
+    ordered by planned start.
+    """
+    import json
+
+    subgoal_id = test_sub_goal["id"]
+    now = datetime.now(timezone.utc)
+    today = now.date()
+    for hour in (2, 0, 1):
+        client.post(
+            f"/subgoals/{subgoal_id}/tasks/",
+            json={
+                "description": f"Task +{hour}h",
+                "planned_start": now.replace(hour=hour).isoformat(),
+            },
+        )
+
+    response = client.get(f"/schedule/?start_date={today}&end_date={today}&stream=true")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines() if line]
+    assert [row["description"] for row in rows] == ["Task +0h", "Task +1h", "Task +2h"]
+
+
+def test_task_changes_maintain_progress_rollups(client: TestClient, test_goal: dict):
+    """
+    Test that creating, completing, reopening and deleting tasks keeps the
+    sub-goal and goal counters and percentages current.
+    """
+    goal_id = test_goal["id"]
+    first, second = (
+        client.post(f"/goals/{goal_id}/subgoals/", json={"description": d}).json()
+        for d in ("A", "B")
+    )
+    a1 = client.post(
+        f"/subgoals/{first['id']}/tasks/", json={"description": "A1"}
+    ).json()
+    bulk = client.post(
+        "/tasks/bulk",
+        json=[
+            {"subgoal_id": first["id"], "description": "A2"},
+            {"subgoal_id": second["id"], "description": "B1"},
+            {"subgoal_id": second["id"], "description": "B2"},
+        ],
+    ).json()
+
+    def progress(path):
+        data = client.get(path).json()
+        return data["tasks_done"], data["tasks_total"], data["progress_percentage"]
+
+    assert progress(f"/goals/{goal_id}") == (0, 4, 0)
+    client.put(f"/tasks/{a1['id']}", json={"status": "done"})
+    client.put(f"/tasks/{a1['id']}", json={"status": "done"})  # no double counting
+    client.put(f"/tasks/{bulk[1]['id']}", json={"status": "done"})
+    assert progress(f"/subgoals/{first['id']}") == (1, 2, 50)
+    assert progress(f"/goals/{goal_id}") == (2, 4, 50)
+
+    client.put(f"/tasks/{bulk[1]['id']}", json={"status": "todo"})
+    client.delete(f"/tasks/{bulk[2]['id']}")
+    assert progress(f"/subgoals/{second['id']}") == (0, 1, 0)
+    assert progress(f"/goals/{goal_id}") == (1, 3, 33)
+
+    client.delete(f"/subgoals/{first['id']}")
+    assert progress(f"/goals/{goal_id}") == (0, 1, 0)
+    # Progress is no longer client-writable.
+    client.put(f"/goals/{goal_id}", json={"progress_percentage": 90})
+    assert progress(f"/goals/{goal_id}") == (0, 1, 0)
+
+
+def test_recompute_progress_backfills_counters(
+    client: TestClient, db_session, test_sub_goal: dict
+):
+    """
+    Test that the bulk recompute rebuilds counters from the tasks, and that
+    missing counter columns are added to an older database.
+    """
+    from sqlalchemy import create_engine, inspect, update
+    from src import crud, models
+    from src.manage import add_progress_columns
+
+    for i in range(4):
+        task = client.post(
+            f"/subgoals/{test_sub_goal['id']}/tasks/", json={"description": f"T{i}"}
+        ).json()
+        if i < 3:
+            client.put(f"/tasks/{task['id']}", json={"status": "done"})
+    db_session.execute(update(models.SubGoal).values(
+        tasks_done=0, tasks_total=0, progress_percentage=0
+    ))
+    db_session.execute(update(models.Goal).values(
+        tasks_done=9, tasks_total=9, progress_percentage=100
+    ))
+    db_session.commit()
+
+    assert crud.recompute_progress(db_session) == (1, 1)
+    goal = client.get(f"/goals/{test_sub_goal['parent_goal_id']}").json()
+    counters = goal["tasks_done"], goal["tasks_total"], goal["progress_percentage"]
+    assert counters == (3, 4, 75)
+    assert goal["sub_goals"][0]["progress_percentage"] == 75
+
+    old_engine = create_engine("sqlite:///:memory:")
+    with old_engine.begin() as connection:
+        for table in ("goals", "sub_goals"):
+            connection.exec_driver_sql(
+                f"CREATE TABLE {table} "
+                "(id CHAR(32) PRIMARY KEY, progress_percentage INTEGER)"
+            )
+    assert add_progress_columns(old_engine) == [
+        "goals.tasks_done",
+        "goals.tasks_total",
+        "sub_goals.tasks_done",
+        "sub_goals.tasks_total",
+    ]
+    assert add_progress_columns(old_engine) == []
+    assert "tasks_done" in {c["name"] for c in inspect(old_engine).get_columns("goals")}
@@ -61,6 +61,9 @@ def test_optimize_schedule_endpoint(client: TestClient, test_goal: dict):
     data = response.json()
     assert "optimized_slots" in data
     assert len(data["optimized_slots"]) > 0
+    assert data["status"] in ("OPTIMAL", "FEASIBLE")
+    scheduled = [t for slot in data["optimized_slots"] for t in slot["scheduled_tasks"]]
+    assert sorted(t["task_id"] for t in scheduled) == sorted([task1_id, task2_id])
     # Further assertions can be made here to check the correctness of the solution
 
 def test_reminder_suggestion_endpoint(client: TestClient):
@@ -78,3 +81,964 @@ def test_reminder_reward_endpoint(client: TestClient):
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "ok"
+
+
+def test_load_tasks_with_duration_batches_queries(
+    client: TestClient, test_goal: dict, db_session
+):
+    from uuid import UUID, uuid4
+    from sqlalchemy import event
+    from src.routers.ml import load_tasks_with_duration
+
+    estimated = client.post(
+        f"/goals/{test_goal['id']}/subgoals/",
+        json={"description": "Estimated", "estimated_effort_minutes": 60},
+    ).json()
+    unestimated = client.post(
+        f"/goals/{test_goal['id']}/subgoals/", json={"description": "Unestimated"}
+    ).json()
+    estimated_ids = [
+        client.post(
+            f"/subgoals/{estimated['id']}/tasks/", json={"description": f"E{i}"}
+        ).json()["id"]
+        for i in range(3)
+    ]
+    unestimated_id = client.post(
+        f"/subgoals/{unestimated['id']}/tasks/", json={"description": "U"}
+    ).json()["id"]
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    task_ids = [UUID(unestimated_id), uuid4()] + [UUID(i) for i in estimated_ids]
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        tasks = load_tasks_with_duration(db_session, task_ids)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert len(statements) == 1
+    assert [t["name"] for t in tasks] == ["U", "E0", "E1", "E2"]
+    assert [t["duration"] for t in tasks] == [30, 20, 20, 20]
+
+
+def test_calendar_optimizer_prefers_weighted_slots():
+    tasks = [{'name': 'Long', 'duration': 90}, {'name': 'Short', 'duration': 30}]
+    now = datetime.now()
+    slots = [
+        {'name': 'Low', 'start': now, 'end': now + timedelta(hours=2)},
+        {
+            'name': 'High',
+            'start': now + timedelta(hours=3),
+            'end': now + timedelta(hours=4, minutes=30),
+        },
+    ]
+    optimizer = CalendarOptimizer(
+        tasks, slots, slot_weights=[0.2, 0.9], time_limit_seconds=5, num_workers=1
+    )
+    solution = optimizer.optimize()
+    assert optimizer.status == 'OPTIMAL'
+    assert solution['High'] == ['Long']
+    assert solution['Low'] == ['Short']
+
+
+def test_calendar_optimizer_greedy_mode():
+    tasks = [
+        {'name': 'A', 'duration': 50},
+        {'name': 'B', 'duration': 40},
+        {'name': 'C', 'duration': 30},
+    ]
+    now = datetime.now()
+    slots = [
+        {'name': 'Morning', 'start': now, 'end': now + timedelta(minutes=90)},
+        {
+            'name': 'Evening',
+            'start': now + timedelta(hours=8),
+            'end': now + timedelta(hours=9),
+        },
+    ]
+    optimizer = CalendarOptimizer(tasks, slots, slot_weights=[0.3, 0.8], mode='greedy')
+    solution = optimizer.optimize()
+    assert optimizer.status == 'FEASIBLE'
+    # Longest task first into the best slot, the rest first-fit.
+    assert solution == {'Morning': ['B', 'C'], 'Evening': ['A']}
+
+
+def test_calendar_optimizer_anytime_mode_reports_incumbents():
+    tasks = [{'name': f'T{i}', 'duration': 20 + 5 * i} for i in range(6)]
+    now = datetime.now()
+    slots = [
+        {
+            'name': f'S{j}',
+            'start': now + timedelta(hours=2 * j),
+            'end': now + timedelta(hours=2 * j + 1),
+        }
+        for j in range(4)
+    ]
+    incumbents = []
+    optimizer = CalendarOptimizer(
+        tasks, slots, slot_weights=[0.1, 0.9, 0.5, 0.7], time_limit_seconds=2,
+        num_workers=1, mode='anytime',
+        on_solution=lambda assignment, objective: incumbents.append(objective),
+    )
+    solution = optimizer.optimize()
+    assert solution is not None
+    assert optimizer.status in ('OPTIMAL', 'FEASIBLE')
+    assert incumbents, "the greedy schedule should be reported first"
+    assert incumbents == sorted(incumbents)
+    greedy = CalendarOptimizer(
+        tasks, slots, slot_weights=[0.1, 0.9, 0.5, 0.7], mode='greedy'
+    )
+    greedy.optimize()
+    best = optimizer._objective_value(optimizer.assignment)
+    assert best >= greedy._objective_value(greedy.assignment)
+
+
+def test_calendar_optimizer_interval_engine_start_times():
+    durations = [90, 60, 45, 30]
+    tasks = [{'name': f'T{i}', 'duration': d} for i, d in enumerate(durations)]
+    start = datetime(2025, 1, 6, 9)
+    slots = [
+        {'name': 'A', 'start': start, 'end': start + timedelta(hours=2)},
+        {
+            'name': 'B',
+            'start': start + timedelta(hours=3),
+            'end': start + timedelta(hours=5),
+        },
+    ]
+    optimizer = CalendarOptimizer(
+        tasks, slots, slot_weights=[0.3, 0.7], engine='interval', num_workers=1
+    )
+    solution = optimizer.optimize()
+    assert optimizer.status == 'OPTIMAL'
+    assert sorted(sum(solution.values(), [])) == ['T0', 'T1', 'T2', 'T3']
+
+    intervals = sorted(optimizer.task_times)
+    for (task_start, task_end), j in zip(optimizer.task_times, optimizer.assignment):
+        assert slots[j]['start'] <= task_start < task_end <= slots[j]['end']
+    for (_, first_end), (second_start, _) in zip(intervals, intervals[1:]):
+        assert first_end <= second_start
+
+    boolean = CalendarOptimizer(tasks, slots, slot_weights=[0.3, 0.7], num_workers=1)
+    boolean.optimize()
+    assert (
+        optimizer._objective_value(optimizer.assignment)
+        == boolean._objective_value(boolean.assignment)
+    )
+
+
+def test_calendar_optimizer_engines_agree_when_a_task_fits_no_slot():
+    start = datetime(2025, 1, 6, 9)
+    slots = [{'name': 'A', 'start': start, 'end': start + timedelta(hours=1)}]
+    tasks = [{'name': 'short', 'duration': 30}, {'name': 'long', 'duration': 90}]
+    for engine in CalendarOptimizer.ENGINES:
+        for mode in ('exact', 'anytime'):
+            optimizer = CalendarOptimizer(
+                tasks, slots, slot_weights=[0.5], engine=engine, mode=mode,
+                num_workers=1,
+            )
+            assert optimizer.optimize() is None
+            assert optimizer.status == 'INFEASIBLE', (engine, mode)
+            assert optimizer.assignment is None
+
+
+def test_schedule_repairer_only_replans_touched_slots():
+    from src.ml.rescheduling import (
+        ScheduleRepairer, previous_from_entries, schedule_entries,
+    )
+
+    start = datetime(2025, 1, 6, 9)
+    slots = [
+        {
+            'name': f'S{j}',
+            'start': start + timedelta(hours=2 * j),
+            'end': start + timedelta(hours=2 * j + 1),
+        }
+        for j in range(3)
+    ]
+    weights = [0.5, 0.6, 0.7]
+    tasks = [{'id': f't{i}', 'name': f'T{i}', 'duration': 20} for i in range(6)]
+    optimizer = CalendarOptimizer(tasks, slots, slot_weights=weights, num_workers=1)
+    optimizer.optimize()
+    entries = schedule_entries(
+        tasks, slots, optimizer.assignment, optimizer.task_times
+    )
+    previous = previous_from_entries(entries, slots)
+
+    # t0 got longer and a new task was added.
+    new_task = {'id': 't6', 'name': 'T6', 'duration': 10}
+    changed = [dict(tasks[0], duration=30)] + tasks[1:] + [new_task]
+    repairer = ScheduleRepairer(
+        changed, slots, previous, slot_weights=weights, num_workers=1
+    )
+    solution = repairer.optimize()
+    assert solution is not None
+    assert sorted(sum(solution.values(), [])) == sorted(t['name'] for t in changed)
+
+    touched = optimizer.assignment[0]
+    for i in range(1, 6):
+        if optimizer.assignment[i] != touched:
+            assert i not in repairer.free_tasks
+            assert repairer.assignment[i] == optimizer.assignment[i]
+            assert repairer.task_times[i] == optimizer.task_times[i]
+    intervals = sorted(repairer.task_times)
+    for (_, first_end), (second_start, _) in zip(intervals, intervals[1:]):
+        assert first_end <= second_start
+    for (task_start, task_end), j in zip(repairer.task_times, repairer.assignment):
+        assert slots[j]['start'] <= task_start < task_end <= slots[j]['end']
+
+
+def test_optimize_schedule_endpoint_repair(client: TestClient, test_goal: dict):
+    sub_goal_id = client.post(
+        f"/goals/{test_goal['id']}/subgoals/",
+        json={"description": "Repairable", "estimated_effort_minutes": 60},
+    ).json()["id"]
+    task_ids = [
+        client.post(
+            f"/subgoals/{sub_goal_id}/tasks/", json={"description": f"Task {i}"}
+        ).json()["id"]
+        for i in range(3)
+    ]
+    start = datetime(2025, 1, 6, 9)
+    available_slots = [
+        {
+            "start": (start + timedelta(hours=2 * j)).isoformat(),
+            "end": (start + timedelta(hours=2 * j + 1)).isoformat(),
+        }
+        for j in range(3)
+    ]
+    request = {
+        "task_ids": task_ids,
+        "available_slots": available_slots,
+        "user_id": "repair_user",
+    }
+
+    def task_times(schedule):
+        return {
+            t["task_id"]: t
+            for slot in schedule["optimized_slots"]
+            for t in slot["scheduled_tasks"]
+        }
+
+    first = client.post("/ml/schedule/optimize", json=request).json()
+
+    # Nothing changed: repairing keeps every task exactly where it was.
+    repair = {**request, "repair": True}
+    repaired = client.post("/ml/schedule/optimize", json=repair).json()
+    assert task_times(repaired) == task_times(first)
+
+    # A changed task is re-planned, and the others keep their times unless they
+    # shared its slot.
+    changed = client.post(
+        "/ml/schedule/optimize", json={**repair, "changed_task_ids": [task_ids[0]]}
+    ).json()
+    assert changed["status"] in ("OPTIMAL", "FEASIBLE")
+    assert set(task_times(changed)) == set(task_ids)
+
+
+def test_partitioned_optimizer_solves_days_in_parallel():
+    from src.ml.partitioned_optimizer import (
+        PartitionedOptimizer, group_slots, shutdown_window_pool, window_pool,
+    )
+
+    start = datetime(2025, 1, 6, 9)
+    slots = [
+        {
+            'name': f'D{d}S{s}',
+            'start': start + timedelta(days=d, hours=3 * s),
+            'end': start + timedelta(days=d, hours=3 * s + 2),
+        }
+        for d in range(4) for s in range(2)
+    ]
+    assert group_slots(slots, 'day') == [[0, 1], [2, 3], [4, 5], [6, 7]]
+    assert group_slots(slots, 'week') == [list(range(8))]
+
+    tasks = [{'name': f'T{i}', 'duration': 15 + 15 * (i % 4)} for i in range(20)]
+    weights = [0.1 * (j % 5) for j in range(len(slots))]
+    optimizer = PartitionedOptimizer(
+        tasks, slots, slot_weights=weights, max_workers=2, num_workers=1
+    )
+    solution = optimizer.optimize()
+    assert optimizer.status == 'FEASIBLE'
+    assert sorted(sum(solution.values(), [])) == sorted(t['name'] for t in tasks)
+    intervals = sorted(optimizer.task_times)
+    for (_, first_end), (second_start, _) in zip(intervals, intervals[1:]):
+        assert first_end <= second_start
+    for (task_start, task_end), j in zip(optimizer.task_times, optimizer.assignment):
+        assert slots[j]['start'] <= task_start < task_end <= slots[j]['end']
+
+    # Windows run on one long-lived pool of spawned workers, shared by every run.
+    pool = window_pool()
+    assert pool._mp_context.get_start_method() == 'spawn'
+    PartitionedOptimizer(tasks, slots, max_workers=2, num_workers=1).optimize()
+    assert window_pool() is pool
+    shutdown_window_pool()
+    assert window_pool() is not pool
+    shutdown_window_pool()
+
+
+def test_partitioned_optimizer_reconciles_tasks_the_pre_assignment_missed(monkeypatch):
+    from src.ml import partitioned_optimizer
+    from src.ml.partitioned_optimizer import PartitionedOptimizer, pre_assign
+
+    start = datetime(2025, 1, 6, 9)
+    slots = [
+        {
+            'name': f'D{d}',
+            'start': start + timedelta(days=d),
+            'end': start + timedelta(days=d, minutes=12),
+        }
+        for d in range(2)
+    ]
+    # First-fit-decreasing strands one 3-minute task; 5+4+3 per day fits exactly.
+    tasks = [{'name': f'T{i}', 'duration': d} for i, d in enumerate([5, 5, 4, 4, 3, 3])]
+    assert pre_assign(tasks, slots).count(None) == 1
+
+    budgets = []
+
+    class Repairer(partitioned_optimizer.ScheduleRepairer):
+        def __init__(self, *args, time_limit_seconds=None, **kwargs):
+            budgets.append(time_limit_seconds)
+            super().__init__(*args, time_limit_seconds=time_limit_seconds, **kwargs)
+
+    monkeypatch.setattr(partitioned_optimizer, 'ScheduleRepairer', Repairer)
+    optimizer = PartitionedOptimizer(
+        tasks, slots, max_workers=1, num_workers=1, time_limit_seconds=5
+    )
+    solution = optimizer.optimize()
+    assert optimizer.status == 'FEASIBLE'
+    assert sorted(sum(solution.values(), [])) == sorted(t['name'] for t in tasks)
+    # Reconciliation only gets what the windows left of the budget.
+    [budget] = budgets
+    assert 5 * partitioned_optimizer.RECONCILE_SHARE <= budget < 5
+
+
+def test_schedule_cache_lru_ttl_and_invalidation():
+    from src.ml.schedule_cache import ScheduleCache
+
+    now = [0.0]
+    cache = ScheduleCache(maxsize=2, ttl_seconds=10, clock=lambda: now[0])
+    calls = []
+
+    def compute(value, *tags):
+        def run():
+            calls.append(value)
+            return value, tags
+        return run
+
+    assert cache.get_or_compute('a', compute(1, 'task:1')) == 1
+    assert cache.get_or_compute('a', compute(99, 'task:1')) == 1
+    cache.get_or_compute('b', compute(2, 'task:2'))
+    # Evicts 'a', the least recently used.
+    cache.get_or_compute('c', compute(3, 'task:3'))
+    assert cache.get_or_compute('a', compute(4, 'task:1')) == 4
+
+    cache.invalidate('task:3')
+    assert cache.get_or_compute('c', compute(5, 'task:3')) == 5
+    now[0] = 11
+    assert cache.get_or_compute('c', compute(6, 'task:3')) == 6
+    assert calls == [1, 2, 3, 4, 5, 6]
+    assert cache.stats() == {
+        'hits': 1, 'misses': 6, 'coalesced': 0, 'invalidations': 1, 'size': 2
+    }
+
+
+def test_schedule_cache_single_flight():
+    import threading
+    from src.ml.schedule_cache import ScheduleCache
+
+    cache = ScheduleCache()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return 'solved', ['task:1']
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get_or_compute('k', compute))
+        )
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        _wait_for(lambda: cache.stats()['coalesced'] == 3, timeout=5)
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+    assert results == ['solved'] * 4
+    assert len(calls) == 1
+
+
+def test_optimize_schedule_endpoint_cache_invalidation(
+    client: TestClient, test_goal: dict
+):
+    sub_goal_id = client.post(
+        f"/goals/{test_goal['id']}/subgoals/",
+        json={"description": "Cached", "estimated_effort_minutes": 60},
+    ).json()["id"]
+    task_ids = [
+        client.post(
+            f"/subgoals/{sub_goal_id}/tasks/", json={"description": f"Task {i}"}
+        ).json()["id"]
+        for i in range(2)
+    ]
+    start = datetime(2025, 1, 6, 9)
+    end = start + timedelta(hours=2)
+    request = {
+        "task_ids": task_ids,
+        "available_slots": [{"start": start.isoformat(), "end": end.isoformat()}],
+    }
+
+    def durations(data):
+        return [
+            (datetime.fromisoformat(t["end"]) - datetime.fromisoformat(t["start"]))
+            .seconds // 60
+            for slot in data["optimized_slots"] for t in slot["scheduled_tasks"]
+        ]
+
+    before = client.get("/ml/schedule/cache/stats").json()
+    first = client.post("/ml/schedule/optimize", json=request).json()
+    assert client.post("/ml/schedule/optimize", json=request).json() == first
+    stats = client.get("/ml/schedule/cache/stats").json()
+    assert stats["misses"] == before["misses"] + 1
+    assert stats["hits"] == before["hits"] + 1
+    assert durations(first) == [30, 30]
+
+    # Raising the sub-goal's effort changes both durations, so the entry must go.
+    client.put(f"/subgoals/{sub_goal_id}", json={"estimated_effort_minutes": 100})
+    second = client.post("/ml/schedule/optimize", json=request).json()
+    assert durations(second) == [50, 50]
+    stats = client.get("/ml/schedule/cache/stats").json()
+    assert stats["misses"] == before["misses"] + 2
+
+
+def _wait_for(predicate, timeout=60):
+    import time
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.05)
+
+
+def test_schedule_job_endpoints(
+    client: TestClient, test_goal: dict, db_session, monkeypatch
+):
+    from src import crud
+    from src.routers import ml as ml_router
+
+    sub_goal_id = client.post(
+        f"/goals/{test_goal['id']}/subgoals/",
+        json={"description": "Background", "estimated_effort_minutes": 60},
+    ).json()["id"]
+    task_ids = [
+        client.post(
+            f"/subgoals/{sub_goal_id}/tasks/", json={"description": f"Task {i}"}
+        ).json()["id"]
+        for i in range(2)
+    ]
+    start = datetime(2025, 1, 6, 9)
+    end = start + timedelta(hours=2)
+    request = {
+        "task_ids": task_ids,
+        "available_slots": [{"start": start.isoformat(), "end": end.isoformat()}],
+        "mode": "anytime",
+        "user_id": "job_user",
+    }
+    saves = []
+    save_user_schedule = crud.save_user_schedule
+
+    def counting_save(db, user_id, entries):
+        # Saving must not hold up the job manager's readers.
+        assert not ml_router.job_manager._lock.locked()
+        saves.append(user_id)
+        return save_user_schedule(db, user_id, entries)
+
+    monkeypatch.setattr(crud, "save_user_schedule", counting_save)
+    response = client.post("/ml/schedule/jobs", json=request)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert response.json()["status"] in ("queued", "running")
+    # An anytime job hands back the greedy schedule before the solve starts.
+    greedy = response.json()["result"]
+    assert greedy["status"] == "FEASIBLE"
+    assert sorted(greedy["optimized_slots"][0]["task_ids"]) == sorted(task_ids)
+
+    def job_status():
+        return client.get(f"/ml/schedule/jobs/{job_id}").json()["status"]
+
+    _wait_for(lambda: job_status() not in ("queued", "running"))
+    data = client.get(f"/ml/schedule/jobs/{job_id}").json()
+    assert data["status"] == "succeeded"
+    assert data["result"]["status"] in ("OPTIMAL", "FEASIBLE")
+    assert sorted(data["result"]["optimized_slots"][0]["task_ids"]) == sorted(task_ids)
+    # The schedule was saved once, when the job finished, however often it is read.
+    assert saves == ["job_user"]
+    assert len(crud.get_user_schedule(db_session, "job_user").entries) == 2
+
+    with client.stream("GET", f"/ml/schedule/jobs/{job_id}/events") as stream:
+        assert stream.headers["content-type"].startswith("text/event-stream")
+        body = "".join(stream.iter_text())
+    assert body.startswith('event: status\ndata: {"status": "queued"}\n\n')
+    assert body.endswith('event: status\ndata: {"status": "succeeded"}\n\n')
+
+    assert client.get("/ml/schedule/jobs/unknown").status_code == 404
+    # Evicted (or never known) jobs have no events either.
+    assert ml_router.job_manager.events_since("unknown", 0) is None
+    assert client.get("/ml/schedule/jobs/unknown/events").status_code == 404
+
+
+def test_job_manager_queue_depth_and_cancellation():
+    from src.ml.jobs import JobManager, QueueFullError
+
+    start = datetime(2025, 1, 6, 9)
+    slots = [
+        {
+            'name': f'S{j}',
+            'start': start + timedelta(hours=j),
+            'end': start + timedelta(hours=j, minutes=59),
+        }
+        for j in range(100)
+    ]
+    tasks = [{'name': f'T{i}', 'duration': 7 + i % 23} for i in range(300)]
+    weights = [(j * 37 % 100) / 100 for j in range(100)]
+    manager = JobManager(max_workers=1, max_queued=1)
+    try:
+        kwargs = dict(slot_weights=weights, time_limit_seconds=120, num_workers=1)
+        running = manager.submit(CalendarOptimizer, (tasks, slots), kwargs)
+        queued = manager.submit(CalendarOptimizer, (tasks, slots), kwargs)
+        with pytest.raises(QueueFullError):
+            manager.submit(CalendarOptimizer, (tasks, slots), kwargs)
+
+        assert manager.cancel(queued.id).status == 'cancelled'
+        _wait_for(lambda: running.status == 'running')
+        manager.cancel(running.id)
+        _wait_for(lambda: running.finished, timeout=30)
+        assert running.status == 'cancelled'
+        statuses = [
+            e['data']['status'] for e in running.events if e['event'] == 'status'
+        ]
+        assert statuses == ['queued', 'running', 'cancelled']
+        # Both slots are free again.
+        manager.cancel(manager.submit(CalendarOptimizer, (tasks, slots), kwargs).id)
+    finally:
+        manager.shutdown()
+
+
+def test_model_registry_publish_and_lazy_load(tmp_path):
+    from src.ml.model_registry import SLOT_SELECTOR, ModelRegistry, get_slot_selector
+    from src.ml.train import main as train_main
+
+    registry = ModelRegistry(tmp_path)
+    assert registry.latest_version(SLOT_SELECTOR) is None
+    first = train_main(['--model-dir', str(tmp_path), '--version', 'v1'])
+    second = train_main(
+        ['--model-dir', str(tmp_path), '--version', 'v2', '--seed', '1']
+    )
+    assert (first, second) == ('v1', 'v2')
+    assert registry.versions(SLOT_SELECTOR) == ['v1', 'v2']
+    assert registry.latest_version(SLOT_SELECTOR) == 'v2'
+    assert registry.metadata(SLOT_SELECTOR)['seed'] == 1
+
+    version, selector = get_slot_selector(registry)
+    assert version == 'v2'
+    assert get_slot_selector(registry)[1] is selector  # loaded once
+    features = np.array([[9, 0], [20, 5]])
+    expected = registry.load(SLOT_SELECTOR, 'v2').predict_proba(features)
+    assert np.allclose(selector.predict_proba(features), expected)
+
+
+def test_model_registry_fallback_is_deterministic(tmp_path):
+    from src.ml.model_registry import FALLBACK_VERSION, ModelRegistry, get_slot_selector
+
+    features = np.array([[h, d] for h in range(0, 24, 5) for d in range(7)])
+    version, first = get_slot_selector(ModelRegistry(tmp_path / 'a'))
+    _, second = get_slot_selector(ModelRegistry(tmp_path / 'b'))
+    assert version == FALLBACK_VERSION
+    assert np.array_equal(first.predict_proba(features), second.predict_proba(features))
+
+
+def test_slot_selector_lookup_table_matches_model():
+    selector = SlotSelector()
+    selector.train(*get_dummy_data(seed=3))
+    assert selector.table.shape == (24, 7, 2)
+
+    features = np.array([[h, d] for h in range(24) for d in range(7)])
+    expected = selector.model.predict_proba(features)
+    assert np.allclose(selector.predict_proba(features), expected)
+    assert np.array_equal(selector.predict(features), selector.model.predict(features))
+
+    # Anything the table does not cover goes through the model.
+    outside = np.array([[9, 12], [25, 0]])
+    for features in (outside, np.array([[9.5, 2.0]])):
+        expected = selector.model.predict_proba(features)
+        assert np.allclose(selector.predict_proba(features), expected)
+
+
+def test_feature_pipeline_streams_history_in_blocks(db_session, test_sub_goal: dict):
+    from uuid import UUID
+    from src import models
+    from src.ml.feature_pipeline import (
+        iter_feature_blocks, train_slot_selector_from_history,
+    )
+
+    monday = datetime(2025, 1, 6)
+    sub_goal_id = UUID(test_sub_goal["id"])
+
+    done, skipped = models.TaskStatus.DONE, models.TaskStatus.SKIPPED
+
+    def task(status, hour, late=0, ratio=1.0, day=0):
+        planned_start = monday + timedelta(days=day, hours=hour)
+        actual_start = completed_at = None
+        if status != skipped:
+            actual_start = planned_start + timedelta(minutes=late)
+        if status == done:
+            completed_at = actual_start + timedelta(minutes=60 * ratio)
+        return models.Task(
+            subgoal_id=sub_goal_id, description="history", status=status,
+            planned_start=planned_start,
+            planned_end=planned_start + timedelta(minutes=60),
+            actual_start=actual_start,
+            completed_at=completed_at,
+        )
+
+    db_session.add_all([
+        task(done, 9), task(done, 9, late=45), task(done, 9, ratio=2.0),
+        task(skipped, 9), task(done, 9, day=1), task(models.TaskStatus.TODO, 9),
+    ])
+    db_session.commit()
+
+    blocks = list(iter_feature_blocks(db_session, batch_size=2))
+    assert [len(y) for _, y in blocks] == [2, 2, 1]
+    X = np.vstack([X for X, _ in blocks])
+    y = np.concatenate([y for _, y in blocks])
+    assert sorted(map(tuple, X.tolist())) == [
+        (9, 0, 0, 1.0), (9, 0, 0, 1.0), (9, 0, 0, 2.0), (9, 0, 45, 1.0), (9, 1, 0, 1.0),
+    ]
+    # Only the on-time, on-budget DONE tasks count as productive.
+    assert sorted(y.tolist()) == [0, 0, 0, 1, 1]
+
+    # Incremental training over small chunks matches a single pass.
+    selector, n_samples = train_slot_selector_from_history(db_session, batch_size=2)
+    single_pass, _ = train_slot_selector_from_history(db_session, batch_size=100)
+    assert n_samples == 5
+    assert selector.table.shape == (24, 7, 2)
+    assert np.allclose(selector.table, single_pass.table)
+    on_tuesday, on_monday = selector.predict_proba(np.array([[9, 1], [9, 0]]))[:, 1]
+    assert on_tuesday > on_monday
+
+
+def test_sql_bandit_storage_upserts_only_changed_arms(db_session):
+    from sqlalchemy import event
+    from src.ml.bandit_storage import SQLBanditStorage
+    from src.ml.reminder_system import ReminderBanditManager
+
+    engine = db_session.get_bind()
+    arms = ['push_15_min', 'email_1_hour', 'sms_on_day']
+    manager = ReminderBanditManager(storage=SQLBanditStorage(engine))
+    for i in range(50):
+        manager.save_bandit(manager.get_bandit(f'user_{i}', arms))
+
+    bandit = manager.get_bandit('user_7', arms)
+    bandit.update('email_1_hour', 1)
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        manager.save_bandit(bandit, arms=['email_1_hour'])
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert len(statements) == 1 and 'ON CONFLICT' in statements[0]
+
+    # A fresh manager loads just that user, with the arms in their original order.
+    fresh = ReminderBanditManager(storage=SQLBanditStorage(engine))
+    reloaded = fresh.get_bandit('user_7', ['other'])
+    assert reloaded.arms == arms
+    assert reloaded.counts == {'push_15_min': 0, 'email_1_hour': 1, 'sms_on_day': 0}
+    assert reloaded.values['email_1_hour'] == 1.0
+
+
+def test_batch_reminder_endpoints_coalesce_and_persist_once(
+    client: TestClient, db_session, reminder_manager
+):
+    from sqlalchemy import event
+    from src.ml.bandit_storage import SQLBanditStorage
+    from src.ml.reminder_system import ReminderBanditManager
+    from src.routers import ml as ml_router
+
+    engine = db_session.get_bind()
+    rewards = [
+        {'user_id': f'user_{i % 100}', 'arm': 'sms_on_day', 'reward': i % 2}
+        for i in range(1000)
+    ]
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        response = client.post("/ml/reminders/reward/batch", json={'rewards': rewards})
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert response.status_code == 200
+    assert response.json() == {'status': 'ok', 'rewards': 1000, 'updated': 100}
+    # One query loads the users, one statement upserts every changed arm.
+    assert len(statements) == 2 and 'ON CONFLICT' in statements[1]
+
+    fresh = ReminderBanditManager(storage=SQLBanditStorage(engine))
+    reloaded = fresh.get_bandit('user_3', [])
+    assert reloaded.counts['sms_on_day'] == 10
+    assert reloaded.values['sms_on_day'] == 1.0
+    assert reloaded.counts['push_15_min'] == 0
+
+    user_ids = ['user_3', 'user_4', 'new_user', 'user_3']
+    response = client.post("/ml/reminders/suggest/batch", json={'user_ids': user_ids})
+    assert response.status_code == 200
+    suggestions = response.json()['suggestions']
+    assert [s['user_id'] for s in suggestions] == user_ids
+    assert all(s['suggestion'] in ml_router.REMINDER_ARMS for s in suggestions)
+    # Every user is served from the one table of the reminder arms.
+    table = reminder_manager.tables[tuple(ml_router.REMINDER_ARMS)]
+    assert len(table) == 101 and 'new_user' in table
+    # Without exploration both endpoints pick the best arm from the table.
+    table.epsilons[:] = 0
+    response = client.post(
+        "/ml/reminders/suggest/batch", json={'user_ids': ['user_3'] * 3}
+    )
+    suggestions = response.json()['suggestions']
+    assert [s['suggestion'] for s in suggestions] == ['sms_on_day'] * 3
+    response = client.post("/ml/reminders/suggest", json={'user_id': 'user_3'})
+    assert response.json()['suggestion'] == 'sms_on_day'
+
+    # An unknown arm rejects the whole batch.
+    bad = [
+        {'user_id': 'user_3', 'arm': 'sms_on_day', 'reward': 1},
+        {'user_id': 'user_3', 'arm': 'fax', 'reward': 1},
+    ]
+    response = client.post("/ml/reminders/reward/batch", json={'rewards': bad})
+    assert response.status_code == 422
+    bandit = reminder_manager.get_bandit('user_3', [])
+    assert bandit.counts['sms_on_day'] == 10
+    response = client.post("/ml/reminders/suggest/batch", json={'user_ids': []})
+    assert response.status_code == 422
+
+
+def test_reminder_rewards_are_concurrent_and_written_behind(
+    client: TestClient, db_session, monkeypatch
+):
+    import threading
+    import time
+    from src.main import app
+    from src.ml.bandit_storage import SQLBanditStorage
+    from src.ml.reminder_system import ReminderBanditManager
+    from src.routers import ml as ml_router
+
+    class SlowStorage(SQLBanditStorage):
+        def __init__(self, engine):
+            super().__init__(engine)
+            self.saves = 0
+
+        def add_rewards(self, rows):
+            time.sleep(0.2)
+            super().add_rewards(rows)
+            self.saves += 1
+
+    storage = SlowStorage(db_session.get_bind())
+    manager = ReminderBanditManager(storage=storage)
+    arms = ml_router.REMINDER_ARMS
+    manager.start_write_behind(interval_seconds=60, max_pending=10 ** 6)
+
+    def reward(user_id):
+        for i in range(500):
+            manager.record_reward(user_id, arms[i % 3], i % 2, arms=arms)
+
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=reward, args=(f'user_{i % 2}',)) for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # No reward waited for the storage, and no update was lost.
+    assert time.perf_counter() - start < 0.2 and storage.saves == 0
+    assert sum(manager.get_bandit('user_0', arms).counts.values()) == 2000
+    manager.close()
+    assert storage.saves == 1
+    reloaded = ReminderBanditManager(storage=storage).get_bandit('user_1', arms)
+    assert reloaded.counts == {arms[0]: 668, arms[1]: 668, arms[2]: 664}
+
+    # Reaching max_pending wakes the flusher before the interval is up.
+    manager.start_write_behind(interval_seconds=60, max_pending=3)
+    for i in range(3):
+        manager.record_reward('user_0', arms[0], 1, arms=arms)
+    _wait_for(lambda: storage.saves == 2)
+    manager.close()
+
+    # The app starts write-behind on startup and flushes on shutdown.
+    monkeypatch.setattr(
+        ml_router,
+        'create_reminder_manager',
+        lambda: ReminderBanditManager(storage=storage),
+    )
+    monkeypatch.delitem(app.dependency_overrides, ml_router.get_reminder_manager)
+    monkeypatch.setattr(ml_router, 'REMINDER_FLUSH_INTERVAL_SECONDS', 60)
+    with TestClient(app) as app_client:
+        def post_reward(arm):
+            return app_client.post(
+                "/ml/reminders/reward",
+                json={'user_id': 'user_9', 'arm': arm, 'reward': 1},
+            )
+
+        response = post_reward(arms[1])
+        assert response.status_code == 200 and storage.saves == 2
+        assert post_reward('fax').status_code == 422
+    assert storage.saves == 3
+    reloaded = ReminderBanditManager(storage=storage).get_bandit('user_9', [])
+    assert reloaded.counts == {arms[0]: 0, arms[1]: 1, arms[2]: 0}
+
+
+def test_sql_bandit_storage_adds_rewards_from_several_managers(db_session):
+    from src.ml.bandit_storage import SQLBanditStorage
+    from src.ml.reminder_system import ReminderBanditManager
+
+    storage = SQLBanditStorage(db_session.get_bind())
+    arms = ['push_15_min', 'email_1_hour', 'sms_on_day']
+    # Two workers that loaded the same user before either wrote anything.
+    first = ReminderBanditManager(storage=storage)
+    second = ReminderBanditManager(storage=storage)
+    first.get_bandit('alice', arms)
+    second.get_bandit('alice', arms)
+    first.record_rewards([('alice', 'sms_on_day', 1)] * 3, arms=arms)
+    second.record_rewards([('alice', 'sms_on_day', 0)], arms=arms)
+    second.record_reward('alice', 'push_15_min', 1, arms=arms)
+    first.record_reward('alice', 'push_15_min', 0, arms=arms)
+
+    stored = storage.load('alice')
+    assert stored['arms'] == arms
+    assert stored['counts'] == {'push_15_min': 2, 'email_1_hour': 0, 'sms_on_day': 4}
+    assert stored['values'] == {
+        'push_15_min': 0.5, 'email_1_hour': 0.0, 'sms_on_day': 0.75
+    }
+
+
+def test_bandit_json_import_export_round_trip(db_session, tmp_path):
+    import json
+    from src.ml.bandit_storage import (
+        BanditStorage, JSONBanditStorage, SQLBanditStorage, export_json, import_json,
+    )
+    from src.ml.reminder_system import ReminderBanditManager
+
+    legacy = tmp_path / 'bandit_data.json'
+    manager = ReminderBanditManager(storage_path=str(legacy))
+    bandit = manager.get_bandit('alice', ['a', 'b'], epsilon=0.2)
+    bandit.update('b', 1)
+    manager.save_bandit(bandit)
+    # No temp files are left behind.
+    assert [p.name for p in tmp_path.iterdir()] == ['bandit_data.json']
+
+    storage = SQLBanditStorage(db_session.get_bind())
+    assert import_json(str(legacy), storage) == 1
+    assert storage.load('alice') == {
+        'user_id': 'alice',
+        'arms': ['a', 'b'],
+        'epsilon': 0.2,
+        'counts': {'a': 0, 'b': 1},
+        'values': {'a': 0.0, 'b': 1.0},
+    }
+    exported = tmp_path / 'export.json'
+    assert export_json(storage, str(exported)) == 1
+    assert json.loads(exported.read_text()) == json.loads(legacy.read_text())
+    assert JSONBanditStorage(str(exported)).load('bob') is None
+
+    class IncompleteStorage(BanditStorage):
+        def load(self, user_id):
+            return None
+
+    # A backend missing a method fails when it is created, not on a flush.
+    with pytest.raises(TypeError):
+        IncompleteStorage()
+
+
+def test_bandit_table_matches_per_user_bandits(tmp_path):
+    from src.ml.bandit_table import BanditTable
+    from src.ml.reminder_system import ReminderBandit
+
+    arms = ['push_15_min', 'email_1_hour', 'sms_on_day']
+    rng = np.random.default_rng(1)
+    users = [f'u{i}' for i in rng.integers(20, size=500)]
+    chosen = [arms[k] for k in rng.integers(3, size=500)]
+    rewards = rng.integers(2, size=500)
+
+    bandits = {}
+    for user, arm, reward in zip(users, chosen, rewards):
+        bandits.setdefault(user, ReminderBandit(user, arms)).update(arm, reward)
+    table = BanditTable(arms, capacity=4)  # forces the arrays to grow
+    table.update(users[:200], chosen[:200], rewards[:200])
+    table.update(users[200:], chosen[200:], rewards[200:])
+    for user, bandit in bandits.items():
+        state = table.state(user)
+        assert state['counts'] == bandit.counts
+        assert np.allclose(
+            [state['values'][a] for a in arms], [bandit.values[a] for a in arms]
+        )
+
+    # epsilon=0 is purely greedy.
+    table.epsilons[:] = 0
+    greedy = [max(b.values, key=b.values.get) for b in bandits.values()]
+    assert table.select(list(bandits)) == greedy
+    with pytest.raises(ValueError):
+        table.update(['u1'], ['carrier_pigeon'], [1])
+
+    table.snapshot(tmp_path / 'bandits')
+    table.snapshot(tmp_path / 'bandits')  # replaces the previous snapshot
+    restored = BanditTable.restore(tmp_path / 'bandits')
+    assert isinstance(restored.counts, np.memmap)
+    assert list(restored.states()) == list(table.states())
+    restored.update(['u1', 'newcomer'], ['sms_on_day', 'push_15_min'], [1, 1])
+    assert restored.state('newcomer')['counts']['push_15_min'] == 1
+    # Copy-on-write: the snapshot on disk is unchanged until the next snapshot.
+    on_disk = BanditTable.restore(tmp_path / 'bandits')
+    assert list(on_disk.states()) == list(table.states())
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['bandits']
+
+    rebuilt = BanditTable.from_states(table.states(), arms)
+    assert list(rebuilt.states()) == list(table.states())
+
+
+def test_bandit_replay_ranks_policies_on_synthetic_log(tmp_path):
+    from src.ml.bandit_replay import (
+        load_log, main, make_policy, replay, save_log, synthetic_log,
+    )
+
+    log = synthetic_log(60000, n_users=200, seed=1)
+    uniform = replay(log, make_policy('epsilon-greedy:1'), batch_size=1000)
+    # A uniform random policy matches a third of the events and recovers the
+    # logged mean.
+    assert abs(uniform['matched'] / len(log) - 1 / 3) < 0.01
+    assert abs(uniform['mean_reward'] - log.rewards.mean()) < 0.01
+    for spec in ['ucb1', 'thompson']:
+        result = replay(log, make_policy(spec), batch_size=1000)
+        assert result['mean_reward'] > uniform['mean_reward'] + 0.02
+    with pytest.raises(ValueError):
+        make_policy('softmax')
+
+    path = tmp_path / 'rewards.csv'
+    save_log(synthetic_log(500, n_users=20), path)
+    loaded = load_log(path)
+    assert len(loaded) == 500 and loaded.n_users <= 20
+    assert sorted(loaded.arm_names) == loaded.arm_names
+    results = main(['--log', str(path), '--policy', 'ucb1:1', '--policy', 'thompson'])
+    assert [r['policy'] for r in results] == ['ucb1:1', 'thompson']